@@ -1,9 +1,16 @@
 """FastAPI backend for Launch Go/No-Go Advisor."""
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional, Tuple
+import hashlib
+import json
+import math
+import time
 import uvicorn
 import os
 from pathlib import Path
@@ -13,15 +20,108 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-from decide import make_decision
+from decide import (
+    make_cacheable_decision, sweep_decisions, sweep_columns, decide_batch, decision_fingerprint,
+    active_decisions, DECISION_FIELDS, COMPACT_FIELDS, Place
+)
+from batch_scoring import VERDICTS
+from serialization import (
+    ARROW, JSON, arrow_response, columns_from_rows, encoded_response, negotiate, representation_etag
+)
 from sites import LAUNCH_SITES
+from rules import reload_rules, rules_status, site_limits
+from integrations.cache import cache_stats
+from integrations.clients import start_clients, close_clients, scheduler_stats
+from integrations.shared_cache import get_store
+from integrations.metrics import (
+    CONTENT_TYPE, HTTP_SECONDS, SERVER_TIMING_ENABLED, render_metrics, server_timing_header,
+    start_request_timing
+)
+from integrations.swpc import get_kp_history
+from integrations.spacetrack import load_catalog
+from jobs import JOB_MAX_EVALUATIONS, JOB_MAX_PROFILES, JobQueueFull, StudyRunner
+from prefetch import PrefetchScheduler, PREFETCH_ENABLED
+from subscriptions import DecisionHub, SUBSCRIPTION_HEARTBEAT_S
+
+# Upper bound on slots per sweep (two weeks at hourly resolution)
+MAX_SWEEP_SLOTS = 336
+
+# Upper bound on (site, time) pairs per batch request
+MAX_BATCH_SIZE = 500
+
+# Upper bound on (site, time) pairs per decision stream
+MAX_STREAM_SUBSCRIPTIONS = 50
+
+# /sites never changes at runtime, so let clients and proxies keep it a day
+SITES_MAX_AGE_S = 86400
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open upstream clients, load the TLE catalog, start prefetch, the decision hub and the job runner."""
+    await start_clients()
+    # Parse the TLE catalog up front so the first decision doesn't pay for it
+    await asyncio.to_thread(load_catalog)
+    if PREFETCH_ENABLED:
+        app.state.prefetch = PrefetchScheduler()
+        app.state.prefetch.start()
+    app.state.hub = DecisionHub()
+    app.state.hub.start()
+    app.state.jobs = StudyRunner()
+    app.state.jobs.start()
+    yield
+    await app.state.jobs.stop()
+    await app.state.hub.stop()
+    if PREFETCH_ENABLED:
+        await app.state.prefetch.stop()
+    await close_clients()
+
 
 app = FastAPI(
     title="Launch Go/No-Go Advisor",
     description="AI-powered launch readiness assessment system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request (until the response starts) by route and
+    status. With SERVER_TIMING_ENABLED, also adds a Server-Timing header
+    with the stage breakdown of that request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = start_request_timing() if SERVER_TIMING_ENABLED else None
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                # FastAPI puts the matched route in the scope; its path
+                # template keeps the label set bounded
+                route = scope.get("route")
+                HTTP_SECONDS.observe(
+                    elapsed, scope["method"], getattr(route, "path", "unmatched"), str(message["status"])
+                )
+                if timings is not None:
+                    header = server_timing_header(timings, elapsed).encode()
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_metrics)
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -29,22 +129,129 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 
 class LaunchRequest(BaseModel):
-    """Request model for launch decision."""
-    site_code: str
+    """Request model for launch decision (a site code, or lat/lon for an ad-hoc pad)."""
+    site_code: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
     launch_time: str  # ISO format datetime string
 
 
+class SweepRequest(BaseModel):
+    """Request model for a launch-window sweep."""
+    site_code: str
+    start_time: str  # ISO format datetime string
+    end_time: str  # ISO format datetime string
+    step_hours: int = 1
+
+
+class BatchRequest(BaseModel):
+    """Request model for a batch of launch decisions."""
+    requests: list[LaunchRequest]
+
+
+class StudyRequest(BaseModel):
+    """Request model for a study job: every slot of a window, per site and limit profile."""
+    sites: Optional[list[str]] = None  # default: every site
+    start_time: str  # ISO format datetime string
+    end_time: str  # ISO format datetime string
+    step_hours: int = 1
+    profiles: Optional[dict[str, dict[str, Any]]] = None  # name -> limit overrides (checked by check_profile)
+
+
 class LaunchResponse(BaseModel):
-    """Response model for launch decision."""
-    verdict: str
-    risk_score: int
-    why: str
-    rule_citations: list[str]
+    """Response model for launch decision (fields= can omit any of these)."""
+    verdict: Optional[str] = None
+    risk_score: Optional[int] = None
+    why: Optional[str] = None
+    rule_citations: Optional[list[str]] = None
+    degraded: Optional[dict[str, str]] = None
     data: Optional[dict] = None
+    location: Optional[dict] = None
+
+
+def parse_time(value: str, field: str) -> datetime:
+    """
+    Parse an ISO datetime string as an aware UTC datetime (no offset means
+    UTC), raising a 400 on bad input. Normalizing here keeps naive and
+    offset times comparable and gives one cache key per instant.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {field} format. Use ISO format: YYYY-MM-DDTHH:MM:SSZ"
+        )
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def check_profile(name: str, overrides: dict[str, Any], sites: list[str]) -> None:
+    """
+    Validate one study profile's limit overrides, raising a 400 for unknown
+    limits and a 422 for bad values: every value must be a finite number,
+    and limits that are positive at every site (wind, precipitation,
+    ceiling) must stay positive.
+    """
+    limits = [site_limits(site_code) for site_code in sites]
+    unknown = sorted(set(overrides) - set().union(*limits))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Profile {name!r} overrides unknown limits: {unknown}")
+    for limit, value in overrides.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise HTTPException(
+                status_code=422, detail=f"Profile {name!r}: {limit} must be a finite number, got {value!r}"
+            )
+        if value <= 0 and all(site.get(limit, 1) > 0 for site in limits):
+            raise HTTPException(status_code=422, detail=f"Profile {name!r}: {limit} must be positive, got {value!r}")
+
+
+def parse_fields(fields: Optional[str], compact: bool) -> Optional[Tuple[str, ...]]:
+    """
+    Decision fields to return: a comma-separated subset of DECISION_FIELDS,
+    or only verdict and risk_score in compact mode. None means all fields.
+    """
+    if compact:
+        return COMPACT_FIELDS
+    if not fields:
+        return None
+    selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in selected if f not in DECISION_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(DECISION_FIELDS)}"
+        )
+    return selected
+
+
+def validate_site(site_code: str) -> None:
+    """Raise a 400 if the site code is unknown."""
+    if site_code not in LAUNCH_SITES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid site_code. Available sites: {', '.join(LAUNCH_SITES.keys())}"
+        )
+
+
+def parse_place(site_code: Optional[str], lat: Optional[float], lon: Optional[float]) -> Place:
+    """The site code, or (lat, lon) for an ad-hoc point, raising a 400 on bad input."""
+    if site_code is not None:
+        if lat is not None or lon is not None:
+            raise HTTPException(status_code=400, detail="Give either site_code or lat/lon, not both")
+        validate_site(site_code)
+        return site_code
+    if lat is None or lon is None:
+        raise HTTPException(status_code=400, detail="site_code, or both lat and lon, is required")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+    return (lat, lon)
 
 
 @app.get("/")
@@ -57,24 +264,149 @@ async def root():
     }
 
 
+# The site list is static: serialize it and compute its ETag once
+SITES_BODY = json.dumps({
+    "sites": [
+        {
+            "code": code,
+            "name": site["name"],
+            "lat": site["lat"],
+            "lon": site["lon"]
+        }
+        for code, site in LAUNCH_SITES.items()
+    ]
+}).encode()
+SITES_ETAG = f'"{hashlib.sha1(SITES_BODY).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header lists etag (or is "*")."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @app.get("/sites")
-async def list_sites():
+async def list_sites(if_none_match: Optional[str] = Header(None)):
     """List available launch sites."""
+    headers = {"ETag": SITES_ETAG, "Cache-Control": f"public, max-age={SITES_MAX_AGE_S}"}
+    if etag_matches(if_none_match, SITES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(SITES_BODY, media_type="application/json", headers=headers)
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters and sizes for each integration cache."""
+    prefetch = getattr(app.state, "prefetch", None)
+    hub = getattr(app.state, "hub", None)
+    jobs = getattr(app.state, "jobs", None)
+    store = get_store()
     return {
-        "sites": [
-            {
-                "code": code,
-                "name": site["name"],
-                "lat": site["lat"],
-                "lon": site["lon"]
-            }
-            for code, site in LAUNCH_SITES.items()
-        ]
+        "caches": cache_stats(),
+        "shared_store": store.snapshot() if store else None,
+        "upstreams": scheduler_stats(),
+        "prefetch": prefetch.stats if prefetch else None,
+        "subscriptions": hub.snapshot() if hub else None,
+        "jobs": jobs.snapshot() if jobs else None
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: stage, upstream and API latency histograms, upstream
+    status and source outcome counters, and cache counters.
+    """
+    hub = getattr(app.state, "hub", None)
+    subscriptions = hub.snapshot() if hub else {"subscriptions": 0, "listeners": 0}
+    jobs = app.state.jobs.snapshot()["jobs"] if getattr(app.state, "jobs", None) else {}
+    gauges = {
+        "launchadvisor_active_decisions": ("Decisions gathering upstream inputs right now.", active_decisions()),
+        "launchadvisor_stream_subscriptions": ("Distinct (site, time) decision streams.", subscriptions["subscriptions"]),
+        "launchadvisor_stream_listeners": ("Connected decision stream clients.", subscriptions["listeners"]),
+        "launchadvisor_jobs_queued": ("Study jobs waiting to run.", jobs.get("queued", 0)),
+        "launchadvisor_jobs_running": ("Study jobs running.", jobs.get("running", 0)),
+    }
+    return Response(render_metrics(gauges), media_type=CONTENT_TYPE)
+
+
+@app.get("/rules")
+async def get_rules_status():
+    """Version and source of the active rule set, plus the last reload error."""
+    return rules_status()
+
+
+@app.post("/rules/reload")
+async def reload_rule_set():
+    """Re-read RULES_PATH now instead of waiting for the change check."""
+    status = await asyncio.to_thread(reload_rules)
+    if status["error"]:
+        raise HTTPException(status_code=422, detail=status)
+    return status
+
+
+@app.get("/api/space-weather/kp-history")
+async def kp_history(minutes: int = 180):
+    """Recent 1-minute Kp values from the rolling in-memory history."""
+    return {"kp": get_kp_history(minutes)}
+
+
+async def respond_with_decision(
+    place: Place,
+    launch_time_value: str,
+    fields: Optional[str],
+    compact: bool,
+    if_none_match: Optional[str],
+    accept: Optional[str] = None
+) -> Response:
+    """
+    Decide and answer with ETag / Cache-Control headers.
+
+    The ETag fingerprints the cached inputs and rule set (see
+    decision_fingerprint), so a matching If-None-Match gets a 304 without
+    scoring. Decisions made on degraded inputs are sent with no-store.
+    The body is JSON or MessagePack, as negotiated from Accept.
+    """
+    media_type = negotiate(accept)
+    launch_time = parse_time(launch_time_value, "launch_time")
+    selected = parse_fields(fields, compact)
+
+    fingerprint = decision_fingerprint(place, launch_time, selected)
+    if fingerprint is not None:
+        headers = decision_cache_headers(fingerprint, media_type)
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    result, fingerprint = await make_cacheable_decision(place, launch_time, selected)
+    if fingerprint is not None:
+        headers = decision_cache_headers(fingerprint, media_type)
+    else:
+        headers = {"Cache-Control": "no-store"}
+
+    # The decision dict is built by our own code; skip response model validation
+    return encoded_response(result, media_type, headers)
+
+
+def decision_cache_headers(fingerprint: Tuple[str, float], media_type: str = JSON) -> dict[str, str]:
+    """ETag (of the negotiated encoding) plus a max-age that ends when the first cached input goes stale."""
+    etag, fresh_for = fingerprint
+    return {
+        "ETag": representation_etag(etag, media_type),
+        "Cache-Control": f"public, max-age={int(fresh_for)}",
+        "Vary": "Accept",
     }
 
 
 @app.post("/api/decide", response_model=LaunchResponse)
-async def decide_launch(request: LaunchRequest):
+async def decide_launch(
+    request: LaunchRequest,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
+):
     """
     Main endpoint: Determine GO/NO-GO for a launch.
 
@@ -84,28 +416,324 @@ async def decide_launch(request: LaunchRequest):
         "launch_time": "2025-10-05T20:00:00Z"
     }
 
+    Mobile pads and drone ships send "lat" and "lon" instead of site_code;
+    they are judged against the nearest site's limits, and the response
+    adds a location block naming that site.
+
     Returns decision with verdict, risk score, explanation, and rule citations.
+    Pass ?fields=verdict,risk_score (or ?compact=true) to get only those keys;
+    the explanation and echoed data are then never built. Send
+    Accept: application/msgpack for a MessagePack body.
     """
-    try:
-        # Parse launch time
-        launch_time = datetime.fromisoformat(request.launch_time.replace("Z", "+00:00"))
-    except ValueError:
+    place = parse_place(request.site_code, request.lat, request.lon)
+    return await respond_with_decision(place, request.launch_time, fields, compact, if_none_match, accept)
+
+
+@app.get("/api/decide", response_model=LaunchResponse)
+async def decide_launch_get(
+    launch_time: str,
+    site_code: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
+):
+    """Same as POST /api/decide, as a GET that shared HTTP caches can store."""
+    place = parse_place(site_code, lat, lon)
+    return await respond_with_decision(place, launch_time, fields, compact, if_none_match, accept)
+
+
+@app.get("/api/decide/stream")
+async def stream_decisions(
+    subscribe: list[str] = Query(..., description="SITE_CODE@ISO_TIME, repeatable"),
+    fields: Optional[str] = None,
+    compact: bool = False
+):
+    """
+    Server-sent events stream of decisions.
+
+    Example: /api/decide/stream?subscribe=KSC_LC39A@2025-10-05T20:00:00Z&compact=true
+
+    Each subscribed pair's current decision is sent on connect, then again
+    only when its inputs change. Every "decision" event carries
+    {"site_code", "launch_time", "decision"}. All clients watching the same
+    pair share one evaluation per update.
+    """
+    selected = parse_fields(fields, compact)
+    if len(subscribe) > MAX_STREAM_SUBSCRIPTIONS:
         raise HTTPException(
             status_code=400,
-            detail="Invalid launch_time format. Use ISO format: YYYY-MM-DDTHH:MM:SSZ"
+            detail=f"Too many subscriptions ({len(subscribe)}). Maximum is {MAX_STREAM_SUBSCRIPTIONS}."
         )
 
-    # Validate site code
-    if request.site_code not in LAUNCH_SITES:
+    keys = []
+    for item in subscribe:
+        site_code, _, time_value = item.partition("@")
+        validate_site(site_code)
+        key = (site_code, parse_time(time_value, "launch_time"), selected)
+        if key not in keys:
+            keys.append(key)
+
+    hub: DecisionHub = app.state.hub
+
+    async def events():
+        listener = hub.subscribe(keys)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                messages = await listener.next(SUBSCRIPTION_HEARTBEAT_S)
+                if not messages:
+                    yield ": keep-alive\n\n"
+                for message in messages:
+                    yield message
+        finally:
+            hub.unsubscribe(listener)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/sweep")
+async def sweep_launch_window(
+    request: SweepRequest,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Score every slot in a launch window and rank them, best GO slot first.
+
+    Example request:
+    {
+        "site_code": "KSC_LC39A",
+        "start_time": "2025-10-05T00:00:00Z",
+        "end_time": "2025-10-08T00:00:00Z",
+        "step_hours": 1
+    }
+
+    The whole window is fetched with a single Meteomatics time-series query.
+    fields= / compact= select slot fields as for /api/decide.
+
+    Accept: application/msgpack returns the same result as MessagePack.
+    Accept: application/vnd.apache.arrow.stream returns one row per slot in
+    time order, with a rank column (0 = best) and site_code / degraded in
+    the schema metadata.
+    """
+    media_type = negotiate(accept, columnar=True)
+    start = parse_time(request.start_time, "start_time")
+    end = parse_time(request.end_time, "end_time")
+    validate_site(request.site_code)
+    selected = parse_fields(fields, compact)
+
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_time must not be before start_time")
+    if request.step_hours < 1:
+        raise HTTPException(status_code=400, detail="step_hours must be at least 1")
+
+    slot_count = int((end - start).total_seconds() // (request.step_hours * 3600)) + 1
+    if slot_count > MAX_SWEEP_SLOTS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid site_code. Available sites: {', '.join(LAUNCH_SITES.keys())}"
+            detail=f"Sweep too large ({slot_count} slots). Maximum is {MAX_SWEEP_SLOTS}."
+        )
+
+    if media_type == ARROW:
+        sweep = await sweep_columns(request.site_code, start, end, request.step_hours, selected)
+        return arrow_response(
+            sweep["columns"],
+            {"site_code": sweep["site_code"], "degraded": sweep["degraded"]},
+            {"verdict": VERDICTS}
+        )
+    return encoded_response(
+        await sweep_decisions(request.site_code, start, end, request.step_hours, selected), media_type
+    )
+
+
+@app.post("/api/decide/batch")
+async def decide_launch_batch(
+    request: BatchRequest,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Decide many (site or lat/lon, time) pairs in one call.
+
+    Example request:
+    {
+        "requests": [
+            {"site_code": "KSC_LC39A", "launch_time": "2025-10-05T20:00:00Z"},
+            {"lat": 28.5, "lon": -80.9, "launch_time": "2025-10-05T20:00:00Z"}
+        ]
+    }
+
+    Pairs sharing a launch time share one Meteomatics multi-point request and
+    space weather is fetched once per batch. Results keep the request order.
+    fields= / compact= select result fields as for /api/decide.
+
+    Accept: application/msgpack returns the same result as MessagePack;
+    Accept: application/vnd.apache.arrow.stream returns one row per request
+    (nested fields flattened to dotted column names, e.g.
+    data.weather.wind_speed_kn).
+    """
+    media_type = negotiate(accept, columnar=True)
+    selected = parse_fields(fields, compact)
+    if len(request.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large ({len(request.requests)} items). Maximum is {MAX_BATCH_SIZE}."
         )
 
-    # Make decision
-    result = await make_decision(request.site_code, launch_time)
+    pairs = [
+        (parse_place(item.site_code, item.lat, item.lon), parse_time(item.launch_time, "launch_time"))
+        for item in request.requests
+    ]
+
+    results = await decide_batch(pairs, selected)
+    if media_type == ARROW:
+        return arrow_response(columns_from_rows(results))
+    return encoded_response({"results": results}, media_type)
+
+
+def get_job(job_id: str):
+    """The job with this ID, raising a 404 if it is unknown or expired."""
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_study(
+    request: StudyRequest,
+    response: Response,
+    fields: Optional[str] = None,
+    compact: bool = False
+):
+    """
+    Queue a study: every slot of a window, for each site and limit profile.
+
+    Example request:
+    {
+        "sites": ["KSC_LC39A", "VAFB"],
+        "start_time": "2025-10-05T00:00:00Z",
+        "end_time": "2025-11-05T00:00:00Z",
+        "step_hours": 1,
+        "profiles": {"standard": {}, "strict": {"max_wind_kn": 20, "max_cloud_ceiling_ft": 6000}}
+    }
+
+    Profiles override each site's limits (default: one "default" profile
+    with no overrides). fields= / compact= select slot fields as for
+    /api/sweep. Returns the job (202), or the already queued or running job
+    for an identical study (200). Poll GET /api/jobs/{job_id} for progress
+    and read results from GET /api/jobs/{job_id}/results.
+    """
+    start = parse_time(request.start_time, "start_time")
+    end = parse_time(request.end_time, "end_time")
+    selected = parse_fields(fields, compact)
+    sites = request.sites or list(LAUNCH_SITES)
+    for site_code in sites:
+        validate_site(site_code)
+    sites = list(dict.fromkeys(sites))
+
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_time must not be before start_time")
+    if request.step_hours < 1:
+        raise HTTPException(status_code=400, detail="step_hours must be at least 1")
+
+    profiles = request.profiles or {"default": {}}
+    if len(profiles) > JOB_MAX_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Too many profiles. Maximum is {JOB_MAX_PROFILES}.")
+    for name, overrides in profiles.items():
+        check_profile(name, overrides, sites)
+
+    slot_count = int((end - start).total_seconds() // (request.step_hours * 3600)) + 1
+    evaluations = slot_count * len(sites) * len(profiles)
+    if evaluations > JOB_MAX_EVALUATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Study too large ({evaluations} slot evaluations). Maximum is {JOB_MAX_EVALUATIONS}."
+        )
+
+    study = {
+        "sites": sites,
+        "start_time": start,
+        "end_time": end,
+        "step_hours": request.step_hours,
+        "profiles": profiles,
+        "fields": selected,
+    }
+    try:
+        job, joined = app.state.jobs.submit(study)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    if joined:
+        response.status_code = 200
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job.snapshot()
+
+
+@app.get("/api/jobs")
+async def list_jobs():
+    """Every retained job, oldest first, without results."""
+    return {"jobs": [job.snapshot() for job in app.state.jobs.jobs.values()]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    """State and progress of a job."""
+    return get_job(job_id).snapshot()
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; results produced so far are kept."""
+    get_job(job_id)
+    return (await app.state.jobs.cancel(job_id)).snapshot()
+
+
+@app.get("/api/jobs/{job_id}/results")
+async def job_results(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events stream of a job's results.
+
+    One "result" event per (site, profile) as it is produced - {"site_code",
+    "profile", "limits", "verdicts", "best", "slots", "degraded"} - with
+    the result's index as the event ID, so a reconnecting client (sending
+    Last-Event-ID) resumes where it left off. Results already produced are
+    sent first. A final "end" event carries the job status.
+    """
+    job = get_job(job_id)
+    try:
+        sent = int(last_event_id) + 1 if last_event_id else 0
+    except ValueError:
+        sent = 0
+
+    async def events():
+        nonlocal sent
+        yield "retry: 5000\n\n"
+        while True:
+            finished = job.finished
+            while sent < len(job.results):
+                yield f"id: {sent}\nevent: result\ndata: {json.dumps(job.results[sent])}\n\n"
+                sent += 1
+            if finished:
+                yield f"event: end\ndata: {json.dumps(job.snapshot())}\n\n"
+                return
+            await job.wait_for_update(sent, SUBSCRIPTION_HEARTBEAT_S)
+            if sent == len(job.results) and not job.finished:
+                yield ": keep-alive\n\n"
 
-    return result
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 if __name__ == "__main__":
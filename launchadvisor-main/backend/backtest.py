@@ -0,0 +1,405 @@
+"""Backtest the decision rules against archived hourly weather and Kp data.
+
+Weather archives are read from a partitioned directory, one partition per
+site and year:
+
+    <weather_dir>/site_code=KSC_LC39A/year=2015/*.csv (or *.parquet)
+
+with a UTC `time` column and the weather fields decide.py uses
+(wind_speed_kn, precipitation_mm, cloud_ceiling_ft, temperature_c). Kp
+comes from one CSV/Parquet file with `time` and `kp_index` columns (e.g. the
+3-hourly definitive Kp); each hour uses the latest Kp at or before it.
+Conjunction risk is not archived, so every hour is scored as clear.
+
+Each partition is streamed in chunks, scored with score_batch (the same
+rules as /api/decide) in a process pool, and reduced to per-month counts,
+so memory stays flat however much history there is. Parquet needs pyarrow.
+
+Usage (from the backend directory):
+    python backtest.py partition weather.csv data/weather
+    python backtest.py run data/weather --kp data/kp.csv --output backtest.json --csv backtest.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from batch_scoring import score_batch
+from rules import VERDICTS, get_rules
+from sites import LAUNCH_SITES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+WEATHER_FIELDS = ("wind_speed_kn", "precipitation_mm", "cloud_ceiling_ft", "temperature_c")
+
+# Rows per chunk read from an archive file
+CHUNK_ROWS = 100_000
+
+# An hour with no Kp value within this many seconds before it counts as missing
+KP_MAX_AGE_S = 3 * 3600
+
+# Kp at or above this is a geomagnetic storm (same threshold as integrations.swpc)
+STORM_KP = 5
+
+PARTITION_PATTERN = re.compile(r"site_code=([^/\\]+)[/\\]year=(\d{4})$")
+
+# Kp series shared by every task in a worker process (set by _init_worker)
+_kp: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _times_to_seconds(values: Any) -> np.ndarray:
+    """UTC times (ISO strings or datetime64) as int64 Unix seconds."""
+    array = np.asarray(values)
+    if array.dtype.kind in ("U", "S", "O"):
+        array = np.array([str(v).removesuffix("Z").removesuffix("+00:00") for v in array], dtype="datetime64[s]")
+    return array.astype("datetime64[s]").astype(np.int64)
+
+
+def _floats(values: List[str]) -> np.ndarray:
+    """CSV column as float64; empty cells become NaN."""
+    array = np.array(values)
+    return np.where(array == "", "nan", array).astype(np.float64)
+
+
+def _iter_csv(path: str, columns: Tuple[str, ...], chunk_rows: int) -> Iterator[Dict[str, np.ndarray]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"{path} has no column(s) {missing}")
+        indices = [header.index(name) for name in columns]
+
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                return
+            chunk = {}
+            for name, index in zip(columns, indices):
+                values = [row[index] for row in rows]
+                chunk[name] = _times_to_seconds(values) if name == "time" else _floats(values)
+            yield chunk
+
+
+def _iter_parquet(path: str, columns: Tuple[str, ...], chunk_rows: int) -> Iterator[Dict[str, np.ndarray]]:
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError(f"Reading {path} needs pyarrow (pip install pyarrow)")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=list(columns)):
+        chunk = {}
+        for name in columns:
+            column = batch.column(name)
+            if name == "time":
+                if pa.types.is_timestamp(column.type):
+                    column = column.cast(pa.timestamp("s", column.type.tz))
+                chunk[name] = _times_to_seconds(column.to_numpy(zero_copy_only=False))
+            else:
+                chunk[name] = column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        yield chunk
+
+
+def iter_chunks(path: str, columns: Tuple[str, ...], chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream the given columns of a CSV or Parquet file as dicts of arrays."""
+    if path.endswith(".parquet"):
+        return _iter_parquet(path, columns, chunk_rows)
+    return _iter_csv(path, columns, chunk_rows)
+
+
+def load_kp(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Kp archive as (times, kp) sorted by time."""
+    times, values = [], []
+    for chunk in iter_chunks(path, ("time", "kp_index")):
+        times.append(chunk["time"])
+        values.append(chunk["kp_index"])
+    times_array = np.concatenate(times) if times else np.empty(0, dtype=np.int64)
+    values_array = np.concatenate(values) if values else np.empty(0)
+    order = np.argsort(times_array, kind="stable")
+    return times_array[order], values_array[order]
+
+
+def find_partitions(weather_dir: str) -> List[Tuple[str, int, List[str]]]:
+    """(site_code, year, files) for every site_code=*/year=* directory."""
+    partitions = []
+    for directory in sorted(glob.glob(os.path.join(weather_dir, "site_code=*", "year=*"))):
+        match = PARTITION_PATTERN.search(directory)
+        files = sorted(glob.glob(os.path.join(directory, "*.csv")) + glob.glob(os.path.join(directory, "*.parquet")))
+        if match and files:
+            partitions.append((match.group(1), int(match.group(2)), files))
+    return partitions
+
+
+def _init_worker(kp: Optional[Tuple[np.ndarray, np.ndarray]]) -> None:
+    global _kp
+    _kp = kp
+
+
+def _kp_at(times: np.ndarray) -> np.ndarray:
+    """Latest Kp at or before each time; NaN if older than KP_MAX_AGE_S."""
+    kp_times, kp_values = _kp
+    if not len(kp_times):
+        return np.full(len(times), np.nan)
+    index = np.searchsorted(kp_times, times, side="right") - 1
+    clipped = np.maximum(index, 0)
+    fresh = (index >= 0) & (times - kp_times[clipped] <= KP_MAX_AGE_S)
+    return np.where(fresh, kp_values[clipped], np.nan)
+
+
+def backtest_partition(site_code: str, year: int, files: List[str], chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Score one site-year and count outcomes per calendar month.
+
+    Returns dict of arrays indexed by month (1-12; index 0 unused):
+    hours, missing, verdicts (per VERDICTS), risk_sum and citations (hours
+    each rule citation applied), plus site_code and year.
+    """
+    rules = get_rules()
+    limits = rules.site_limits(site_code)
+    counts = {
+        "hours": np.zeros(13, dtype=np.int64),
+        "missing": np.zeros(13, dtype=np.int64),
+        "verdicts": np.zeros((len(VERDICTS), 13), dtype=np.int64),
+        "risk_sum": np.zeros(13, dtype=np.int64),
+        "citations": np.zeros((len(rules.citations), 13), dtype=np.int64),
+    }
+
+    for path in files:
+        for chunk in iter_chunks(path, ("time",) + WEATHER_FIELDS, chunk_rows):
+            times = chunk["time"]
+            month = (times.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64) % 12) + 1
+            in_year = times.astype("datetime64[s]").astype("datetime64[Y]").astype(np.int64) + 1970 == year
+
+            if _kp is not None:
+                kp = _kp_at(times)
+            else:
+                kp = np.zeros(len(times))
+            valid = in_year & ~np.isnan(kp)
+            for field in WEATHER_FIELDS:
+                valid &= ~np.isnan(chunk[field])
+            counts["missing"] += np.bincount(month[in_year & ~valid], minlength=13)
+
+            month = month[valid]
+            inputs = {field: chunk[field][valid] for field in WEATHER_FIELDS}
+            inputs["kp_index"] = kp[valid]
+            inputs["has_solar_storm"] = kp[valid] >= STORM_KP
+            inputs["has_high_risk"] = False
+            inputs["close_approaches"] = 0
+            scored = score_batch(inputs, limits, rules)
+
+            counts["hours"] += np.bincount(month, minlength=13)
+            counts["risk_sum"] += np.bincount(month, weights=scored["risk_score"], minlength=13).astype(np.int64)
+            for code in range(len(VERDICTS)):
+                counts["verdicts"][code] += np.bincount(month[scored["verdict"] == code], minlength=13)
+            for bit in range(len(rules.citations)):
+                applies = (scored["citations"] & np.uint32(1 << bit)) != 0
+                counts["citations"][bit] += np.bincount(month[applies], minlength=13)
+
+    counts["site_code"] = site_code
+    counts["year"] = year
+    return counts
+
+
+def summarize(
+    hours: int,
+    missing: int,
+    verdicts: np.ndarray,
+    risk_sum: int,
+    citations: np.ndarray,
+    citation_labels: List[str]
+) -> Dict[str, Any]:
+    """Availability statistics for one group of hours."""
+    result = {
+        "hours": int(hours),
+        "missing_hours": int(missing),
+        **{verdict.lower().replace("-", "_"): int(verdicts[code]) for code, verdict in enumerate(VERDICTS)},
+        "go_fraction": round(float(verdicts[VERDICTS.index("GO")]) / hours, 4) if hours else None,
+        "mean_risk_score": round(float(risk_sum) / hours, 2) if hours else None,
+    }
+    # Hours each constraint was violated, most limiting first
+    result["limiting_rules"] = {
+        citation_labels[bit]: int(citations[bit])
+        for bit in np.argsort(-citations, kind="stable") if citations[bit]
+    }
+    return result
+
+
+def aggregate(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine partition counts into per-site statistics.
+
+    Returns dict of site_code -> {name, total, by_year, by_month (YYYY-MM),
+    by_calendar_month (MM, all years together)}.
+    """
+    rules = get_rules()
+    sites: Dict[str, Any] = {}
+    for site_code in sorted({r["site_code"] for r in results}):
+        limits = rules.site_limits(site_code) if site_code in LAUNCH_SITES else {}
+        labels = [c["text"].format_map(limits) if limits else c["text"] for c in rules.citations]
+        site_results = sorted((r for r in results if r["site_code"] == site_code), key=lambda r: r["year"])
+
+        def stats(parts: List[Dict[str, Any]], months: Any) -> Dict[str, Any]:
+            return summarize(
+                sum(p["hours"][months].sum() for p in parts),
+                sum(p["missing"][months].sum() for p in parts),
+                sum(p["verdicts"][:, months].reshape(len(VERDICTS), -1).sum(axis=1) for p in parts),
+                sum(p["risk_sum"][months].sum() for p in parts),
+                sum(p["citations"][:, months].reshape(len(labels), -1).sum(axis=1) for p in parts),
+                labels
+            )
+
+        all_months = slice(1, 13)
+        sites[site_code] = {
+            "name": LAUNCH_SITES.get(site_code, {}).get("name"),
+            "total": stats(site_results, all_months),
+            "by_year": {str(r["year"]): stats([r], all_months) for r in site_results},
+            "by_month": {
+                f"{r['year']}-{month:02d}": stats([r], month)
+                for r in site_results for month in range(1, 13) if r["hours"][month] or r["missing"][month]
+            },
+            "by_calendar_month": {f"{month:02d}": stats(site_results, month) for month in range(1, 13)},
+        }
+    return sites
+
+
+def run_backtest(
+    weather_dir: str,
+    kp_path: Optional[str] = None,
+    sites: Optional[List[str]] = None,
+    years: Optional[Tuple[int, int]] = None,
+    workers: Optional[int] = None,
+    chunk_rows: int = CHUNK_ROWS
+) -> Dict[str, Any]:
+    """Score every matching site-year partition in a process pool and aggregate."""
+    started = time.perf_counter()
+    partitions = [
+        (site_code, year, files) for site_code, year, files in find_partitions(weather_dir)
+        if (sites is None or site_code in sites) and (years is None or years[0] <= year <= years[1])
+    ]
+    unknown = sorted({site_code for site_code, _, _ in partitions} - set(LAUNCH_SITES))
+    if unknown:
+        raise ValueError(f"Unknown site codes in {weather_dir}: {unknown}")
+
+    kp = load_kp(kp_path) if kp_path else None
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kp,)) as pool:
+        futures = [pool.submit(backtest_partition, *partition, chunk_rows) for partition in partitions]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    rules = get_rules()
+    return {
+        "rules_version": rules.version,
+        "rules_source": rules.source,
+        "weather_dir": weather_dir,
+        "kp": kp_path or "none (quiet conditions assumed)",
+        "conjunction": "not archived (clear assumed)",
+        "partitions": len(partitions),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "sites": aggregate(results),
+    }
+
+
+def write_csv(report: Dict[str, Any], path: str) -> None:
+    """One row per site and month."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "site_code", "month", "hours", "missing_hours", "go", "marginal", "no_go",
+            "go_fraction", "mean_risk_score"
+        ])
+        for site_code, site in report["sites"].items():
+            for month, stats in site["by_month"].items():
+                writer.writerow([
+                    site_code, month, stats["hours"], stats["missing_hours"], stats["go"],
+                    stats["marginal"], stats["no_go"], stats["go_fraction"], stats["mean_risk_score"]
+                ])
+
+
+def partition_csv(source: str, weather_dir: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Split a flat CSV (time, site_code, weather fields...) into the
+    site_code=*/year=* layout, streaming. Returns the number of rows written.
+    """
+    writers: Dict[Tuple[str, str], Any] = {}
+    files = []
+    written = 0
+    try:
+        with open(source, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            site_index, time_index = header.index("site_code"), header.index("time")
+            for row in reader:
+                key = (row[site_index], row[time_index][:4])
+                writer = writers.get(key)
+                if writer is None:
+                    directory = os.path.join(weather_dir, f"site_code={key[0]}", f"year={key[1]}")
+                    os.makedirs(directory, exist_ok=True)
+                    out = open(os.path.join(directory, "part-0.csv"), "w", newline="", encoding="utf-8")
+                    files.append(out)
+                    writer = writers[key] = csv.writer(out)
+                    writer.writerow(header)
+                writer.writerow(row)
+                written += 1
+    finally:
+        for out in files:
+            out.close()
+    return written
+
+
+def _year_range(value: str) -> Tuple[int, int]:
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest the decision rules against archived data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="score archived hours and write availability statistics")
+    run_cmd.add_argument("weather_dir", help="directory with site_code=*/year=* partitions")
+    run_cmd.add_argument("--kp", help="Kp archive (CSV/Parquet with time, kp_index)")
+    run_cmd.add_argument("--output", default="backtest.json")
+    run_cmd.add_argument("--csv", help="also write per-site monthly rows to this CSV")
+    run_cmd.add_argument("--sites", help="comma-separated site codes (default: all found)")
+    run_cmd.add_argument("--years", type=_year_range, help="e.g. 2015-2024")
+    run_cmd.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    run_cmd.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+
+    partition_cmd = commands.add_parser("partition", help="split a flat weather CSV into site/year partitions")
+    partition_cmd.add_argument("source")
+    partition_cmd.add_argument("weather_dir")
+
+    args = parser.parse_args()
+    if args.command == "partition":
+        rows = partition_csv(args.source, args.weather_dir)
+        print(f"Wrote {rows} rows under {args.weather_dir}")
+        return
+
+    report = run_backtest(
+        args.weather_dir, args.kp, args.sites.split(",") if args.sites else None,
+        args.years, args.workers, args.chunk_rows
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.csv:
+        write_csv(report, args.csv)
+
+    for site_code, site in report["sites"].items():
+        total = site["total"]
+        print(f"{site_code:<14} {total['hours']:>7} h  GO {total['go_fraction'] or 0:6.1%}  "
+              f"mean risk {total['mean_risk_score'] or 0:5.1f}")
+    print(f"{report['partitions']} site-years in {report['elapsed_s']}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
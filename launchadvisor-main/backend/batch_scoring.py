@@ -0,0 +1,195 @@
+"""Vectorized risk scoring for many observations at once.
+
+score_batch() evaluates the same rule set as decide.py (see rules.py), but
+over whole NumPy arrays (struct-of-arrays) in one pass. Results are
+bit-for-bit identical to the scalar evaluator; run this module directly to
+check that:
+
+    python batch_scoring.py
+"""
+from typing import Dict, Any, List, Mapping, Optional, Union
+
+import numpy as np
+
+from rules import VERDICTS, COMPARISONS, RuleSet, condition_terms, get_rules, resolve_operand
+
+ArrayLike = Union[np.ndarray, float, int, bool]
+
+
+def _as_column(value: ArrayLike) -> np.ndarray:
+    """Booleans stay boolean; every numeric input is compared as float64."""
+    array = np.asarray(value)
+    return array if array.dtype == bool else array.astype(np.float64)
+
+
+def _condition(spec: List[Any], ctx: Dict[str, np.ndarray], limits: Dict[str, np.ndarray]) -> np.ndarray:
+    tests = []
+    for term in condition_terms(spec):
+        if len(term) == 1:
+            tests.append(ctx[term[0]].astype(bool))
+        else:
+            field, op, operand = term
+            tests.append(COMPARISONS[op](ctx[field], resolve_operand(operand, limits)))
+    return tests[0] if len(tests) == 1 else np.logical_or.reduce(tests)
+
+
+def score_batch(
+    inputs: Mapping[str, ArrayLike],
+    limits: Mapping[str, ArrayLike],
+    rules: Optional[RuleSet] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Score many observations at once.
+
+    inputs maps each field the rules read (RuleSet.fields) to an array or
+    scalar; limits maps each limit name to a scalar or an array of per-row
+    limits. Everything is broadcast together.
+
+    Returns dict of arrays:
+    - risk_score: int16, 0-100
+    - verdict: int8 index into rules.VERDICTS
+    - citations: uint32 bitmask, bit i set when rules.citations[i] applies
+    """
+    rules = rules or get_rules()
+    ctx = {field: _as_column(inputs[field]) for field in rules.fields}
+    limits = {name: np.asarray(value) for name, value in limits.items()}
+
+    score = np.zeros((), dtype=np.int64)
+    for rule in rules.rules:
+        if rule.get("ratio"):
+            field, limit = rule["ratio"]
+            ctx["ratio"] = ctx[field] / limits[limit]
+        score = score + np.select(
+            [_condition(band["when"], ctx, limits) for band in rule["bands"]],
+            [band.get("points", 0) for band in rule["bands"]],
+            0
+        )
+
+    risk_score = np.minimum(score, rules.max_score).astype(np.int16)
+    verdict = np.select(
+        [risk_score >= v["min_score"] for v in rules.verdicts],
+        [VERDICTS.index(v["verdict"]) for v in rules.verdicts],
+        VERDICTS.index(rules.verdicts[-1]["verdict"])
+    ).astype(np.int8)
+
+    citations = np.zeros(risk_score.shape, dtype=np.uint32)
+    for bit, citation in enumerate(rules.citations):
+        citations |= np.where(_condition(citation["when"], ctx, limits), np.uint32(1 << bit), np.uint32(0))
+
+    return {"risk_score": risk_score, "verdict": verdict, "citations": citations}
+
+
+def citations_from_mask(
+    mask: int,
+    limits: Mapping[str, Any],
+    rules: Optional[RuleSet] = None
+) -> List[str]:
+    """
+    Expand a citation bitmask into citation strings.
+
+    Citation templates are formatted with the limits only, which covers
+    every built-in citation.
+    """
+    rules = rules or get_rules()
+    citations = [
+        citation["text"].format_map(limits)
+        for bit, citation in enumerate(rules.citations) if mask & (1 << bit)
+    ]
+    if not citations:
+        citations.append(rules.nominal_citation)
+    return citations
+
+
+def inputs_from_dicts(
+    weathers: List[Dict[str, Any]],
+    space_weathers: List[Dict[str, Any]],
+    conjunctions: List[Dict[str, Any]],
+    rules: Optional[RuleSet] = None
+) -> Dict[str, np.ndarray]:
+    """Build score_batch inputs from per-row integration dicts."""
+    rules = rules or get_rules()
+    rows = [
+        {**weather, **space_weather, **conjunction}
+        for weather, space_weather, conjunction in zip(weathers, space_weathers, conjunctions)
+    ]
+    return {field: np.array([row[field] for row in rows]) for field in rules.fields}
+
+
+def _thresholds(rules: RuleSet, limits: Dict[str, Any]) -> Dict[str, List[float]]:
+    """Every threshold each input field is compared against, for one set of limits."""
+    found: Dict[str, List[float]] = {field: [] for field in rules.fields}
+    conditions = [
+        (rule.get("ratio"), band["when"]) for rule in rules.rules for band in rule["bands"]
+    ] + [(None, citation["when"]) for citation in rules.citations]
+
+    for ratio, spec in conditions:
+        for term in condition_terms(spec):
+            if len(term) == 1:
+                continue
+            field, _, operand = term
+            threshold = resolve_operand(operand, limits)
+            if field == "ratio":
+                field, threshold = ratio[0], threshold * limits[ratio[1]]
+            found[field].append(float(threshold))
+    return found
+
+
+def check_parity(samples: int = 200_000, seed: int = 0) -> int:
+    """
+    Compare score_batch with the scalar functions in decide.py.
+
+    For each input, values are drawn from every threshold the rules compare
+    it against (the exact value, its adjacent floats and nearby points),
+    plus fully random rows, under every site's limits and a few random
+    limit sets. Returns the number of rows checked and raises
+    AssertionError on the first mismatch.
+    """
+    from decide import calculate_risk_score, determine_verdict, get_rule_citations
+    from sites import LAUNCH_SITES
+
+    rules = get_rules()
+    rng = np.random.default_rng(seed)
+    limit_sets = {tuple(sorted(rules.site_limits(code).items())) for code in LAUNCH_SITES}
+    base = rules.site_limits(next(iter(LAUNCH_SITES)))
+    for _ in range(5):
+        limit_sets.add(tuple(sorted(
+            (name, type(value)(round(value * rng.uniform(0.5, 1.5), 2)))
+            for name, value in base.items()
+        )))
+
+    checked = 0
+    n = samples // len(limit_sets)
+    for limit_items in sorted(limit_sets):
+        limits = dict(limit_items)
+        inputs: Dict[str, np.ndarray] = {}
+        for field, thresholds in _thresholds(rules, limits).items():
+            if not thresholds:
+                inputs[field] = rng.random(n) < 0.2
+                continue
+            spread = max(abs(t) for t in thresholds) * 0.02 or 0.01
+            values = [0.0]
+            for t in thresholds:
+                values += [t, np.nextafter(t, -np.inf), np.nextafter(t, np.inf), t - spread, t + spread]
+            column = rng.choice(np.unique(values), n)
+            # A quarter of the rows are fully random
+            k = n // 4
+            column[:k] = rng.uniform(min(thresholds) - 10 * spread, max(thresholds) * 1.5 + 10 * spread, k)
+            inputs[field] = column
+
+        result = score_batch(inputs, limits, rules)
+        for i in range(n):
+            row = {field: column[i].item() for field, column in inputs.items()}
+            expected = calculate_risk_score(row, {}, {}, limits)
+            assert int(result["risk_score"][i]) == expected, (i, row, limits)
+            assert VERDICTS[result["verdict"][i]] == determine_verdict(expected), (i, expected)
+            assert citations_from_mask(int(result["citations"][i]), limits, rules) == get_rule_citations(
+                row, {}, {}, limits
+            ), (i, row, limits)
+        checked += n
+
+    return checked
+
+
+if __name__ == "__main__":
+    rows = check_parity()
+    print(f"score_batch matches the scalar rules on {rows} rows")
@@ -0,0 +1,9 @@
+"""Offline benchmark suite: stub upstreams, load driver and micro-benchmarks.
+
+Everything runs locally against stand-ins for Meteomatics, SWPC and
+Space-Track (see benchmarks.stubs), so results do not depend on the real
+APIs, credentials or rate limits. From the backend directory:
+
+    python -m benchmarks.run --output results/today.json
+    python -m benchmarks.compare results/before.json results/today.json
+"""
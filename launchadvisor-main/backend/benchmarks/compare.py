@@ -0,0 +1,91 @@
+"""Diff two benchmark result files.
+
+Usage (from the backend directory):
+    python -m benchmarks.compare before.json after.json [--threshold 0.10] [--fail-on-regression]
+
+Timings (*_ms, *_us) and error counts are better when lower, throughput
+(*_rps) when higher. A change worse than the threshold (relative) is
+flagged as a regression.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Any, Optional
+
+# Sections that describe the run rather than measure it
+SKIPPED_SECTIONS = ("meta", "profile")
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by dotted path, e.g. load.cold.p95_ms."""
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if not prefix and key in SKIPPED_SECTIONS:
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def direction(path: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if not a quality metric."""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith("_rps"):
+        return 1
+    if name.endswith(("_ms", "_us")) or name in ("errors", "degraded") or ".upstream_requests" in path:
+        return -1
+    return None
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """
+    Returns dict with:
+    - rows: (path, before, after, relative change, status) for every shared metric
+    - regressions: paths that got worse by more than threshold
+    """
+    old, new = flatten(before), flatten(after)
+    rows = []
+    regressions = []
+    for path in sorted(set(old) & set(new)):
+        a, b = old[path], new[path]
+        change = (b - a) / abs(a) if a else (0.0 if b == a else float("inf"))
+        better = direction(path)
+        status = ""
+        if better is not None and abs(change) > threshold:
+            status = "improved" if change * better > 0 else "REGRESSED"
+            if status == "REGRESSED":
+                regressions.append(path)
+        rows.append((path, a, b, change, status))
+    return {"rows": rows, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change worth flagging")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    result = compare(before, after, args.threshold)
+    width = max((len(row[0]) for row in result["rows"]), default=10)
+    print(f"{'metric':<{width}}  {'before':>12}  {'after':>12}  {'change':>8}")
+    for path, a, b, change, status in result["rows"]:
+        print(f"{path:<{width}}  {a:>12.4g}  {b:>12.4g}  {change:>+8.1%}  {status}")
+
+    if result["regressions"]:
+        print(f"\n{len(result['regressions'])} regression(s) beyond {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
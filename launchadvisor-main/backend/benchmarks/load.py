@@ -0,0 +1,296 @@
+"""Load driver for /api/decide against the stub upstreams.
+
+Starts benchmarks.stubs and the API (uvicorn api:app) as subprocesses, with
+the API's upstream base URLs pointed at the stubs, prefetch disabled and
+the synthetic Space-Track catalog as TLE_CATALOG_PATH. Then runs:
+
+- cold: every request is a (site, time) pair nobody asked for before
+- warm: requests cycle over a few pairs whose inputs are already cached
+- stampede: rounds of many identical concurrent requests for a new pair,
+  checking that each round reaches Meteomatics exactly once
+
+and reports throughput, latency percentiles, errors and how many upstream
+requests each scenario caused.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Tuple
+
+import httpx
+import numpy as np
+
+from integrations.meteomatics import MAX_FORECAST_DAYS, TIME_STEP_S, snap_point
+from sites import LAUNCH_SITES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STARTUP_TIMEOUT_S = 30.0
+
+Pair = Tuple[str, str]  # (site_code, ISO launch time)
+
+
+def _wait_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {STARTUP_TIMEOUT_S}s")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+@contextmanager
+def running_stack(profile: Dict[str, Any], stub_port: int, api_port: int) -> Iterator[Tuple[str, str]]:
+    """Run the stubs and the API; yields (api_url, stub_url)."""
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    api_url = f"http://127.0.0.1:{api_port}"
+    stub_args = [
+        "--port", str(stub_port),
+        "--latency-ms", str(profile["latency_ms"]),
+        "--jitter-ms", str(profile["jitter_ms"]),
+        "--error-rate", str(profile["error_rate"]),
+        "--error-status", str(profile["error_status"]),
+        "--catalog-size", str(profile["catalog_size"]),
+        "--seed", str(profile["seed"]),
+    ]
+    stubs = subprocess.Popen([sys.executable, "-m", "benchmarks.stubs", *stub_args], cwd=BACKEND_DIR)
+    api = None
+    try:
+        _wait_ready(f"{stub_url}/_stats", stubs)
+        with tempfile.TemporaryDirectory(prefix="launchadvisor-bench-") as tmp:
+            # Fetch the catalog the way it would be fetched from Space-Track
+            catalog_path = os.path.join(tmp, "catalog.3le")
+            for _ in range(20):
+                response = httpx.get(
+                    f"{stub_url}/basicspacedata/query/class/gp/DECAY_DATE/null-val/format/3le", timeout=30.0
+                )
+                if response.status_code == 200:
+                    break
+            response.raise_for_status()
+            Path(catalog_path).write_text(response.text)
+            httpx.post(f"{stub_url}/_reset")
+
+            env = {
+                **os.environ,
+                "METEOMATICS_BASE_URL": stub_url,
+                "SWPC_BASE_URL": stub_url,
+                "METEOMATICS_USER": "bench",
+                "METEOMATICS_PASSWORD": "bench",
+                "TLE_CATALOG_PATH": catalog_path,
+                "TLE_STORE_PATH": "",
+                "SHARED_CACHE_PATH": "",
+                "RULES_PATH": "",
+                "PREFETCH_ENABLED": "0",
+                # The stubs have no quota; measure the service, not the rate limits
+                "METEOMATICS_RATE_PER_S": os.getenv("METEOMATICS_RATE_PER_S", "0"),
+                "SWPC_RATE_PER_S": os.getenv("SWPC_RATE_PER_S", "0"),
+            }
+            api = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "api:app", "--port", str(api_port), "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env
+            )
+            _wait_ready(f"{api_url}/sites", api)
+            yield api_url, stub_url
+    finally:
+        if api is not None:
+            _stop(api)
+        _stop(stubs)
+
+
+def summarize(latencies_s: List[float], outcomes: List[str], elapsed_s: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) for one scenario."""
+    ms = np.array(latencies_s) * 1000.0
+    count = len(ms)
+    return {
+        "requests": count,
+        "errors": outcomes.count("error"),
+        "degraded": outcomes.count("degraded"),
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(count / elapsed_s, 1) if elapsed_s > 0 else None,
+        "mean_ms": round(float(ms.mean()), 2) if count else None,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2) if count else None,
+        "p95_ms": round(float(np.percentile(ms, 95)), 2) if count else None,
+        "p99_ms": round(float(np.percentile(ms, 99)), 2) if count else None,
+        "max_ms": round(float(ms.max()), 2) if count else None,
+    }
+
+
+def _difference(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Upstream requests made between two upstream_counts() snapshots."""
+    return {name: after.get(name, 0) - before.get(name, 0) for name in sorted(set(after) | set(before))}
+
+
+class LoadDriver:
+    """Sends /api/decide requests and records latency and upstream traffic."""
+
+    def __init__(self, api_url: str, stub_url: str, concurrency: int):
+        self.api_url = api_url
+        self.stub_url = stub_url
+        self.concurrency = concurrency
+        self.client = httpx.AsyncClient(
+            timeout=60.0, limits=httpx.Limits(max_connections=max(concurrency, 1) * 2)
+        )
+        self._next_slot = 0
+        self._base_time = (datetime.now(timezone.utc) + timedelta(hours=1)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        # Weather is cached per grid cell and model time step, so fresh pairs
+        # use one site per cell and whole time steps within the forecast
+        # horizon (later times would be answered without an upstream call)
+        cells: Dict[Tuple[float, float], str] = {}
+        for site_code, site in LAUNCH_SITES.items():
+            cells.setdefault(snap_point(site["lat"], site["lon"]), site_code)
+        self._sites = list(cells.values())
+        self._max_slots = len(self._sites) * (MAX_FORECAST_DAYS * 86400 // TIME_STEP_S - 1)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def fresh_pairs(self, count: int) -> List[Pair]:
+        """(site, time) pairs whose weather no earlier request in this run has cached."""
+        if self._next_slot + count > self._max_slots:
+            raise ValueError(
+                f"Only {self._max_slots} fresh (site, time) pairs fit in the forecast horizon; "
+                "lower --requests or --stampede-rounds"
+            )
+        pairs = []
+        for _ in range(count):
+            slot = self._next_slot
+            self._next_slot += 1
+            launch_time = self._base_time + timedelta(seconds=slot // len(self._sites) * TIME_STEP_S)
+            pairs.append((self._sites[slot % len(self._sites)], launch_time.strftime("%Y-%m-%dT%H:%M:%SZ")))
+        return pairs
+
+    async def upstream_counts(self) -> Dict[str, int]:
+        stats = (await self.client.get(f"{self.stub_url}/_stats")).json()
+        return {name: entry["requests"] for name, entry in stats.items()}
+
+    async def request(self, pair: Pair, latencies: List[float]) -> str:
+        """POST one decision; returns "ok", "degraded" (an upstream failed) or "error"."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.post(
+                f"{self.api_url}/api/decide", json={"site_code": pair[0], "launch_time": pair[1]}
+            )
+            if response.status_code != 200:
+                outcome = "error"
+            else:
+                outcome = "degraded" if response.json().get("degraded") else "ok"
+        except httpx.HTTPError:
+            outcome = "error"
+        latencies.append(time.perf_counter() - start)
+        return outcome
+
+    async def _measure(self, batches: List[List[Pair]], per_batch: bool = False) -> Dict[str, Any]:
+        """
+        Run batches one after another; requests within a batch are sent
+        together, at most `concurrency` at a time. With per_batch, upstream
+        requests are also counted for each batch (upstream_requests_by_batch).
+        """
+        before = await self.upstream_counts()
+        latencies: List[float] = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def limited(pair: Pair) -> str:
+            async with semaphore:
+                return await self.request(pair, latencies)
+
+        elapsed = 0.0
+        outcomes: List[str] = []
+        by_batch: List[Dict[str, int]] = []
+        counts = before
+        for batch in batches:
+            start = time.perf_counter()
+            outcomes += await asyncio.gather(*(limited(pair) for pair in batch))
+            elapsed += time.perf_counter() - start
+            if per_batch:
+                latest = await self.upstream_counts()
+                by_batch.append(_difference(counts, latest))
+                counts = latest
+
+        after = await self.upstream_counts()
+        result = summarize(latencies, outcomes, elapsed)
+        result["upstream_requests"] = _difference(before, after)
+        if per_batch:
+            result["upstream_requests_by_batch"] = by_batch
+        return result
+
+    async def cold(self, requests: int) -> Dict[str, Any]:
+        return await self._measure([self.fresh_pairs(requests)])
+
+    async def warm(self, requests: int, distinct: int = 20) -> Dict[str, Any]:
+        pairs = self.fresh_pairs(distinct)
+        for pair in pairs:
+            await self.request(pair, [])
+        return await self._measure([[pairs[i % distinct] for i in range(requests)]])
+
+    async def stampede(self, rounds: int) -> Dict[str, Any]:
+        """
+        Each round sends `concurrency` identical requests for a new pair at
+        once; single_flight is True when every round made exactly one
+        Meteomatics request.
+        """
+        result = await self._measure(
+            [[pair] * self.concurrency for pair in self.fresh_pairs(rounds)], per_batch=True
+        )
+        by_round = result.pop("upstream_requests_by_batch")
+        result["rounds"] = rounds
+        result["upstream_requests_per_round"] = {
+            name: round(count / rounds, 2) for name, count in result["upstream_requests"].items()
+        }
+        result["single_flight_rounds"] = sum(counts.get("meteomatics", 0) == 1 for counts in by_round)
+        result["single_flight"] = result["single_flight_rounds"] == rounds
+        return result
+
+
+async def run_scenarios(
+    api_url: str,
+    stub_url: str,
+    requests: int,
+    concurrency: int,
+    stampede_rounds: int
+) -> Dict[str, Any]:
+    driver = LoadDriver(api_url, stub_url, concurrency)
+    try:
+        # Space weather is one global cache entry; fetch it once so the cold
+        # scenario measures per-(site, time) work rather than one shared miss
+        await driver.request(driver.fresh_pairs(1)[0], [])
+        return {
+            "cold": await driver.cold(requests),
+            "warm": await driver.warm(requests),
+            "stampede": await driver.stampede(stampede_rounds),
+        }
+    finally:
+        await driver.close()
+
+
+def run_load(
+    profile: Dict[str, Any],
+    requests: int = 500,
+    concurrency: int = 32,
+    stampede_rounds: int = 10,
+    stub_port: int = 8900,
+    api_port: int = 8901
+) -> Dict[str, Any]:
+    """Start the stack, run the cold / warm / stampede scenarios and stop it again."""
+    with running_stack(profile, stub_port, api_port) as (api_url, stub_url):
+        return asyncio.run(run_scenarios(api_url, stub_url, requests, concurrency, stampede_rounds))
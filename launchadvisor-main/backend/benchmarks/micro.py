@@ -0,0 +1,169 @@
+"""Micro-benchmarks for the scoring, explanation, grid interpolation and encoding hot paths."""
+import json
+import random
+import time
+from typing import Dict, Any, Callable, List
+
+import numpy as np
+
+from batch_scoring import score_batch
+from decide import assess, calculate_risk_score, generate_explanation
+from integrations.meteomatics import WEATHER_KEYS, WeatherTile
+from rules import get_rules, site_limits
+from serialization import ARROW_AVAILABLE, JSON, MSGPACK, MSGPACK_AVAILABLE, encode, encode_arrow
+from sites import LAUNCH_SITES
+
+
+def _inputs(count: int, seed: int) -> List[Dict[str, Dict[str, Any]]]:
+    """Weather / space weather / conjunction dicts spread around the limits."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        rows.append({
+            "weather": {
+                "wind_speed_kn": round(rng.uniform(0, 45), 1),
+                "precipitation_mm": round(rng.choice([0.0, 0.0, rng.uniform(0, 1.5)]), 2),
+                "cloud_ceiling_ft": round(rng.uniform(500, 10000)),
+                "temperature_c": round(rng.uniform(-15, 45), 1),
+            },
+            "space_weather": {
+                "kp_index": rng.choice([1, 2, 3, 4, 5, 6, 7]),
+                "solar_wind_speed": rng.uniform(300, 800),
+                "has_solar_storm": rng.random() < 0.1,
+            },
+            "conjunction": {"has_high_risk": rng.random() < 0.05, "close_approaches": rng.choice([0, 0, 1, 3])},
+        })
+    return rows
+
+
+def _time_per_call(fn: Callable[[], Any], min_time_s: float, repeat: int) -> Dict[str, float]:
+    """Best and median seconds per call over repeat rounds of at least min_time_s each."""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - start >= min_time_s:
+            break
+        calls *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        rounds.append((time.perf_counter() - start) / calls)
+    rounds.sort()
+    return {
+        "best_us": round(rounds[0] * 1e6, 3),
+        "median_us": round(rounds[len(rounds) // 2] * 1e6, 3),
+        "calls_per_round": calls,
+    }
+
+
+def run_micro(min_time_s: float = 0.2, repeat: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """
+    Time the per-decision functions in decide.py and the batch scorer.
+
+    Each benchmark cycles through the same fixed sample of inputs (seeded),
+    so numbers are comparable between runs.
+
+    Returns dict of benchmark name -> best_us / median_us per call
+    (per row for score_batch, per point for grid_sample, per 336-slot
+    sweep for encode_sweep).
+    """
+    rows = _inputs(512, seed)
+    limits = site_limits(next(iter(LAUNCH_SITES)))
+    rules = get_rules()
+
+    def cycling(fn: Callable[[Dict[str, Dict[str, Any]]], Any]) -> Callable[[], Any]:
+        position = [0]
+
+        def call():
+            row = rows[position[0] % len(rows)]
+            position[0] += 1
+            return fn(row)
+        return call
+
+    results = {
+        "calculate_risk_score": _time_per_call(cycling(lambda r: calculate_risk_score(
+            r["weather"], r["space_weather"], r["conjunction"], limits
+        )), min_time_s, repeat),
+        "generate_explanation": _time_per_call(cycling(lambda r: generate_explanation(
+            r["weather"], r["space_weather"], r["conjunction"], limits, 55
+        )), min_time_s, repeat),
+        "assess": _time_per_call(cycling(lambda r: assess(
+            r["weather"], r["space_weather"], r["conjunction"], limits
+        )), min_time_s, repeat),
+        "assess_compact": _time_per_call(cycling(lambda r: assess(
+            r["weather"], r["space_weather"], r["conjunction"], limits,
+            fields=("verdict", "risk_score")
+        )), min_time_s, repeat),
+    }
+
+    batch_rows = 100_000
+    batch_rng = np.random.default_rng(seed)
+    inputs = {
+        "wind_speed_kn": batch_rng.uniform(0, 45, batch_rows),
+        "precipitation_mm": batch_rng.uniform(0, 1.5, batch_rows),
+        "cloud_ceiling_ft": batch_rng.uniform(500, 10000, batch_rows),
+        "temperature_c": batch_rng.uniform(-15, 45, batch_rows),
+        "kp_index": batch_rng.integers(0, 9, batch_rows),
+        "has_solar_storm": batch_rng.random(batch_rows) < 0.1,
+        "has_high_risk": batch_rng.random(batch_rows) < 0.05,
+        "close_approaches": batch_rng.integers(0, 4, batch_rows),
+    }
+    batch = _time_per_call(lambda: score_batch(inputs, limits, rules), min_time_s, repeat)
+    results["score_batch_per_row"] = {
+        "best_us": round(batch["best_us"] / batch_rows, 4),
+        "median_us": round(batch["median_us"] / batch_rows, 4),
+        "rows_per_call": batch_rows,
+    }
+
+    # A one-degree, one-day regional tile at 0.1 degree / hourly resolution
+    tile = WeatherTile(
+        28.0, -81.0, 0.1, 0.0, 3600.0,
+        batch_rng.random((len(WEATHER_KEYS), 25, 11, 11)).astype(np.float32)
+    )
+    points = 1000
+    lats, lons = batch_rng.uniform(28, 29, points), batch_rng.uniform(-81, -80, points)
+    times = batch_rng.uniform(0, 86400, points)
+    results["grid_sample_point"] = _time_per_call(
+        lambda: tile.sample_point(28.5608, -80.5772, 45000.0), min_time_s, repeat
+    )
+    grid = _time_per_call(lambda: tile.sample(lats, lons, times), min_time_s, repeat)
+    results["grid_sample_per_point"] = {
+        "best_us": round(grid["best_us"] / points, 4),
+        "median_us": round(grid["median_us"] / points, 4),
+        "points_per_call": points,
+    }
+
+    # A two-week hourly sweep with every field, as /api/sweep returns it
+    slots = [
+        {"launch_time": f"2025-10-{5 + i // 24:02d}T{i % 24:02d}:00:00+00:00", **assess(
+            r["weather"], r["space_weather"], r["conjunction"], limits
+        )}
+        for i, r in enumerate(rows[:336])
+    ]
+    sweep = {"site_code": "KSC_LC39A", "slots": slots, "best": slots[0], "degraded": {}}
+    results["encode_sweep_stdlib_json"] = _time_per_call(
+        lambda: json.dumps(sweep, ensure_ascii=False, separators=(",", ":")).encode(), min_time_s, repeat
+    )
+    results["encode_sweep_json"] = _time_per_call(lambda: encode(sweep, JSON), min_time_s, repeat)
+    if MSGPACK_AVAILABLE:
+        results["encode_sweep_msgpack"] = _time_per_call(lambda: encode(sweep, MSGPACK), min_time_s, repeat)
+    if ARROW_AVAILABLE:
+        columns = {
+            "launch_time": np.datetime64("2025-10-05T00:00:00") + np.arange(336) * np.timedelta64(1, "h"),
+            "rank": np.arange(336, dtype=np.int32),
+            "verdict": inputs["kp_index"][:336] % 3,
+            "risk_score": inputs["close_approaches"][:336].astype(np.int16),
+            "why": [slot["why"] for slot in slots],
+            "rule_citations": [slot["rule_citations"] for slot in slots],
+            **{name: values[:336] for name, values in inputs.items()},
+        }
+        results["encode_sweep_arrow"] = _time_per_call(
+            lambda: encode_arrow(columns, {"site_code": "KSC_LC39A"}, {"verdict": ("GO", "MARGINAL", "NO-GO")}),
+            min_time_s, repeat
+        )
+    return results
@@ -0,0 +1,89 @@
+"""Run the benchmark suite and save the results as JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.run --output results/run.json
+    python -m benchmarks.run --skip-load --output micro.json
+    python -m benchmarks.run --latency-ms 200 --jitter-ms 80 --error-rate 0.05 --requests 2000 --concurrency 64
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, Any, Optional
+
+from benchmarks.load import BACKEND_DIR, run_load
+from benchmarks.micro import run_micro
+from benchmarks.stubs import add_profile_arguments
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON results")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--requests", type=int, default=500, help="requests per cold / warm scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests (and stampede width)")
+    parser.add_argument("--stampede-rounds", type=int, default=10)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--api-port", type=int, default=8901)
+    parser.add_argument("--micro-min-time", type=float, default=0.2, help="seconds per micro-benchmark round")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    profile = {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "catalog_size": args.catalog_size,
+        "seed": args.seed,
+    }
+    results: Dict[str, Any] = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "profile": profile,
+    }
+
+    if not args.skip_micro:
+        print("Running micro-benchmarks...")
+        results["micro"] = run_micro(args.micro_min_time, seed=args.seed)
+    if not args.skip_load:
+        print("Running load scenarios against stub upstreams...")
+        results["load"] = run_load(
+            profile, args.requests, args.concurrency, args.stampede_rounds,
+            args.stub_port, args.api_port
+        )
+        results["load"]["settings"] = {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stampede_rounds": args.stampede_rounds,
+        }
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({key: results[key] for key in ("micro", "load") if key in results}, indent=2))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Local stand-ins for the Meteomatics, SWPC and Space-Track APIs.
+
+One FastAPI app serves all three on their real URL layouts, so pointing
+METEOMATICS_BASE_URL and SWPC_BASE_URL at it is enough to run the backend
+offline:
+
+- Meteomatics: /{time}/{params}/{lat,lon[+lat,lon...]}/json with a single
+  instant or a start--end:PT{n}H range, and area queries
+  (lat_n,lon_w_lat_s,lon_e:res_lat,res_lon); values are deterministic
+  functions of place and time
+- SWPC: /json/planetary_k_index_1m.json (with ETag / If-None-Match),
+  /products/noaa-planetary-k-index-forecast.json and
+  /products/summary/solar-wind-speed.json
+- Space-Track: /ajaxauth/login and /basicspacedata/query/class/gp/.../format/3le
+  returning a synthetic LEO catalog
+
+Every upstream request waits latency_ms plus an exponentially distributed
+extra delay with mean jitter_ms, and fails with error_status with
+probability error_rate. GET /_stats returns request counts per upstream;
+POST /_reset zeroes them.
+
+Usage (from the backend directory):
+    python -m benchmarks.stubs --port 8900 --latency-ms 80 --jitter-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import math
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+KP_FEED_MINUTES = 360
+KP_FORECAST_OBSERVED_DAYS = 7
+KP_FORECAST_DAYS = 3
+
+# Parameter values for a given place and hour; units match PARAMS in
+# integrations.meteomatics. Precipitation is clipped at zero, so it is dry
+# about half the time
+_VALUE_RANGES = {
+    "wind_speed_10m:ms": (0.0, 20.0),
+    "precip_1h:mm": (-1.0, 1.0),
+    "cloud_base_agl:m": (200.0, 3000.0),
+    "t_2m:C": (-15.0, 45.0),
+}
+
+
+def _value(param: str, lat: float, lon: float, t: datetime) -> float:
+    low, high = _VALUE_RANGES.get(param, (0.0, 1.0))
+    phase = math.sin(lat * 12.9898 + lon * 78.233 + t.timestamp() / 3600.0 * 0.37 + len(param))
+    value = low + (high - low) * (phase + 1.0) / 2.0
+    if param.startswith("precip"):
+        value = max(value, 0.0)
+    return round(value, 2)
+
+
+def _kp(t: datetime) -> float:
+    """Kp at a given time, shared by the 1-minute feed and the 3-hourly product."""
+    return round(2.0 + 1.5 * math.sin(t.timestamp() / 7200.0), 2)
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _times(spec: str) -> List[datetime]:
+    """Instants named by a Meteomatics time spec (instant or start--end:PTnH)."""
+    if "--" not in spec:
+        return [_parse_time(spec)]
+    start, rest = spec.split("--", 1)
+    end, step = rest.rsplit(":", 1)
+    match = re.fullmatch(r"PT(\d+)H", step)
+    if not match:
+        raise ValueError(f"unsupported step {step}")
+    t, end_t, delta = _parse_time(start), _parse_time(end), timedelta(hours=int(match.group(1)))
+    times = []
+    while t <= end_t:
+        times.append(t)
+        t += delta
+    return times
+
+
+def _points(coords: str) -> List[Tuple[float, float]]:
+    """Points named by a Meteomatics coordinate spec (lat,lon[+lat,lon...] or an area)."""
+    if "_" not in coords:
+        return [(float(lat), float(lon)) for lat, lon in (c.split(",") for c in coords.split("+"))]
+    corners, resolution = coords.split(":", 1)
+    north_west, south_east = corners.split("_", 1)
+    lat_n, lon_w = (float(v) for v in north_west.split(","))
+    lat_s, lon_e = (float(v) for v in south_east.split(","))
+    res_lat, res_lon = (float(v) for v in resolution.split(","))
+    n_lat = int(round((lat_n - lat_s) / res_lat)) + 1
+    n_lon = int(round((lon_e - lon_w) / res_lon)) + 1
+    # Rows run north to south, columns west to east
+    return [
+        (round(lat_n - i * res_lat, 6), round(lon_w + j * res_lon, 6))
+        for i in range(n_lat) for j in range(n_lon)
+    ]
+
+
+def _checksum(line: str) -> int:
+    return sum(int(c) if c.isdigit() else 1 if c == "-" else 0 for c in line) % 10
+
+
+def synthetic_catalog(count: int, seed: int = 0, epoch: Optional[datetime] = None) -> str:
+    """
+    A 3le catalog of count objects in low Earth orbit (plus a few higher),
+    with epochs at the given time, in Space-Track's fixed-column layout.
+    """
+    rng = random.Random(seed)
+    epoch = epoch or datetime.now(timezone.utc)
+    day_of_year = epoch.timetuple().tm_yday + (
+        epoch.hour * 3600 + epoch.minute * 60 + epoch.second
+    ) / 86400.0
+    epoch_field = f"{epoch.year % 100:02d}{day_of_year:012.8f}"
+
+    lines = []
+    for i in range(count):
+        norad_id = 10000 + i
+        mean_motion = rng.uniform(11.0, 15.9) if rng.random() < 0.9 else rng.uniform(1.0, 11.0)
+        eccentricity = int(rng.uniform(0.0, 0.02) * 1e7)
+        bstar_mantissa = rng.randint(10000, 99999)
+        line1 = (
+            f"1 {norad_id:05d}U 24001A   {epoch_field}  .00001000  00000-0  "
+            f"{bstar_mantissa:05d}-4 0  999"
+        )
+        line2 = (
+            f"2 {norad_id:05d} {rng.uniform(0, 180):8.4f} {rng.uniform(0, 360):8.4f} "
+            f"{eccentricity:07d} {rng.uniform(0, 360):8.4f} {rng.uniform(0, 360):8.4f} "
+            f"{mean_motion:11.8f}{rng.randint(1, 99999):5d}"
+        )
+        lines += [f"0 BENCH OBJECT {i}", line1 + str(_checksum(line1)), line2 + str(_checksum(line2))]
+    return "\n".join(lines) + "\n"
+
+
+def create_stub_app(
+    latency_ms: float = 50.0,
+    jitter_ms: float = 10.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    catalog_size: int = 2000,
+    seed: int = 0
+) -> FastAPI:
+    """Build the stub app with the given latency / error profile."""
+    app = FastAPI(title="LaunchAdvisor upstream stubs")
+    rng = random.Random(seed)
+    counts: Dict[str, Dict[str, int]] = {}
+    catalog = synthetic_catalog(catalog_size, seed)
+
+    def count(upstream: str, outcome: str) -> None:
+        entry = counts.setdefault(upstream, {"requests": 0, "errors": 0, "not_modified": 0})
+        entry["requests"] += 1
+        if outcome != "ok":
+            entry[outcome] += 1
+
+    async def upstream_delay(upstream: str) -> Optional[Response]:
+        """Sleep for the injected latency; returns an error response to send instead, if any."""
+        delay = latency_ms + (rng.expovariate(1.0 / jitter_ms) if jitter_ms > 0 else 0.0)
+        await asyncio.sleep(delay / 1000.0)
+        if error_rate > 0 and rng.random() < error_rate:
+            count(upstream, "errors")
+            return PlainTextResponse("injected error", status_code=error_status)
+        return None
+
+    @app.get("/_stats")
+    async def stats():
+        return counts
+
+    @app.post("/_reset")
+    async def reset():
+        counts.clear()
+        return {"ok": True}
+
+    @app.get("/json/planetary_k_index_1m.json")
+    async def kp_feed(if_none_match: Optional[str] = Header(None)):
+        error = await upstream_delay("swpc")
+        if error is not None:
+            return error
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        etag = f'"kp-{int(now.timestamp())}"'
+        if if_none_match == etag:
+            count("swpc", "not_modified")
+            return Response(status_code=304, headers={"ETag": etag})
+        count("swpc", "ok")
+        entries = []
+        for minutes_ago in range(KP_FEED_MINUTES - 1, -1, -1):
+            t = now - timedelta(minutes=minutes_ago)
+            kp = _kp(t)
+            entries.append({
+                "time_tag": t.strftime("%Y-%m-%dT%H:%M:%S"),
+                "kp_index": int(kp),
+                "estimated_kp": kp,
+                "kp": f"{int(kp)}P"
+            })
+        return JSONResponse(entries, headers={"ETag": etag})
+
+    @app.get("/products/noaa-planetary-k-index-forecast.json")
+    async def kp_forecast():
+        error = await upstream_delay("swpc")
+        if error is not None:
+            return error
+        count("swpc", "ok")
+        now = datetime.now(timezone.utc)
+        current = now.replace(hour=now.hour - now.hour % 3, minute=0, second=0, microsecond=0)
+        rows: List[List[Any]] = [["time_tag", "kp", "observed", "noaa_scale"]]
+        for step in range(-KP_FORECAST_OBSERVED_DAYS * 8, KP_FORECAST_DAYS * 8):
+            t = current + timedelta(hours=3 * step)
+            kind = "observed" if step < 0 else "estimated" if step == 0 else "predicted"
+            rows.append([t.strftime("%Y-%m-%d %H:%M:%S"), f"{_kp(t):.2f}", kind, None])
+        return rows
+
+    @app.get("/products/summary/solar-wind-speed.json")
+    async def solar_wind():
+        error = await upstream_delay("swpc")
+        if error is not None:
+            return error
+        count("swpc", "ok")
+        now = datetime.now(timezone.utc)
+        return {"WindSpeed": str(400 + int(now.timestamp() / 60) % 200), "TimeStamp": now.strftime("%Y-%m-%d %H:%M:%S")}
+
+    @app.post("/ajaxauth/login")
+    async def spacetrack_login():
+        error = await upstream_delay("spacetrack")
+        if error is not None:
+            return error
+        count("spacetrack", "ok")
+        return PlainTextResponse('""', headers={"Set-Cookie": "chocolatechip=bench; Path=/"})
+
+    @app.get("/basicspacedata/query/{query:path}")
+    async def spacetrack_query(query: str):
+        error = await upstream_delay("spacetrack")
+        if error is not None:
+            return error
+        count("spacetrack", "ok")
+        if not query.rstrip("/").endswith(("format/3le", "format/tle")):
+            return PlainTextResponse("only format/3le and format/tle are stubbed", status_code=400)
+        if query.rstrip("/").endswith("format/tle"):
+            return PlainTextResponse("\n".join(
+                line for line in catalog.splitlines() if not line.startswith("0 ")
+            ) + "\n")
+        return PlainTextResponse(catalog)
+
+    @app.get("/{time_spec}/{params}/{coords}/json")
+    async def meteomatics(time_spec: str, params: str, coords: str):
+        error = await upstream_delay("meteomatics")
+        if error is not None:
+            return error
+        try:
+            times = _times(time_spec)
+            points = _points(coords)
+        except ValueError as e:
+            count("meteomatics", "errors")
+            return PlainTextResponse(str(e), status_code=400)
+        count("meteomatics", "ok")
+        data = [{
+            "parameter": param,
+            "coordinates": [{
+                "lat": lat,
+                "lon": lon,
+                "dates": [
+                    {"date": t.strftime("%Y-%m-%dT%H:%M:%SZ"), "value": _value(param, lat, lon, t)}
+                    for t in times
+                ]
+            } for lat, lon in points]
+        } for param in params.split(",")]
+        return {"version": "3.0", "user": "bench", "dateGenerated": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "status": "OK", "data": data}
+
+    return app
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency / error profile options shared by the stub server and the load driver."""
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="base upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="mean extra (exponential) latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--catalog-size", type=int, default=2000, help="objects in the synthetic TLE catalog")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve stand-ins for the upstream APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        args.latency_ms, args.jitter_ms, args.error_rate, args.error_status,
+        args.catalog_size, args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,52 @@
 """Decision logic for launch go/no-go determination."""
-from typing import Dict, Any, List
-from datetime import datetime
-from sites import LAUNCH_SITES
-from integrations.meteomatics import get_weather
-from integrations.swpc import get_space_weather
-from integrations.spacetrack import get_conjunction_risk
+import asyncio
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional, Collection, Union
+from datetime import datetime, timezone
+from sites import LAUNCH_SITES, SITE_INDEX
+from rules import get_rules, site_limits
+from batch_scoring import VERDICTS, score_batch, inputs_from_dicts, citations_from_mask
+from integrations.meteomatics import (
+    get_weather, get_weather_multi, get_weather_series, series_times, default_weather,
+    weather_version
+)
+from integrations.swpc import (
+    get_space_weather, get_space_weather_series, default_space_weather, space_weather_version
+)
+from integrations.spacetrack import (
+    get_conjunction_risk, get_conjunction_risks, default_conjunction, conjunction_version
+)
+from integrations.metrics import SOURCE_OUTCOMES, observe_stage, timed
+from integrations.scheduler import BULK, upstream_priority
+
+# Overall time allowed for gathering inputs for one decision (seconds)
+DECISION_DEADLINE_S = float(os.getenv("DECISION_DEADLINE_S", "8"))
+
+# Per-source budgets (seconds); a source that misses its budget is replaced
+# by its safe defaults and reported under "degraded"
+SOURCE_BUDGETS_S = {
+    "weather": float(os.getenv("WEATHER_BUDGET_S", "6")),
+    "space_weather": float(os.getenv("SPACE_WEATHER_BUDGET_S", "4")),
+    "conjunction": float(os.getenv("CONJUNCTION_BUDGET_S", "2")),
+}
+
+# Ad-hoc points (mobile pads, drone ships) within this distance of a known
+# site are decided at the site's coordinates, sharing its cached and
+# prefetched inputs; farther points only borrow the nearest site's limits
+SITE_MATCH_KM = float(os.getenv("SITE_MATCH_KM", "2"))
+
+# A site code, or (lat, lon) for an ad-hoc point
+Place = Union[str, Tuple[float, float]]
+
+# Keys a decision can contain; callers may ask for a subset to skip building
+# the explanation and echoing the input data ("location" is only set for
+# ad-hoc points)
+DECISION_FIELDS = ("verdict", "risk_score", "why", "rule_citations", "degraded", "data", "location")
+COMPACT_FIELDS = ("verdict", "risk_score")
 
 
 def calculate_risk_score(
@@ -18,73 +60,12 @@ def calculate_risk_score(
     0 = perfect conditions
     100 = highly unfavorable
     """
-    score = 0
-
-    # Weather risk factors
-    wind_ratio = weather["wind_speed_kn"] / limits["max_wind_kn"]
-    if wind_ratio >= 1:
-        score += 40
-    elif wind_ratio >= 0.8:
-        score += 20
-    elif wind_ratio >= 0.6:
-        score += 10
-
-    # Precipitation - severe penalty for exceeding limits
-    precip_ratio = weather["precipitation_mm"] / limits["max_precipitation_mm"]
-    if precip_ratio >= 5:  # 5x over limit = scrub
-        score += 50
-    elif precip_ratio >= 2:  # 2x over limit = high risk
-        score += 35
-    elif precip_ratio >= 1:  # Over limit
-        score += 25
-    elif precip_ratio >= 0.7:  # Approaching limit
-        score += 15
-
-    # Cloud ceiling - lower clouds = higher risk
-    if weather["cloud_ceiling_ft"] < 1000:  # Very low clouds
-        score += 40
-    elif weather["cloud_ceiling_ft"] < 2000:
-        score += 30
-    elif weather["cloud_ceiling_ft"] < 3000:
-        score += 20
-    elif weather["cloud_ceiling_ft"] < limits["max_cloud_ceiling_ft"]:
-        score += 10
-
-    temp = weather["temperature_c"]
-    if temp > limits["max_temp_c"] or temp < limits["min_temp_c"]:
-        score += 25
-    elif temp > limits["max_temp_c"] - 5 or temp < limits["min_temp_c"] + 5:
-        score += 10
-
-    # Space weather risk
-    kp = space_weather["kp_index"]
-    if kp >= 7:
-        score += 30
-    elif kp >= 5:
-        score += 15
-    elif kp >= 3:
-        score += 5
-
-    if space_weather["has_solar_storm"]:
-        score += 20
-
-    # Conjunction risk
-    if conjunction["has_high_risk"]:
-        score += 40
-    elif conjunction["close_approaches"] > 0:
-        score += 10
-
-    return min(score, 100)
+    return get_rules().evaluate(weather, space_weather, conjunction, limits)["risk_score"]
 
 
 def determine_verdict(risk_score: int) -> str:
     """Determine GO/NO-GO/MARGINAL verdict based on risk score."""
-    if risk_score >= 70:
-        return "NO-GO"
-    elif risk_score >= 40:
-        return "MARGINAL"
-    else:
-        return "GO"
+    return get_rules().verdict(risk_score)
 
 
 def generate_explanation(
@@ -95,97 +76,7 @@ def generate_explanation(
     risk_score: int
 ) -> str:
     """Generate detailed human-readable explanation of the decision."""
-    sections = []
-
-    # Always show weather conditions
-    weather_details = []
-
-    # Wind analysis
-    wind_ratio = weather["wind_speed_kn"] / limits["max_wind_kn"]
-    if wind_ratio >= 1:
-        weather_details.append(f"🌪️ Wind: {weather['wind_speed_kn']:.1f} kn (EXCEEDS limit of {limits['max_wind_kn']} kn)")
-    elif wind_ratio >= 0.8:
-        weather_details.append(f"💨 Wind: {weather['wind_speed_kn']:.1f} kn (approaching limit of {limits['max_wind_kn']} kn)")
-    else:
-        weather_details.append(f"✅ Wind: {weather['wind_speed_kn']:.1f} kn (nominal, limit {limits['max_wind_kn']} kn)")
-
-    # Precipitation analysis
-    precip_ratio = weather["precipitation_mm"] / limits["max_precipitation_mm"]
-    if precip_ratio >= 5:
-        weather_details.append(f"⛈️ Precipitation: {weather['precipitation_mm']:.1f} mm (CRITICAL - {precip_ratio:.1f}x over {limits['max_precipitation_mm']} mm limit)")
-    elif precip_ratio >= 2:
-        weather_details.append(f"🌧️ Precipitation: {weather['precipitation_mm']:.1f} mm (HIGH RISK - {precip_ratio:.1f}x over {limits['max_precipitation_mm']} mm limit)")
-    elif precip_ratio >= 1:
-        weather_details.append(f"🌦️ Precipitation: {weather['precipitation_mm']:.1f} mm (exceeds {limits['max_precipitation_mm']} mm limit)")
-    elif precip_ratio >= 0.7:
-        weather_details.append(f"🌂 Precipitation: {weather['precipitation_mm']:.1f} mm (approaching {limits['max_precipitation_mm']} mm limit)")
-    else:
-        weather_details.append(f"✅ Precipitation: {weather['precipitation_mm']:.1f} mm (nominal, limit {limits['max_precipitation_mm']} mm)")
-
-    # Cloud ceiling analysis
-    if weather["cloud_ceiling_ft"] < 1000:
-        weather_details.append(f"☁️ Cloud Ceiling: {weather['cloud_ceiling_ft']:.0f} ft (VERY LOW - limit {limits['max_cloud_ceiling_ft']} ft)")
-    elif weather["cloud_ceiling_ft"] < 2000:
-        weather_details.append(f"🌥️ Cloud Ceiling: {weather['cloud_ceiling_ft']:.0f} ft (LOW - limit {limits['max_cloud_ceiling_ft']} ft)")
-    elif weather["cloud_ceiling_ft"] < limits["max_cloud_ceiling_ft"]:
-        weather_details.append(f"⛅ Cloud Ceiling: {weather['cloud_ceiling_ft']:.0f} ft (below {limits['max_cloud_ceiling_ft']} ft limit)")
-    else:
-        weather_details.append(f"✅ Cloud Ceiling: {weather['cloud_ceiling_ft']:.0f} ft (nominal, limit {limits['max_cloud_ceiling_ft']} ft)")
-
-    # Temperature analysis
-    temp = weather["temperature_c"]
-    if temp > limits["max_temp_c"]:
-        weather_details.append(f"🌡️ Temperature: {temp:.1f}°C (EXCEEDS upper limit {limits['max_temp_c']}°C)")
-    elif temp < limits["min_temp_c"]:
-        weather_details.append(f"🥶 Temperature: {temp:.1f}°C (BELOW lower limit {limits['min_temp_c']}°C)")
-    elif temp > limits["max_temp_c"] - 5:
-        weather_details.append(f"🔥 Temperature: {temp:.1f}°C (approaching upper limit {limits['max_temp_c']}°C)")
-    elif temp < limits["min_temp_c"] + 5:
-        weather_details.append(f"❄️ Temperature: {temp:.1f}°C (approaching lower limit {limits['min_temp_c']}°C)")
-    else:
-        weather_details.append(f"✅ Temperature: {temp:.1f}°C (nominal, range {limits['min_temp_c']}-{limits['max_temp_c']}°C)")
-
-    sections.append("WEATHER CONDITIONS:\n" + "\n".join(weather_details))
-
-    # Space weather analysis
-    space_details = []
-    kp = space_weather["kp_index"]
-    if kp >= 7:
-        space_details.append(f"⚠️ Kp Index: {kp:.0f} (SEVERE geomagnetic storm)")
-    elif kp >= 5:
-        space_details.append(f"🌩️ Kp Index: {kp:.0f} (Geomagnetic storm active)")
-    elif kp >= 3:
-        space_details.append(f"⚡ Kp Index: {kp:.0f} (Unsettled conditions)")
-    else:
-        space_details.append(f"✅ Kp Index: {kp:.0f} (Quiet)")
-
-    if space_weather["has_solar_storm"]:
-        space_details.append(f"☀️ Solar Activity: ACTIVE STORM DETECTED")
-    else:
-        space_details.append(f"✅ Solar Activity: Normal")
-
-    sections.append("\nSPACE WEATHER:\n" + "\n".join(space_details))
-
-    # Conjunction/debris analysis
-    if conjunction["has_high_risk"]:
-        sections.append("\n🛰️ DEBRIS RISK: HIGH - Close approach detected")
-    elif conjunction["close_approaches"] > 0:
-        sections.append(f"\n🛰️ DEBRIS RISK: {conjunction['close_approaches']} tracked object(s) nearby")
-    else:
-        sections.append("\n✅ DEBRIS RISK: Clear")
-
-    # Overall assessment
-    verdict_text = ""
-    if risk_score >= 70:
-        verdict_text = f"\n\n❌ RECOMMENDATION: NO-GO (Risk Score: {risk_score}/100)\nConditions are unsafe for launch. Multiple critical parameters exceeded."
-    elif risk_score >= 40:
-        verdict_text = f"\n\n⚠️ RECOMMENDATION: MARGINAL (Risk Score: {risk_score}/100)\nSome parameters of concern. Monitor closely and proceed with caution."
-    else:
-        verdict_text = f"\n\n✅ RECOMMENDATION: GO (Risk Score: {risk_score}/100)\nAll parameters within acceptable limits for launch."
-
-    sections.append(verdict_text)
-
-    return "\n".join(sections)
+    return get_rules().compiled(limits).explain(weather, space_weather, conjunction, risk_score)
 
 
 def get_rule_citations(
@@ -195,70 +86,620 @@ def get_rule_citations(
     limits: Dict[str, Any]
 ) -> List[str]:
     """Generate list of applicable rule citations."""
-    citations = []
+    return get_rules().evaluate(weather, space_weather, conjunction, limits)["rule_citations"]
 
-    if weather["cloud_ceiling_ft"] < limits["max_cloud_ceiling_ft"]:
-        citations.append("NASA-STD-4010A §4.1.8 (Thick Cloud Layers)")
 
-    if weather["wind_speed_kn"] > limits["max_wind_kn"] * 0.8:
-        citations.append(f"Vehicle SOP: Pad Wind Limit {limits['max_wind_kn']} kn")
+def unknown_site(site_code: str) -> Dict[str, Any]:
+    """Decision returned for a site code that is not in LAUNCH_SITES."""
+    return {
+        "verdict": "ERROR",
+        "risk_score": 100,
+        "why": f"Unknown launch site: {site_code}",
+        "rule_citations": []
+    }
+
+
+def locate(place: Place) -> Optional[Dict[str, Any]]:
+    """
+    Where a decision is evaluated and under which limits.
+
+    Returns dict with:
+    - lat, lon: coordinates the inputs are fetched for
+    - limits: effective limits (the nearest site's for ad-hoc points)
+    - site_code: the site whose inputs are shared, or None
+    - nearest_site, distance_km: for ad-hoc points only
+    Returns None for an unknown site code.
+    """
+    if isinstance(place, str):
+        site = LAUNCH_SITES.get(place)
+        if site is None:
+            return None
+        return {"lat": site["lat"], "lon": site["lon"], "limits": site_limits(place), "site_code": place}
+
+    lat, lon = place
+    nearest, distance_km = SITE_INDEX.nearest(lat, lon)
+    matched = distance_km <= SITE_MATCH_KM
+    site = LAUNCH_SITES[nearest]
+    return {
+        "lat": site["lat"] if matched else lat,
+        "lon": site["lon"] if matched else lon,
+        "limits": site_limits(nearest),
+        "site_code": nearest if matched else None,
+        "nearest_site": nearest,
+        "distance_km": round(distance_km, 3),
+    }
+
+
+# Number of decisions currently gathering inputs; background prefetch
+# yields while this is non-zero
+_active_decisions = 0
 
-    if weather["precipitation_mm"] > limits["max_precipitation_mm"] * 0.5:
-        citations.append("NASA-STD-4010A §4.1.10 (Precipitation)")
 
-    if space_weather["kp_index"] >= 5:
-        citations.append("SWPC Kp advisory - Geomagnetic Storm Watch")
+def active_decisions() -> int:
+    """How many decisions are gathering upstream inputs right now."""
+    return _active_decisions
 
-    if conjunction["has_high_risk"]:
-        citations.append("COLA (Collision Avoidance) Analysis - High Risk")
 
-    if not citations:
-        citations.append("All parameters nominal")
+def _source_error(value: Any) -> Any:
+    """Return the integration error carried by a result (or list of results), if any."""
+    if isinstance(value, dict):
+        return value.get("error")
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict) and item.get("error"):
+                return item["error"]
+    return None
 
-    return citations
 
+async def gather_sources(
+    calls: Dict[str, Awaitable[Any]],
+    fallbacks: Dict[str, Callable[[], Any]]
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Await independent upstream calls concurrently under one deadline.
+
+    Each call gets the budget for its source in SOURCE_BUDGETS_S (calls are
+    named "<source>" or "<source>:<detail>"), and everything still running
+    at DECISION_DEADLINE_S is cancelled. Calls that time out, raise, or
+    return an integration error are reported in the degraded dict; timed-out
+    or failed calls are replaced by their fallback value.
 
-async def make_decision(site_code: str, launch_time: datetime) -> Dict[str, Any]:
+    Returns (values, degraded) keyed by call name.
+    """
+    global _active_decisions
+    _active_decisions += 1
+    try:
+        return await _gather_sources(calls, fallbacks)
+    finally:
+        _active_decisions -= 1
+
+
+def _record_source_time(source: str, start: float) -> Callable[[asyncio.Future], None]:
+    """Done-callback that records how long a source took (hit, fetch or timeout)."""
+    return lambda task: observe_stage(source, time.perf_counter() - start)
+
+
+async def _gather_sources(
+    calls: Dict[str, Awaitable[Any]],
+    fallbacks: Dict[str, Callable[[], Any]]
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    start = time.perf_counter()
+    tasks = {
+        name: asyncio.ensure_future(asyncio.wait_for(
+            call,
+            min(SOURCE_BUDGETS_S.get(name.split(":")[0], DECISION_DEADLINE_S), DECISION_DEADLINE_S)
+        ))
+        for name, call in calls.items()
+    }
+    for name, task in tasks.items():
+        task.add_done_callback(_record_source_time(name.split(":")[0], start))
+    done, pending = await asyncio.wait(tasks.values(), timeout=DECISION_DEADLINE_S)
+    for task in pending:
+        task.cancel()
+
+    values: Dict[str, Any] = {}
+    degraded: Dict[str, str] = {}
+    for name, task in tasks.items():
+        source = name.split(":")[0]
+        if task in done and task.exception() is None:
+            values[name] = task.result()
+            error = _source_error(values[name])
+            if error:
+                degraded[name] = f"error: {error}"
+            SOURCE_OUTCOMES.inc(source, "error" if error else "ok")
+            continue
+
+        values[name] = fallbacks[name]()
+        if task not in done:
+            degraded[name] = f"deadline of {DECISION_DEADLINE_S:g}s exceeded"
+            SOURCE_OUTCOMES.inc(source, "deadline")
+        elif isinstance(task.exception(), asyncio.TimeoutError):
+            budget = SOURCE_BUDGETS_S.get(source, DECISION_DEADLINE_S)
+            degraded[name] = f"timeout after {budget:g}s budget"
+            SOURCE_OUTCOMES.inc(source, "timeout")
+        else:
+            degraded[name] = f"error: {task.exception()}"
+            SOURCE_OUTCOMES.inc(source, "error")
+
+    return values, degraded
+
+
+async def make_decision(
+    place: Place,
+    launch_time: datetime,
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
     """
     Main decision function - determines GO/NO-GO for a launch.
 
     Args:
-        site_code: Launch site code (e.g., "KSC", "VAFB")
+        place: Launch site code (e.g., "KSC", "VAFB") or (lat, lon)
         launch_time: Proposed launch datetime
+        fields: Subset of DECISION_FIELDS to return (default: all)
 
     Returns:
-        Decision dict with verdict, risk_score, explanation, and rule_citations
+        Decision dict with verdict, risk_score, explanation, rule_citations
+        and degraded (sources that failed or missed their time budget);
+        decisions for (lat, lon) also carry location
     """
-    if site_code not in LAUNCH_SITES:
-        return {
-            "verdict": "ERROR",
-            "risk_score": 100,
-            "why": f"Unknown launch site: {site_code}",
-            "rule_citations": []
+    location = locate(place)
+    if location is None:
+        return unknown_site(place)
+
+    lat, lon = location["lat"], location["lon"]
+
+    # Gather data from all sources concurrently
+    values, degraded = await gather_sources(
+        {
+            "weather": get_weather(lat, lon, launch_time),
+            "space_weather": get_space_weather(launch_time),
+            "conjunction": get_conjunction_risk(lat, lon, launch_time),
+        },
+        {
+            "weather": default_weather,
+            "space_weather": default_space_weather,
+            "conjunction": default_conjunction,
+        }
+    )
+
+    decision = assess(
+        values["weather"], values["space_weather"], values["conjunction"], location["limits"],
+        degraded, fields
+    )
+    return add_location(decision, place, location, fields)
+
+
+def add_location(
+    decision: Dict[str, Any],
+    place: Place,
+    location: Dict[str, Any],
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """Add the location field to a decision for an ad-hoc (lat, lon) point."""
+    if not isinstance(place, str) and (fields is None or "location" in fields):
+        decision["location"] = {
+            "lat": place[0],
+            "lon": place[1],
+            "nearest_site": location["nearest_site"],
+            "distance_km": location["distance_km"],
+            "shares_site_data": location["site_code"] is not None,
         }
+    return decision
 
-    site = LAUNCH_SITES[site_code]
-    limits = site["limits"]
 
-    # Gather data from all sources
-    weather = await get_weather(site["lat"], site["lon"], launch_time)
-    space_weather = await get_space_weather()
-    conjunction = await get_conjunction_risk(site["lat"], site["lon"], launch_time)
+def decision_fingerprint(
+    place: Place,
+    launch_time: datetime,
+    fields: Optional[Collection[str]] = None
+) -> Optional[Tuple[str, float]]:
+    """
+    Strong ETag for the decision make_decision would return right now.
 
-    # Calculate risk and make decision
-    risk_score = calculate_risk_score(weather, space_weather, conjunction, limits)
-    verdict = determine_verdict(risk_score)
-    explanation = generate_explanation(weather, space_weather, conjunction, limits, risk_score)
-    citations = get_rule_citations(weather, space_weather, conjunction, limits)
+    The decision is a pure function of the cached inputs, the rule set and
+    the site limits, so it is fingerprinted from the cache versions
+    (stored_at, or changed_at for space weather) of its three inputs plus
+    the rules version, without scoring anything.
 
-    return {
-        "verdict": verdict,
-        "risk_score": risk_score,
-        "why": explanation,
-        "rule_citations": citations,
-        "data": {
+    Returns (etag, seconds until the first input goes stale), or None when
+    an input is not cached and the decision would have to fetch it.
+    """
+    location = locate(place)
+    if location is None:
+        return None
+    versions = [
+        weather_version(location["lat"], location["lon"], launch_time),
+        space_weather_version(),
+        conjunction_version(location["lat"], location["lon"], launch_time),
+    ]
+    if any(version is None for version in versions):
+        return None
+
+    rules = get_rules()
+    digest = hashlib.sha1(json.dumps([
+        place,
+        launch_time.isoformat(),
+        sorted(set(fields)) if fields is not None else None,
+        rules.version,
+        sorted(location["limits"].items()),
+        [stored_at for stored_at, _ in versions],
+    ]).encode()).hexdigest()
+    return f'"{digest[:32]}"', min(fresh_for for _, fresh_for in versions)
+
+
+async def make_cacheable_decision(
+    place: Place,
+    launch_time: datetime,
+    fields: Optional[Collection[str]] = None
+) -> Tuple[Dict[str, Any], Optional[Tuple[str, float]]]:
+    """
+    make_decision plus the fingerprint of the inputs it was made from.
+
+    Returns (decision, fingerprint). The fingerprint is None when any input
+    was degraded (safe defaults are never cacheable) or is not cached.
+    """
+    # degraded is always computed so we know whether the result may be cached
+    wanted = None if fields is None else tuple(fields)
+    if wanted is not None and "degraded" not in wanted:
+        wanted += ("degraded",)
+    decision = await make_decision(place, launch_time, wanted)
+    degraded = decision["degraded"] if fields is None or "degraded" in fields else decision.pop("degraded")
+
+    if degraded:
+        return decision, None
+    return decision, decision_fingerprint(place, launch_time, fields)
+
+
+def assess(
+    weather: Dict[str, Any],
+    space_weather: Dict[str, Any],
+    conjunction: Dict[str, Any],
+    limits: Dict[str, Any],
+    degraded: Optional[Dict[str, str]] = None,
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """Score already-fetched inputs and build the decision dict."""
+    fields = DECISION_FIELDS if fields is None else fields
+    rules = get_rules().compiled(limits)
+    with timed("scoring"):
+        scored = rules.score(weather, space_weather, conjunction)
+    with timed("explanation"):
+        evaluation = rules.describe(scored, explain="why" in fields, cite="rule_citations" in fields)
+        return build_decision(weather, space_weather, conjunction, evaluation, degraded, fields)
+
+
+def _with_climatology_note(explanation: str, weather: Dict[str, Any]) -> str:
+    """The explanation, followed by a note when weather is climatology rather than a forecast."""
+    if weather.get("source") != "climatology":
+        return explanation
+    climatology = weather["climatology"]
+    first_year, last_year = climatology["years"]
+    return explanation + (
+        "\n\n📊 CLIMATOLOGY: no forecast this far ahead; weather is the median for this date and hour "
+        f"at {climatology['site_code']} ({first_year}-{last_year})"
+    )
+
+
+def _with_degraded_note(explanation: str, degraded: Dict[str, str]) -> str:
+    """The explanation, followed by the sources that fell back to safe defaults."""
+    if not degraded:
+        return explanation
+    return explanation + "\n\n⚠️ DEGRADED INPUTS (safe defaults used):\n" + "\n".join(
+        f"- {source}: {reason}" for source, reason in degraded.items()
+    )
+
+
+def build_decision(
+    weather: Dict[str, Any],
+    space_weather: Dict[str, Any],
+    conjunction: Dict[str, Any],
+    evaluation: Dict[str, Any],
+    degraded: Optional[Dict[str, str]] = None,
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """
+    Build the decision dict from a rule evaluation (risk_score, verdict and,
+    when those fields are wanted, why and rule_citations).
+    """
+    fields = DECISION_FIELDS if fields is None else fields
+    degraded = degraded or {}
+    decision: Dict[str, Any] = {}
+
+    if "verdict" in fields:
+        decision["verdict"] = evaluation["verdict"]
+    if "risk_score" in fields:
+        decision["risk_score"] = evaluation["risk_score"]
+    if "why" in fields:
+        decision["why"] = _with_degraded_note(_with_climatology_note(evaluation["why"], weather), degraded)
+    if "rule_citations" in fields:
+        decision["rule_citations"] = evaluation["rule_citations"]
+    if "degraded" in fields:
+        decision["degraded"] = degraded
+    if "data" in fields:
+        decision["data"] = {
             "weather": weather,
             "space_weather": space_weather,
             "conjunction": conjunction
         }
+    return decision
+
+
+async def window_inputs(
+    site_code: str,
+    start: datetime,
+    end: datetime,
+    step_hours: int,
+    conjunctions: bool = True
+) -> Dict[str, Any]:
+    """
+    Gather every input a sweep window needs for one site.
+
+    Conjunctions for every slot are screened in one call, under the
+    conjunction budget. With conjunctions=False they are left for the
+    caller to screen (conjunctions is None).
+
+    Returns dict with: slot_times (ISO strings), weathers, space_weathers,
+    conjunctions (one per slot) and degraded.
+    """
+    site = LAUNCH_SITES[site_code]
+    times = series_times(start, end, step_hours)
+
+    calls: Dict[str, Awaitable[Any]] = {
+        "weather": get_weather_series(site["lat"], site["lon"], start, end, step_hours),
+        "space_weather": get_space_weather_series(times),
+    }
+    fallbacks: Dict[str, Callable[[], Any]] = {
+        "weather": lambda: [{"time": t.isoformat(), **default_weather()} for t in times],
+        "space_weather": lambda: [default_space_weather() for _ in times],
+    }
+    if conjunctions:
+        calls["conjunction"] = get_conjunction_risks(site["lat"], site["lon"], times)
+        fallbacks["conjunction"] = lambda: [default_conjunction() for _ in times]
+
+    # Sweeps queue behind live decisions for upstream quota
+    with upstream_priority(BULK):
+        values, degraded = await gather_sources(calls, fallbacks)
+
+    weathers = values["weather"]
+    slot_times = [weather.pop("time") for weather in weathers]
+    return {
+        "slot_times": slot_times,
+        "weathers": weathers,
+        "space_weathers": values["space_weather"],
+        "conjunctions": values.get("conjunction"),
+        "degraded": degraded,
     }
+
+
+def score_window(window: Dict[str, Any], limits: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score every slot of a gathered window against limits in one vectorized
+    pass.
+
+    Returns the window_inputs dict plus limits, inputs (score_batch input
+    arrays) and scored (score_batch output).
+    """
+    inputs = inputs_from_dicts(window["weathers"], window["space_weathers"], window["conjunctions"])
+    return {**window, "limits": limits, "inputs": inputs, "scored": score_batch(inputs, limits)}
+
+
+async def _score_window(
+    site_code: str,
+    start: datetime,
+    end: datetime,
+    step_hours: int
+) -> Dict[str, Any]:
+    """Gather a sweep window's inputs and score them against the site's limits."""
+    return score_window(await window_inputs(site_code, start, end, step_hours), site_limits(site_code))
+
+
+def _ranking(scored: Dict[str, np.ndarray]) -> np.ndarray:
+    """Slot indices best first: GO before MARGINAL before NO-GO, then by risk score, then by time."""
+    return np.lexsort((np.arange(len(scored["verdict"])), scored["risk_score"], scored["verdict"]))
+
+
+def rank_window(window: Dict[str, Any], fields: Optional[Collection[str]] = None) -> Dict[str, Any]:
+    """
+    Build the ranked slot decisions of a scored window (see score_window).
+    Pure CPU work, so it can run in a worker process.
+
+    Returns dict with slots and best, as in sweep_decisions.
+    """
+    limits, scored, degraded = window["limits"], window["scored"], window["degraded"]
+    weathers, space_weathers, conjunctions = window["weathers"], window["space_weathers"], window["conjunctions"]
+    slot_times = window["slot_times"]
+
+    fields = DECISION_FIELDS if fields is None else fields
+    rules = get_rules().compiled(limits)
+    ranked = _ranking(scored).tolist()
+
+    slots = []
+    for i in ranked:
+        risk_score = int(scored["risk_score"][i])
+        evaluation = {"risk_score": risk_score, "verdict": VERDICTS[scored["verdict"][i]]}
+        if "why" in fields:
+            evaluation["why"] = rules.explain(weathers[i], space_weathers[i], conjunctions[i], risk_score)
+        if "rule_citations" in fields:
+            evaluation["rule_citations"] = citations_from_mask(int(scored["citations"][i]), limits)
+        decision = build_decision(
+            weathers[i], space_weathers[i], conjunctions[i], evaluation, degraded, fields
+        )
+        slots.append({"launch_time": slot_times[i], **decision})
+
+    best = slots[0] if ranked and VERDICTS[scored["verdict"][ranked[0]]] == "GO" else None
+    return {"slots": slots, "best": best}
+
+
+async def sweep_decisions(
+    site_code: str,
+    start: datetime,
+    end: datetime,
+    step_hours: int = 1,
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """
+    Score every slot in a launch window for one site.
+
+    Weather for the whole window comes from one Meteomatics time-series
+    request and each slot's Kp is looked up in one cached SWPC snapshot,
+    so the cost of a sweep does not grow with the number of slots.
+
+    Returns dict with:
+    - site_code
+    - slots: decisions ranked best first (GO before MARGINAL before NO-GO,
+      then by risk score, then by time); each has launch_time plus the
+      requested fields (default: all of DECISION_FIELDS)
+    - best: the top-ranked GO slot, or None if no slot is GO
+    - degraded: sources that failed or missed their time budget
+    """
+    window = await _score_window(site_code, start, end, step_hours)
+    ranked = rank_window(window, fields)
+    return {
+        "site_code": site_code,
+        "slots": ranked["slots"],
+        "best": ranked["best"],
+        "degraded": window["degraded"]
+    }
+
+
+async def sweep_columns(
+    site_code: str,
+    start: datetime,
+    end: datetime,
+    step_hours: int = 1,
+    fields: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """
+    sweep_decisions as one array per field, slots in time order, for
+    columnar encodings. No per-slot dicts are built.
+
+    Returns dict with:
+    - site_code, degraded
+    - columns: launch_time (datetime64[s]), rank (0 = best), then verdict
+      (int8 index into VERDICTS), risk_score, why, rule_citations and the
+      scoring inputs (for "data"), as requested by fields
+    """
+    window = await _score_window(site_code, start, end, step_hours)
+    limits, scored, degraded = window["limits"], window["scored"], window["degraded"]
+    fields = DECISION_FIELDS if fields is None else fields
+    count = len(window["slot_times"])
+
+    rank = np.empty(count, dtype=np.int32)
+    rank[_ranking(scored)] = np.arange(count, dtype=np.int32)
+    first_slot = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    columns: Dict[str, Any] = {
+        "launch_time": np.datetime64(int(first_slot.timestamp()), "s")
+        + np.arange(count, dtype=np.int64) * np.timedelta64(step_hours * 3600, "s"),
+        "rank": rank,
+    }
+    if "verdict" in fields:
+        columns["verdict"] = scored["verdict"]
+    if "risk_score" in fields:
+        columns["risk_score"] = scored["risk_score"]
+    if "why" in fields:
+        rules = get_rules().compiled(limits)
+        columns["why"] = [
+            _with_degraded_note(
+                _with_climatology_note(rules.explain(weather, space_weather, conjunction, int(risk)), weather),
+                degraded
+            )
+            for weather, space_weather, conjunction, risk in zip(
+                window["weathers"], window["space_weathers"], window["conjunctions"], scored["risk_score"]
+            )
+        ]
+    if "rule_citations" in fields:
+        # Few distinct masks occur in a window; expand each once
+        masks, inverse = np.unique(scored["citations"], return_inverse=True)
+        expanded = [citations_from_mask(int(mask), limits) for mask in masks]
+        columns["rule_citations"] = [expanded[j] for j in inverse.tolist()]
+    if "data" in fields:
+        columns.update(window["inputs"])
+
+    return {"site_code": site_code, "columns": columns, "degraded": degraded}
+
+
+async def decide_batch(
+    requests: List[Tuple[Place, datetime]],
+    fields: Optional[Collection[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Decide many (place, launch_time) pairs at once; a place is a site code
+    or (lat, lon), as for make_decision.
+
+    Pairs sharing a launch time are fetched with one Meteomatics multi-point
+    request, space weather (which is global) is looked up for every
+    distinct launch time in one cached SWPC snapshot, and each location's
+    conjunctions are screened for all of its launch times in one call.
+
+    Returns decision dicts in the same order as requests.
+    """
+    results: List[Any] = [None] * len(requests)
+    locations = [locate(place) for place, _ in requests]
+    by_time: Dict[datetime, List[int]] = {}
+
+    for i, (place, launch_time) in enumerate(requests):
+        if locations[i] is None:
+            results[i] = unknown_site(place)
+        else:
+            by_time.setdefault(launch_time, []).append(i)
+
+    if not by_time:
+        return results
+
+    # One weather call per distinct launch time, all running alongside SWPC
+    groups = {
+        f"weather:{launch_time.isoformat()}": (
+            launch_time,
+            indices,
+            [locations[i] for i in indices]
+        )
+        for launch_time, indices in by_time.items()
+    }
+    launch_times = list(by_time)
+    calls: Dict[str, Awaitable[Any]] = {"space_weather": get_space_weather_series(launch_times)}
+    fallbacks: Dict[str, Callable[[], Any]] = {
+        "space_weather": lambda: [default_space_weather() for _ in launch_times]
+    }
+    for name, (launch_time, indices, sites) in groups.items():
+        calls[name] = get_weather_multi(
+            [(site["lat"], site["lon"]) for site in sites], launch_time
+        )
+        fallbacks[name] = lambda n=len(sites): [default_weather() for _ in range(n)]
+
+    # One corridor screen per location (a site code, or lat,lon for ad-hoc
+    # points off every site) over its distinct launch times
+    points: List[Optional[str]] = [None] * len(requests)
+    point_times: Dict[str, Dict[datetime, None]] = {}
+    point_coords: Dict[str, Tuple[float, float]] = {}
+    for indices in by_time.values():
+        for i in indices:
+            location = locations[i]
+            points[i] = location["site_code"] or f"{location['lat']},{location['lon']}"
+            point_times.setdefault(points[i], {})[requests[i][1]] = None
+            point_coords[points[i]] = (location["lat"], location["lon"])
+    for point, times in point_times.items():
+        calls[f"conjunction:{point}"] = get_conjunction_risks(*point_coords[point], list(times))
+        fallbacks[f"conjunction:{point}"] = lambda n=len(times): [default_conjunction() for _ in range(n)]
+
+    # Batches queue behind live decisions for upstream quota
+    with upstream_priority(BULK):
+        values, degraded = await gather_sources(calls, fallbacks)
+    space_weathers = dict(zip(launch_times, values["space_weather"]))
+    conjunctions = {
+        (point, launch_time): conjunction
+        for point, times in point_times.items()
+        for launch_time, conjunction in zip(times, values[f"conjunction:{point}"])
+    }
+
+    for name, (launch_time, indices, sites) in groups.items():
+        for i, location, weather in zip(indices, sites, values[name]):
+            item_degraded = {
+                source: reason for source, reason in degraded.items()
+                if source in ("space_weather", name, f"conjunction:{points[i]}")
+            }
+            decision = assess(
+                weather, space_weathers[launch_time], conjunctions[(points[i], launch_time)],
+                location["limits"], item_degraded, fields
+            )
+            results[i] = add_location(decision, requests[i][0], location, fields)
+
+    return results
@@ -0,0 +1,238 @@
+"""Bounded TTL/LRU cache shared by the integrations."""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple
+
+from integrations.shared_cache import get_store
+
+# Every cache registers itself here so stats can be reported in one place
+CACHES: Dict[str, "TTLCache"] = {}
+
+
+def _approx_size(value: Any) -> int:
+    """Rough size of a cached value in bytes (its JSON encoding, or nbytes for arrays)."""
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class TTLCache:
+    """
+    In-memory cache with TTL expiry, LRU eviction and single-flight fetches.
+
+    - Entries expire after ttl seconds. With stale_ttl > 0, an expired entry
+      younger than ttl + stale_ttl is still returned immediately while one
+      background task refreshes it (stale-while-revalidate).
+    - The cache holds at most max_entries entries and, if max_bytes is set,
+      roughly max_bytes of data; the least recently used entries go first.
+    - Concurrent misses on the same key share one fetch.
+
+    - When a shared store is configured (SHARED_CACHE_PATH), entries are
+      written through to it and local misses are looked up there first, so
+      other worker processes reuse them. Caches of values that are not
+      JSON-serializable (e.g. NumPy grids) pass shared=False.
+
+    Fetch functions signal failure by raising. Failures are never cached and
+    are re-raised to every caller waiting on that fetch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        stale_ttl: float = 0,
+        shared: bool = True
+    ):
+        self.name = name
+        self.shared = shared
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: set = set()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "fetch_errors": 0,
+            "shared_hits": 0,
+        }
+        CACHES[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Return (stored_at, value) for key without touching stats or LRU order."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[0], entry[1]
+
+    def version(self, key: str) -> Optional[Tuple[float, float]]:
+        """
+        (stored_at, seconds left fresh) for a servable entry, or None.
+
+        Stale entries that get_or_fetch would still serve count, with 0
+        seconds left. Stats and LRU order are not touched.
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        age = time.time() - entry[0]
+        if age >= self.ttl + self.stale_ttl:
+            return None
+        return entry[0], max(self.ttl - age, 0.0)
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, Any, int]]:
+        """Local entry for key, refreshed from the shared store if that has a newer one."""
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return entry
+        store = get_store() if self.shared else None
+        if store is not None:
+            shared = store.get(self.name, key)
+            if shared is not None and (entry is None or shared[0] > entry[0]):
+                self.stats["shared_hits"] += 1
+                self._put_local(key, shared[1], shared[0])
+                entry = self._entries[key]
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the fresh value for key, or None if missing or expired."""
+        entry = self._lookup(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        """Store value under key (and in the shared store, if configured)."""
+        stored_at = time.time() if stored_at is None else stored_at
+        self._put_local(key, value, stored_at)
+        store = get_store() if self.shared else None
+        if store is not None:
+            store.set(self.name, key, stored_at, value, self.ttl + self.stale_ttl)
+
+    def _put_local(self, key: str, value: Any, stored_at: float) -> None:
+        """Store value in this process and evict least recently used entries if over bounds."""
+        size = _approx_size(value) if self.max_bytes is not None else 0
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (stored_at, value, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats["evictions"] += 1
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, calling fetch() on a miss.
+
+        Expired-but-stale entries are served immediately and refreshed in the
+        background. Concurrent misses on one key await the same fetch.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                self._refresh(key, fetch)
+                return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self.stats["misses"] += 1
+        task = asyncio.ensure_future(self._fetch(key, fetch))
+        self._inflight[key] = task
+        # Shield so a caller giving up (e.g. a deadline) doesn't cancel the
+        # fetch for everyone else; the result still lands in the cache
+        return await asyncio.shield(task)
+
+    async def refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Fetch key now regardless of freshness (joining a fetch already in flight)."""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        self.stats["refreshes"] += 1
+        task = asyncio.ensure_future(self._fetch(key, fetch))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            self.set(key, value)
+            return value
+        except Exception:
+            self.stats["fetch_errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Start one background refresh for key unless one is already running."""
+        if key in self._inflight:
+            return
+        self.stats["refreshes"] += 1
+        task = asyncio.ensure_future(self._fetch(key, fetch))
+        self._inflight[key] = task
+        # Keep a reference until done; swallow errors (the stale value stays)
+        self._refreshing.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Future) -> None:
+        self._refreshing.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self) -> None:
+        """Drop every entry (stats are kept)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current size, for reporting."""
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes if self.max_bytes is not None else None,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every registered cache, keyed by cache name."""
+    return {name: cache.snapshot() for name, cache in CACHES.items()}
@@ -0,0 +1,241 @@
+"""Columnar, memory-mapped TLE catalog store.
+
+The store is one binary file: a small JSON header followed by one contiguous,
+64-byte aligned block per column (NORAD ID, epoch, mean elements, perigee and
+apogee altitude, name). Rows are sorted by perigee altitude, so "every object
+whose perigee is below X km" is a prefix of every column.
+
+Workers open the file with np.memmap, so the catalog is not parsed at
+startup and all processes on a host share the same page-cache pages.
+Updates are written to a temporary file and swapped in with os.replace, so
+readers holding the old mapping are never disturbed.
+
+Usage (from the backend directory):
+    python -m integrations.catalog_store build catalog.3le catalog.lcat
+    python -m integrations.catalog_store update catalog.lcat delta.3le [--max-age-days 30]
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from integrations.propagation import ELEMENT_FIELDS, RADIUS_EARTH_KM, XKE, X2O3, parse_tle_lines
+
+MAGIC = b"LCAT0001"
+ALIGN = 64
+NAME_WIDTH = 24
+
+COLUMNS = {
+    "norad_id": np.dtype("<i8"),
+    "epoch": np.dtype("<f8"),
+    "bstar": np.dtype("<f8"),
+    "inclo": np.dtype("<f8"),
+    "nodeo": np.dtype("<f8"),
+    "ecco": np.dtype("<f8"),
+    "argpo": np.dtype("<f8"),
+    "mo": np.dtype("<f8"),
+    "no_kozai": np.dtype("<f8"),
+    "perigee_km": np.dtype("<f8"),
+    "apogee_km": np.dtype("<f8"),
+    "name": np.dtype(f"S{NAME_WIDTH}"),
+}
+
+
+def _altitudes(no_kozai: np.ndarray, ecco: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Perigee and apogee altitude (km) from mean motion and eccentricity."""
+    semi_major_km = (XKE / no_kozai) ** X2O3 * RADIUS_EARTH_KM
+    return (
+        semi_major_km * (1.0 - ecco) - RADIUS_EARTH_KM,
+        semi_major_km * (1.0 + ecco) - RADIUS_EARTH_KM,
+    )
+
+
+def columns_from_tle(path: str) -> Dict[str, np.ndarray]:
+    """Parse a TLE text file into store columns (unsorted)."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        elements, names = parse_tle_lines(f)
+    columns = dict(elements)
+    columns["perigee_km"], columns["apogee_km"] = _altitudes(elements["no_kozai"], elements["ecco"])
+    columns["name"] = np.array(
+        [name.encode("utf-8")[:NAME_WIDTH] for name in names], dtype=COLUMNS["name"]
+    )
+    return columns
+
+
+def write_store(path: str, columns: Dict[str, np.ndarray]) -> None:
+    """Sort columns by perigee and write them atomically to path."""
+    order = np.argsort(columns["perigee_km"], kind="stable")
+    count = len(order)
+
+    layout = {}
+    offset = 0
+    for name, dtype in COLUMNS.items():
+        layout[name] = {"dtype": dtype.str, "offset": offset}
+        offset += -(-count * dtype.itemsize // ALIGN) * ALIGN
+    header = json.dumps({"count": count, "columns": layout, "written_at": time.time()}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, dtype in COLUMNS.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(columns[name][order], dtype=dtype).tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CatalogStore:
+    """Read-only, memory-mapped view of a catalog store file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.inode = stat.st_ino
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a catalog store")
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+
+        self.count = header["count"]
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, spec in header["columns"].items():
+            if self.count == 0:
+                self.columns[name] = np.empty(0, dtype=spec["dtype"])
+                continue
+            self.columns[name] = np.memmap(
+                path, dtype=spec["dtype"], mode="r",
+                offset=data_start + spec["offset"], shape=(self.count,)
+            )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def changed(self) -> bool:
+        """True if the file on disk has been replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self.inode or stat.st_mtime != self.mtime
+
+    def elements(self) -> Dict[str, np.ndarray]:
+        """Element columns in the form SGP4Batch expects (zero-copy views)."""
+        return {field: self.columns[field] for field in ELEMENT_FIELDS}
+
+    def names(self) -> np.ndarray:
+        return self.columns["name"]
+
+    def band(self, min_alt_km: float, max_alt_km: float) -> np.ndarray:
+        """
+        Row indices of objects whose orbit can reach altitudes in
+        [min_alt_km, max_alt_km]: perigee <= max and apogee >= min.
+
+        Rows are sorted by perigee, so the perigee test is a binary search.
+        """
+        end = int(np.searchsorted(self.columns["perigee_km"], max_alt_km, side="right"))
+        index = np.arange(end)
+        if min_alt_km > 0:
+            index = index[self.columns["apogee_km"][:end] >= min_alt_km]
+        return index
+
+
+def build(tle_path: str, store_path: str) -> int:
+    """Build a store from a full TLE catalog. Returns the object count."""
+    columns = columns_from_tle(tle_path)
+    write_store(store_path, columns)
+    return len(columns["norad_id"])
+
+
+def apply_delta(
+    store_path: str,
+    delta_path: str,
+    max_age_days: Optional[float] = None
+) -> Dict[str, int]:
+    """
+    Merge a Space-Track delta file (only changed objects) into a store.
+
+    Objects in the delta replace the stored row with the same NORAD ID when
+    their epoch is newer; unknown IDs are appended. With max_age_days, rows
+    whose epoch is older than that (typically decayed objects) are dropped.
+
+    Returns counts of updated, added and dropped rows.
+    """
+    store = CatalogStore(store_path)
+    current = {name: np.asarray(column) for name, column in store.columns.items()}
+    delta = columns_from_tle(delta_path)
+
+    # Keep only the newest element set per NORAD ID within the delta
+    order = np.lexsort((-delta["epoch"], delta["norad_id"]))
+    _, first = np.unique(delta["norad_id"][order], return_index=True)
+    delta = {name: column[order][first] for name, column in delta.items()}
+
+    stored_ids = current["norad_id"]
+    position = {int(norad_id): i for i, norad_id in enumerate(stored_ids)}
+    matched = np.array(
+        [position.get(int(norad_id), -1) for norad_id in delta["norad_id"]], dtype=np.int64
+    )
+
+    is_update = matched >= 0
+    newer = np.zeros(len(matched), dtype=bool)
+    newer[is_update] = delta["epoch"][is_update] > current["epoch"][matched[is_update]]
+
+    merged = {name: column.copy() for name, column in current.items()}
+    rows = matched[newer]
+    for name in COLUMNS:
+        merged[name][rows] = delta[name][newer]
+
+    added = ~is_update
+    merged = {
+        name: np.concatenate([merged[name], delta[name][added]]) for name in COLUMNS
+    }
+
+    dropped = 0
+    if max_age_days is not None:
+        keep = merged["epoch"] >= time.time() - max_age_days * 86400.0
+        dropped = int(np.count_nonzero(~keep))
+        merged = {name: column[keep] for name, column in merged.items()}
+
+    write_store(store_path, merged)
+    return {
+        "updated": int(np.count_nonzero(newer)),
+        "added": int(np.count_nonzero(added)),
+        "dropped": dropped
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or update a memory-mapped TLE catalog store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="build a store from a full TLE catalog")
+    build_cmd.add_argument("tle_path")
+    build_cmd.add_argument("store_path")
+
+    update_cmd = commands.add_parser("update", help="apply a Space-Track delta file")
+    update_cmd.add_argument("store_path")
+    update_cmd.add_argument("delta_path")
+    update_cmd.add_argument("--max-age-days", type=float, default=None)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        count = build(args.tle_path, args.store_path)
+        print(f"Wrote {count} objects to {args.store_path}")
+    else:
+        counts = apply_delta(args.store_path, args.delta_path, args.max_age_days)
+        print(f"Updated {counts['updated']}, added {counts['added']}, dropped {counts['dropped']}")
+
+
+if __name__ == "__main__":
+    main()
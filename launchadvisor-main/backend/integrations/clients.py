@@ -0,0 +1,172 @@
+"""Shared, connection-pooled HTTP clients for the external APIs."""
+import asyncio
+import os
+import time
+import httpx
+from typing import Dict, Any, Tuple
+
+from integrations.metrics import UPSTREAM_RESPONSES, UPSTREAM_SECONDS
+from integrations.scheduler import ScheduledTransport, UpstreamScheduler
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool limits, timeouts and scheduling (see integrations.scheduler) per
+# upstream. Each value can be overridden with an env var named
+# <UPSTREAM>_<SETTING>, e.g. METEOMATICS_MAX_CONNECTIONS=40 or
+# SPACETRACK_RATE_PER_S=0.5 (a rate of 0 means unlimited)
+UPSTREAMS: Dict[str, Dict[str, float]] = {
+    "meteomatics": {
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 30.0,
+        "timeout": 10.0,
+        "connect_timeout": 5.0,
+        "rate_per_s": 5.0,
+        "burst": 10.0,
+        "max_queue": 200,
+        "max_wait_s": 5.0,
+        "failure_threshold": 5,
+        "open_s": 30.0,
+    },
+    "swpc": {
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "keepalive_expiry": 60.0,
+        "timeout": 10.0,
+        "connect_timeout": 5.0,
+        "rate_per_s": 2.0,
+        "burst": 5.0,
+        "max_queue": 50,
+        "max_wait_s": 5.0,
+        "failure_threshold": 5,
+        "open_s": 30.0,
+    },
+    "spacetrack": {
+        "max_connections": 5,
+        "max_keepalive_connections": 2,
+        "keepalive_expiry": 60.0,
+        "timeout": 30.0,
+        "connect_timeout": 5.0,
+        # Space-Track allows 30 requests per minute
+        "rate_per_s": 0.5,
+        "burst": 5.0,
+        "max_queue": 20,
+        "max_wait_s": 30.0,
+        "failure_threshold": 3,
+        "open_s": 120.0,
+    },
+}
+
+# Scheduling keys of UPSTREAMS, passed to UpstreamScheduler
+SCHEDULER_SETTINGS = ("rate_per_s", "burst", "max_queue", "max_wait_s", "failure_threshold", "open_s")
+
+# One client per upstream, remembered with the event loop it belongs to
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+# One scheduler per upstream for the life of the process, so quotas and
+# circuit state carry over when a client is recreated
+_schedulers: Dict[str, UpstreamScheduler] = {}
+
+
+def upstream_settings(name: str) -> Dict[str, Any]:
+    """Return pool/timeout settings for an upstream, applying env overrides."""
+    settings = dict(UPSTREAMS[name])
+    for key, default in settings.items():
+        override = os.getenv(f"{name.upper()}_{key.upper()}")
+        if override:
+            settings[key] = type(default)(override)
+    return settings
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Records latency (until response headers) and status of every request
+    to one upstream. Callers can label a request with
+    extensions={"endpoint": "..."}; the default label is "request".
+    """
+
+    def __init__(self, upstream: str, transport: httpx.AsyncBaseTransport):
+        self.upstream = upstream
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.extensions.get("endpoint", "request")
+        start = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            UPSTREAM_RESPONSES.inc(self.upstream, endpoint, type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, self.upstream, endpoint)
+        UPSTREAM_RESPONSES.inc(self.upstream, endpoint, str(response.status_code))
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def get_scheduler(name: str) -> UpstreamScheduler:
+    """Return the request scheduler for an upstream."""
+    scheduler = _schedulers.get(name)
+    if scheduler is None:
+        settings = upstream_settings(name)
+        scheduler = _schedulers[name] = UpstreamScheduler(
+            name, **{key: settings[key] for key in SCHEDULER_SETTINGS}
+        )
+    return scheduler
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every upstream scheduler that has been used."""
+    return {name: scheduler.snapshot() for name, scheduler in _schedulers.items()}
+
+
+def _create_client(name: str) -> httpx.AsyncClient:
+    settings = upstream_settings(name)
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=int(settings["max_connections"]),
+            max_keepalive_connections=int(settings["max_keepalive_connections"]),
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=ScheduledTransport(get_scheduler(name), InstrumentedTransport(name, transport)),
+        timeout=httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+    )
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for an upstream.
+
+    Clients are normally created by start_clients() from the app lifespan;
+    outside the app (scripts, one-off asyncio.run calls) one is created on
+    first use for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(name)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        entry = (loop, _create_client(name))
+        _clients[name] = entry
+    return entry[1]
+
+
+async def start_clients() -> None:
+    """Create the pooled client for every upstream."""
+    for name in UPSTREAMS:
+        get_client(name)
+
+
+async def close_clients() -> None:
+    """Close every pooled client and release its sockets."""
+    entries = list(_clients.values())
+    _clients.clear()
+    for _, client in entries:
+        await client.aclose()
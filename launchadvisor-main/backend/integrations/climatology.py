@@ -0,0 +1,240 @@
+"""Memory-mapped hourly weather climatology per launch site.
+
+For launch dates beyond the forecast horizon there is no forecast to ask
+for, so weather is answered from climatology instead: percentiles of each
+weather field for the site, calendar day and UTC hour, computed offline
+from archived observations.
+
+The store is one binary file: a small JSON header (sites, fields,
+percentiles) followed by a 64-byte aligned float16 array shaped
+(site, day, hour, field, percentile). Days follow a leap-year calendar
+(0 = Jan 1, 59 = Feb 29, 365 = Dec 31); each day pools the archive hours
+within WINDOW_DAYS either side of it, so every cell has a few hundred
+samples from a few decades of data. A lookup is a handful of index
+operations on the mapping; nothing is parsed at startup and every worker
+shares the same page-cache pages.
+
+The archive layout is the one backtest.py reads
+(<weather_dir>/site_code=<code>/year=<year>/*.csv or *.parquet).
+
+Usage (from the backend directory):
+    python -m integrations.climatology build data/weather climatology.lclm [--window-days 7]
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from sites import LAUNCH_SITES, SiteIndex
+
+MAGIC = b"LCLM0001"
+ALIGN = 64
+
+FIELDS = ("wind_speed_kn", "precipitation_mm", "cloud_ceiling_ft", "temperature_c")
+PERCENTILES = (10, 25, 50, 75, 90)
+DAYS = 366
+HOURS = 24
+DTYPE = np.dtype("<f2")
+WINDOW_DAYS = 7
+
+# First day index of each month in a leap-year calendar
+_MONTH_STARTS = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+
+
+def day_index(times: np.ndarray) -> np.ndarray:
+    """Leap-year calendar day (0-365) of each epoch second."""
+    stamps = times.astype("datetime64[s]")
+    months = stamps.astype("datetime64[M]")
+    day_of_month = (stamps.astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    return _MONTH_STARTS[months.astype(np.int64) % 12] + day_of_month
+
+
+def percentile_table(times: np.ndarray, values: np.ndarray, window_days: int = WINDOW_DAYS) -> np.ndarray:
+    """
+    Percentiles of values (fields x samples) by calendar day and hour, with
+    linear interpolation (as np.percentile); NaN samples are ignored.
+
+    Returns an array shaped (DAYS, HOURS, len(FIELDS), len(PERCENTILES));
+    cells with no samples are NaN.
+    """
+    table = np.full((DAYS, HOURS, values.shape[0], len(PERCENTILES)), np.nan, dtype=np.float32)
+    days = day_index(times)
+    hours = (times // 3600) % 24
+    # Calendar days pooled into each day, wrapping so late December pools with early January
+    window = (np.arange(DAYS)[:, None] + np.arange(-window_days, window_days + 1)) % DAYS
+    fractions = np.array(PERCENTILES) / 100.0
+
+    for hour in range(HOURS):
+        rows = np.nonzero(hours == hour)[0]
+        rows = rows[np.argsort(days[rows], kind="stable")]
+        counts = np.bincount(days[rows], minlength=DAYS)
+        if not len(rows):
+            continue
+        # Sample indices per calendar day, padded with -1, then per window
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        slots = np.arange(counts.max())
+        per_day = np.where(slots < counts[:, None], starts[:, None] + slots, -1)
+        pooled = per_day[window].reshape(DAYS, -1)
+        present = pooled >= 0
+        samples = np.where(present, rows[np.maximum(pooled, 0)], 0)
+
+        for k in range(values.shape[0]):
+            # Sorting puts NaN (missing or padding) last; interpolate over the valid prefix
+            ordered = np.sort(np.where(present, values[k][samples], np.nan), axis=1)
+            valid = np.count_nonzero(~np.isnan(ordered), axis=1)
+            position = (valid[:, None] - 1) * fractions
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, np.maximum(valid[:, None] - 1, 0))
+            low = np.maximum(low, 0)
+            below = np.take_along_axis(ordered, low, axis=1)
+            above = np.take_along_axis(ordered, high, axis=1)
+            result = below + (above - below) * (position - low)
+            result[valid == 0] = np.nan
+            table[:, hour, k] = result
+    return table
+
+
+def write_store(path: str, sites: List[Dict[str, Any]], table: np.ndarray, window_days: int) -> None:
+    """Write per-site tables (stacked along the first axis) atomically to path."""
+    header = json.dumps({
+        "sites": sites,
+        "fields": list(FIELDS),
+        "percentiles": list(PERCENTILES),
+        "window_days": window_days,
+        "dtype": DTYPE.str,
+        "written_at": time.time(),
+    }).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.seek(data_start)
+        f.write(np.ascontiguousarray(table, dtype=DTYPE).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ClimatologyStore:
+    """Read-only, memory-mapped view of a climatology store file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.inode = stat.st_ino
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a climatology store")
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+
+        if tuple(header["fields"]) != FIELDS or tuple(header["percentiles"]) != PERCENTILES:
+            raise ValueError(f"{path} was built with different fields or percentiles")
+        self.sites = header["sites"]
+        self.written_at = header["written_at"]
+        self.codes = [site["code"] for site in self.sites]
+        # Codes are unique, so index positions are table rows
+        self._index = SiteIndex({site["code"]: site for site in self.sites})
+        self.table = np.memmap(
+            path, dtype=header["dtype"], mode="r", offset=data_start,
+            shape=(len(self.sites), DAYS, HOURS, len(FIELDS), len(PERCENTILES))
+        ) if self.sites else np.empty((0, DAYS, HOURS, len(FIELDS), len(PERCENTILES)), dtype=DTYPE)
+
+    def changed(self) -> bool:
+        """True if the file on disk has been replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self.inode or stat.st_mtime != self.mtime
+
+    def nearest(self, lat: float, lon: float) -> Optional[Tuple[int, float]]:
+        """(row, great-circle distance in km) of the stored site closest to (lat, lon)."""
+        if not self.sites:
+            return None
+        return self._index.nearest_index(lat, lon)
+
+    def lookup(self, row: int, dt: datetime) -> Optional[np.ndarray]:
+        """
+        Percentiles (fields x PERCENTILES) for a site row at dt's calendar
+        day and UTC hour, or None if the archive had no samples there.
+        """
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        dt = dt.astimezone(timezone.utc)
+        day = int(_MONTH_STARTS[dt.month - 1]) + dt.day - 1
+        cell = np.asarray(self.table[row, day, dt.hour], dtype=np.float64)
+        if np.isnan(cell).any():
+            return None
+        return cell
+
+
+def build(weather_dir: str, store_path: str, window_days: int = WINDOW_DAYS) -> List[Dict[str, Any]]:
+    """
+    Build a store from a partitioned weather archive, one table per site
+    in LAUNCH_SITES that has archived data. Returns the stored sites.
+    """
+    # Only the offline build needs the archive readers
+    from backtest import find_partitions, iter_chunks
+
+    files_by_site: Dict[str, List[Tuple[int, str]]] = {}
+    for site_code, year, files in find_partitions(weather_dir):
+        if site_code in LAUNCH_SITES:
+            files_by_site.setdefault(site_code, []).extend((year, path) for path in files)
+
+    sites, tables = [], []
+    for site_code, files in sorted(files_by_site.items()):
+        times, values = [], []
+        for _, path in files:
+            for chunk in iter_chunks(path, ("time",) + FIELDS):
+                times.append(chunk["time"])
+                values.append(np.stack([chunk[field] for field in FIELDS]))
+        if not times:
+            continue
+        site_times = np.concatenate(times)
+        site = LAUNCH_SITES[site_code]
+        tables.append(percentile_table(site_times, np.concatenate(values, axis=1), window_days))
+        years = [year for year, _ in files]
+        sites.append({
+            "code": site_code,
+            "lat": site["lat"],
+            "lon": site["lon"],
+            "years": [min(years), max(years)],
+            "samples": int(len(site_times)),
+        })
+
+    table = np.stack(tables) if tables else np.empty((0, DAYS, HOURS, len(FIELDS), len(PERCENTILES)))
+    write_store(store_path, sites, table, window_days)
+    return sites
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a memory-mapped per-site weather climatology.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="build a store from a partitioned weather archive")
+    build_cmd.add_argument("weather_dir")
+    build_cmd.add_argument("store_path")
+    build_cmd.add_argument("--window-days", type=int, default=WINDOW_DAYS,
+                           help="days either side of each calendar day pooled into its percentiles")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    sites = build(args.weather_dir, args.store_path, args.window_days)
+    print(f"Wrote {len(sites)} sites to {args.store_path} in {time.perf_counter() - started:.1f}s")
+    for site in sites:
+        print(f"  {site['code']}: {site['samples']} hours, {site['years'][0]}-{site['years'][1]}")
+
+
+if __name__ == "__main__":
+    main()
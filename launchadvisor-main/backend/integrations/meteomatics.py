@@ -1,15 +1,220 @@
 """Meteomatics Weather API integration."""
+import asyncio
+import math
 import os
-import httpx
-from datetime import datetime, timezone
-from typing import Dict, Any
+import numpy as np
+from integrations.cache import TTLCache
+from integrations.climatology import FIELDS as CLIMATOLOGY_FIELDS, PERCENTILES, ClimatologyStore
+from integrations.clients import get_client
+from integrations.metrics import timed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 
 METEOMATICS_USER = os.getenv("METEOMATICS_USER", "")
 METEOMATICS_PASSWORD = os.getenv("METEOMATICS_PASSWORD", "")
+METEOMATICS_BASE_URL = os.getenv("METEOMATICS_BASE_URL", "https://api.meteomatics.com").rstrip("/")
 
-# Cache for weather data (simple in-memory cache)
-_cache: Dict[str, tuple[float, Any]] = {}
+# Cache for weather data (bounded in-memory cache)
 CACHE_TTL = 180  # 3 minutes
+CACHE_STALE_TTL = 120  # serve up to 2 minutes past expiry while refreshing
+CACHE_MAX_ENTRIES = int(os.getenv("METEOMATICS_CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.getenv("METEOMATICS_CACHE_MAX_BYTES", "0")) or None  # 0 = entry bound only
+_cache = TTLCache(
+    "meteomatics",
+    ttl=CACHE_TTL,
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    stale_ttl=CACHE_STALE_TTL
+)
+
+# Requests are snapped to the forecast model's grid and time step, so nearby
+# points and times share one cache entry and one upstream value. The default
+# grid matches the ~0.1 degree global model behind Meteomatics' default mix;
+# 0 disables spatial snapping
+GRID_RESOLUTION_DEG = float(os.getenv("METEOMATICS_GRID_DEG", "0.1"))
+TIME_STEP_S = 3600
+MAX_FORECAST_DAYS = 7  # Meteomatics free tier typically supports 7 days
+
+# Launch times beyond the forecast horizon are answered from a per-site
+# climatology store built with integrations.climatology, with no upstream
+# call. Points farther than CLIMATOLOGY_MAX_KM from every stored site (or
+# no store) fall back to the forecast for the same hour today
+CLIMATOLOGY_PATH = os.getenv("CLIMATOLOGY_PATH", "")
+CLIMATOLOGY_MAX_KM = float(os.getenv("CLIMATOLOGY_MAX_KM", "50"))
+# How long a climatology answer counts as fresh for decision ETags
+CLIMATOLOGY_FRESH_S = 3600.0
+_climatology: Optional[ClimatologyStore] = None
+
+# Regional grid mode: instead of one upstream call per point, fetch a
+# WEATHER_GRID_TILE_DEG square of the model grid for WEATHER_GRID_HOURS in
+# one area query, and interpolate every point and time that falls inside it
+WEATHER_GRID_ENABLED = os.getenv("WEATHER_GRID_ENABLED", "0") == "1" and GRID_RESOLUTION_DEG > 0
+WEATHER_GRID_TILE_DEG = float(os.getenv("WEATHER_GRID_TILE_DEG", "1.0"))
+WEATHER_GRID_HOURS = int(os.getenv("WEATHER_GRID_HOURS", "24"))
+# Tiles are NumPy arrays, so they stay in this process (not JSON-shareable)
+_grid_cache = TTLCache(
+    "meteomatics_grid",
+    ttl=CACHE_TTL,
+    max_entries=int(os.getenv("WEATHER_GRID_MAX_TILES", "256")),
+    stale_ttl=CACHE_STALE_TTL,
+    shared=False
+)
+
+# Parameters to fetch
+PARAMS = [
+    "wind_speed_10m:ms",  # Wind speed at 10m
+    "precip_1h:mm",  # Precipitation
+    "cloud_base_agl:m",  # Cloud base above ground level
+    "t_2m:C"  # Temperature at 2m
+]
+
+
+def default_weather() -> Dict[str, Any]:
+    """Safe defaults used when a parameter is missing or the API fails."""
+    return {
+        "wind_speed_kn": 0.0,
+        "precipitation_mm": 0.0,
+        "cloud_ceiling_ft": 10000.0,
+        "temperature_c": 20.0
+    }
+
+
+# Weather keys in the order grid tiles store them
+WEATHER_KEYS = ("wind_speed_kn", "precipitation_mm", "cloud_ceiling_ft", "temperature_c")
+
+# Meteomatics parameter prefix -> (our key, factor into our units)
+_CONVERSIONS = (
+    ("wind_speed", "wind_speed_kn", 1.94384),  # m/s to knots
+    ("precip", "precipitation_mm", 1.0),
+    ("cloud_base", "cloud_ceiling_ft", 3.28084),  # meters to feet
+    ("t_2m", "temperature_c", 1.0),
+)
+
+
+def _conversion(param: str) -> Optional[Tuple[str, float]]:
+    """(our key, factor) for a Meteomatics parameter, or None if unused."""
+    for prefix, key, factor in _CONVERSIONS:
+        if prefix in param:
+            return key, factor
+    return None
+
+
+def _apply_value(result: Dict[str, Any], param: str, value: float) -> None:
+    """Convert a raw Meteomatics value into our units and store it on result."""
+    conversion = _conversion(param)
+    if conversion is not None:
+        key, factor = conversion
+        result[key] = value * factor
+
+
+def _forecast_time(dt: datetime) -> datetime:
+    """Clamp dt to the forecast horizon (use current time if forecast is too far)."""
+    now_utc = datetime.now(timezone.utc)
+
+    # Make dt timezone-aware if it isn't
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    time_diff = (dt - now_utc).days
+
+    if time_diff > MAX_FORECAST_DAYS:
+        # Use nearest available time
+        dt = now_utc.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
+
+    return dt
+
+
+def _beyond_horizon(dt: datetime) -> bool:
+    """Whether dt is too far ahead for a forecast."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - datetime.now(timezone.utc)).days > MAX_FORECAST_DAYS
+
+
+def load_climatology() -> Optional[ClimatologyStore]:
+    """The memory-mapped climatology store (remapped when the file is replaced), or None if not configured."""
+    global _climatology
+    if not CLIMATOLOGY_PATH:
+        return None
+    if _climatology is None or _climatology.path != CLIMATOLOGY_PATH or _climatology.changed():
+        _climatology = ClimatologyStore(CLIMATOLOGY_PATH)
+    return _climatology
+
+
+def climatology_weather(lat: float, lon: float, dt: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Climatological weather for (lat, lon) at dt's calendar day and hour,
+    or None when no stored site is within CLIMATOLOGY_MAX_KM.
+
+    Returns weather dict with the median of each field (same keys as
+    get_weather), plus:
+    - source: "climatology"
+    - climatology: site_code, distance_km, years and percentiles
+      (field -> {"p10": ..., "p90": ...}) the medians come from
+    """
+    store = load_climatology()
+    nearest = store.nearest(lat, lon) if store is not None else None
+    if nearest is None or nearest[1] > CLIMATOLOGY_MAX_KM:
+        return None
+    row, distance_km = nearest
+    cell = store.lookup(row, dt)
+    if cell is None:
+        return None
+
+    median = PERCENTILES.index(50)
+    values = cell.round(2).tolist()
+    result: Dict[str, Any] = {field: values[k][median] for k, field in enumerate(CLIMATOLOGY_FIELDS)}
+    result["source"] = "climatology"
+    result["climatology"] = {
+        "site_code": store.codes[row],
+        "distance_km": round(distance_km, 1),
+        "years": store.sites[row]["years"],
+        "percentiles": {
+            field: {f"p{p}": value for p, value in zip(PERCENTILES, values[k])}
+            for k, field in enumerate(CLIMATOLOGY_FIELDS)
+        },
+    }
+    return result
+
+
+def _format_time(dt: datetime) -> str:
+    """Format a datetime the way Meteomatics expects (UTC, second precision)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def snap_point(lat: float, lon: float) -> Tuple[float, float]:
+    """Nearest model grid node to (lat, lon); unchanged when snapping is off."""
+    if GRID_RESOLUTION_DEG <= 0:
+        return lat, lon
+    lat = round(round(lat / GRID_RESOLUTION_DEG) * GRID_RESOLUTION_DEG, 6)
+    lon = round(round(lon / GRID_RESOLUTION_DEG) * GRID_RESOLUTION_DEG, 6)
+    if lon >= 180:
+        lon = round(lon - 360, 6)
+    return lat, lon
+
+
+def snap_time(dt: datetime) -> datetime:
+    """Nearest model time step (UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    step = math.floor(dt.timestamp() / TIME_STEP_S + 0.5)
+    return datetime.fromtimestamp(step * TIME_STEP_S, timezone.utc)
+
+
+def _cache_key(lat: float, lon: float, dt: datetime) -> str:
+    lat, lon = snap_point(lat, lon)
+    return f"{lat},{lon},{_format_time(snap_time(dt))}"
+
+
+def weather_version(lat: float, lon: float, dt: datetime) -> Optional[Tuple[float, float]]:
+    """(stored_at, seconds left fresh) of the cached forecast point (or its grid tile, or the climatology store), or None."""
+    if _beyond_horizon(dt) and climatology_weather(lat, lon, dt) is not None:
+        return _climatology.written_at, CLIMATOLOGY_FRESH_S
+    if _use_grid(dt):
+        return _grid_cache.version(_tile_key(*_tile_origin(lat, lon, dt)))
+    return _cache.version(_cache_key(lat, lon, dt))
 
 
 async def get_weather(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
@@ -25,88 +230,412 @@ async def get_weather(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
     - precipitation_mm
     - cloud_ceiling_ft
     - temperature_c
+
+    Beyond the forecast horizon the values come from climatology_weather
+    (and say so) when a climatology store covers the point.
     """
-    cache_key = f"{lat},{lon},{dt.isoformat()}"
-    now = datetime.now().timestamp()
+    if _use_grid(dt):
+        return (await get_weather_grid([(lat, lon, dt)]))[0]
 
-    # Check cache
-    if cache_key in _cache:
-        cached_time, cached_data = _cache[cache_key]
-        if now - cached_time < CACHE_TTL:
-            return cached_data
+    try:
+        if _beyond_horizon(dt):
+            climate = climatology_weather(lat, lon, dt)
+            if climate is not None:
+                return climate
 
-    # Format datetime for Meteomatics API (use current time if forecast is too far)
-    max_forecast_days = 7  # Meteomatics free tier typically supports 7 days
-    now_utc = datetime.now(timezone.utc)
+        # Fetch the grid node and time step the cache entry stands for
+        lat, lon = snap_point(lat, lon)
+        dt = snap_time(dt)
+        cache_key = _cache_key(lat, lon, dt)
+        return await _cache.get_or_fetch(cache_key, lambda: _fetch_point(lat, lon, dt))
+    except Exception as e:
+        # Return safe defaults on error
+        result = default_weather()
+        result["error"] = str(e)
+        return result
 
-    # Make dt timezone-aware if it isn't
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
 
-    time_diff = (dt - now_utc).days
+async def _fetch_point(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
+    """Fetch one location at one instant from Meteomatics (raises on failure)."""
+    dt_str = _forecast_time(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    if time_diff > max_forecast_days:
-        # Use nearest available time
-        dt = now_utc.replace(hour=dt.hour, minute=dt.minute, second=0, microsecond=0)
+    params_str = ",".join(PARAMS)
+
+    url = f"{METEOMATICS_BASE_URL}/{dt_str}/{params_str}/{lat},{lon}/json"
+
+    with timed("weather_fetch"):
+        client = get_client("meteomatics")
+        response = await client.get(
+            url,
+            auth=(METEOMATICS_USER, METEOMATICS_PASSWORD),
+            extensions={"endpoint": "point"}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Parse response
+        result = default_weather()
+
+        for param_data in data.get("data", []):
+            param = param_data.get("parameter", "")
+            values = param_data.get("coordinates", [{}])[0].get("dates", [{}])
+            if not values:
+                continue
+            _apply_value(result, param, values[0].get("value", 0))
+
+    return result
+
+
+def series_times(start: datetime, end: datetime, step_hours: int = 1) -> List[datetime]:
+    """List the slot times from start to end (inclusive) at step_hours spacing."""
+    step = timedelta(hours=step_hours)
+    slots = []
+    t = start
+    while t <= end:
+        slots.append(t)
+        t += step
+    return slots
 
-    dt_str = dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    # Parameters to fetch
-    params = [
-        "wind_speed_10m:ms",  # Wind speed at 10m
-        "precip_1h:mm",  # Precipitation
-        "cloud_base_agl:m",  # Cloud base above ground level
-        "t_2m:C"  # Temperature at 2m
-    ]
-    params_str = ",".join(params)
+async def get_weather_multi(
+    points: List[Tuple[float, float]],
+    dt: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Fetch weather for many coordinates at one instant in a single request.
+
+    Uses the multi-point syntax (lat1,lon1+lat2,lon2) for every point that
+    is not already cached, so N sites cost at most one upstream call.
+
+    Returns a list of weather dicts (same keys as get_weather) in the same
+    order as points.
+    """
+    if _use_grid(dt):
+        return await get_weather_grid([(lat, lon, dt) for lat, lon in points])
+
+    results: List[Any] = [None] * len(points)
+    missing: Dict[Tuple[float, float], List[int]] = {}
+    far = _beyond_horizon(dt)
+    dt = snap_time(dt)
 
-    url = f"https://api.meteomatics.com/{dt_str}/{params_str}/{lat},{lon}/json"
+    for i, (lat, lon) in enumerate(points):
+        if far:
+            results[i] = climatology_weather(lat, lon, dt)
+            if results[i] is not None:
+                continue
+        node = snap_point(lat, lon)
+        cached = _cache.get(_cache_key(*node, dt))
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(node, []).append(i)
+
+    if not missing:
+        return results
+
+    coords = list(missing)
+    dt_str = _forecast_time(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
+    params_str = ",".join(PARAMS)
+    coords_str = "+".join(f"{lat},{lon}" for lat, lon in coords)
+    url = f"{METEOMATICS_BASE_URL}/{dt_str}/{params_str}/{coords_str}/json"
+
+    fetched = [default_weather() for _ in coords]
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        with timed("weather_multi_fetch"):
+            client = get_client("meteomatics")
             response = await client.get(
                 url,
-                auth=(METEOMATICS_USER, METEOMATICS_PASSWORD)
+                auth=(METEOMATICS_USER, METEOMATICS_PASSWORD),
+                extensions={"endpoint": "multi_point"}
             )
             response.raise_for_status()
             data = response.json()
 
-        # Parse response
-        result = {
-            "wind_speed_kn": 0.0,
-            "precipitation_mm": 0.0,
-            "cloud_ceiling_ft": 10000.0,
-            "temperature_c": 20.0
-        }
+            # Coordinates come back in request order
+            for param_data in data.get("data", []):
+                param = param_data.get("parameter", "")
+                for j, coord_data in enumerate(param_data.get("coordinates", [])[:len(coords)]):
+                    values = coord_data.get("dates", [])
+                    if values:
+                        _apply_value(fetched[j], param, values[0].get("value", 0))
+
+            for (lat, lon), result in zip(coords, fetched):
+                _cache.set(_cache_key(lat, lon, dt), result)
+
+    except Exception as e:
+        for result in fetched:
+            result["error"] = str(e)
+
+    for coord, result in zip(coords, fetched):
+        for i in missing[coord]:
+            results[i] = result
+
+    return results
+
+
+async def get_weather_series(
+    lat: float,
+    lon: float,
+    start: datetime,
+    end: datetime,
+    step_hours: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Fetch a whole forecast window from Meteomatics in a single request.
+
+    Uses the time-range syntax (start--end:PT{step}H) so an N-slot sweep
+    costs one upstream round trip instead of N.
+
+    Returns a list of weather dicts (same keys as get_weather) in time
+    order, each with an extra "time" key holding the slot's ISO timestamp.
+    Slots beyond the forecast horizon come from climatology_weather when a
+    climatology store covers the point, and only the rest are fetched.
+    """
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    slots = series_times(start, end, step_hours)
+    # Far slots are a suffix of the window; answer the covered tail from
+    # climatology and fetch the rest
+    far: List[Dict[str, Any]] = []
+    while slots and _beyond_horizon(slots[-1]):
+        climate = climatology_weather(lat, lon, slots[-1])
+        if climate is None:
+            break
+        far.append({"time": slots.pop().isoformat(), **climate})
+    far.reverse()
+    if not slots:
+        return far
+    end = slots[-1]
+
+    if _use_grid(end):
+        results = await get_weather_grid([(lat, lon, slot) for slot in slots])
+        return [
+            {"time": slot.isoformat(), **result}
+            for slot, result in zip(slots, results)
+        ] + far
+
+    lat, lon = snap_point(lat, lon)
+    params_str = ",".join(PARAMS)
+    time_range = f"{_format_time(start)}--{_format_time(end)}:PT{step_hours}H"
+    url = f"{METEOMATICS_BASE_URL}/{time_range}/{params_str}/{lat},{lon}/json"
+
+    results = [default_weather() for _ in slots]
+
+    try:
+        with timed("weather_series_fetch"):
+            client = get_client("meteomatics")
+            response = await client.get(
+                url,
+                auth=(METEOMATICS_USER, METEOMATICS_PASSWORD),
+                extensions={"endpoint": "series"}
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            for param_data in data.get("data", []):
+                param = param_data.get("parameter", "")
+                values = param_data.get("coordinates", [{}])[0].get("dates", [])
+                for i, entry in enumerate(values[:len(slots)]):
+                    _apply_value(results[i], param, entry.get("value", 0))
+
+            for slot, result in zip(slots, results):
+                # Each slot on a model time step doubles as a warm entry for
+                # single-instant lookups
+                if snap_time(slot) == slot:
+                    _cache.set(_cache_key(lat, lon, slot), result)
+
+    except Exception as e:
+        for result in results:
+            result["error"] = str(e)
+
+    return [
+        {"time": slot.isoformat(), **result}
+        for slot, result in zip(slots, results)
+    ] + far
+
+
+def _use_grid(dt: datetime) -> bool:
+    """Whether dt is answered from grid tiles (grid mode on and within the forecast horizon)."""
+    if not WEATHER_GRID_ENABLED:
+        return False
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - datetime.now(timezone.utc)).days <= MAX_FORECAST_DAYS
+
+
+# (time, lat, lon) offsets of the 8 nodes around a point in a tile
+_CORNERS = np.array([(t, y, x) for t in (0, 1) for y in (0, 1) for x in (0, 1)], dtype=np.intp)
+
+
+class WeatherTile:
+    """
+    One regional area query, held as values[key, time, lat, lon] (float32,
+    our units, keys in WEATHER_KEYS order) on a regular grid whose first
+    node is (lat0, lon0) at start (epoch seconds).
+    """
+    __slots__ = ("lat0", "lon0", "resolution", "start", "step", "values")
+
+    def __init__(self, lat0: float, lon0: float, resolution: float, start: float, step: float, values: np.ndarray):
+        self.lat0 = lat0
+        self.lon0 = lon0
+        self.resolution = resolution
+        self.start = start
+        self.step = step
+        self.values = values
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def sample(self, lats: np.ndarray, lons: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """
+        Interpolate every (lat, lon, time) inside the tile: bilinear in space,
+        linear in time. Returns an array of shape (points, len(WEATHER_KEYS)).
+        """
+        indices, fractions = [], []
+        for position, count in zip(
+            ((times - self.start) / self.step, (lats - self.lat0) / self.resolution, (lons - self.lon0) / self.resolution),
+            self.values.shape[1:]
+        ):
+            position = np.minimum(np.maximum(position, 0.0), count - 1)
+            index = np.minimum(position.astype(np.intp), count - 2)
+            indices.append(index)
+            fractions.append(position - index)
+        fractions = np.array(fractions)
+
+        # All 8 surrounding (time, lat, lon) nodes in one gather: (keys, 8, points)
+        t, y, x = (np.add.outer(_CORNERS[:, axis], indices[axis]) for axis in range(3))
+        weights = np.where(_CORNERS[:, :, None] == 1, fractions, 1.0 - fractions).prod(axis=1)
+        return (self.values[:, t, y, x] * weights).sum(axis=1).T
+
+    def sample_point(self, lat: float, lon: float, t: float) -> List[float]:
+        """sample() for a single point, without the per-array NumPy overhead."""
+        corner, weights = [], [1.0]
+        for position, count in zip(
+            ((t - self.start) / self.step, (lat - self.lat0) / self.resolution, (lon - self.lon0) / self.resolution),
+            self.values.shape[1:]
+        ):
+            position = min(max(position, 0.0), count - 1)
+            index = min(int(position), count - 2)
+            fraction = position - index
+            corner.append(index)
+            weights = [w * f for w in weights for f in (1.0 - fraction, fraction)]
+        t0, y0, x0 = corner
+        block = self.values[:, t0:t0 + 2, y0:y0 + 2, x0:x0 + 2].reshape(len(WEATHER_KEYS), 8)
+        return (block @ np.array(weights)).tolist()
+
+
+def _tile_origin(lat: float, lon: float, dt: datetime) -> Tuple[float, float, int]:
+    """(south edge, west edge, period start) of the grid tile holding a point and time."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    size = WEATHER_GRID_TILE_DEG
+    lon = (lon + 180.0) % 360.0 - 180.0
+    lat0 = min(math.floor(lat / size) * size, 90.0 - size)
+    lon0 = math.floor(lon / size) * size
+    period = WEATHER_GRID_HOURS * TIME_STEP_S
+    return round(lat0, 6), round(lon0, 6), int(dt.timestamp() // period * period)
+
+
+def _tile_key(lat0: float, lon0: float, start: int) -> str:
+    return f"{lat0},{lon0},{start},{WEATHER_GRID_TILE_DEG},{WEATHER_GRID_HOURS}"
+
+
+async def _fetch_tile(lat0: float, lon0: float, start: int) -> WeatherTile:
+    """Fetch one tile with a single area query over the whole period (raises on failure)."""
+    size, resolution = WEATHER_GRID_TILE_DEG, GRID_RESOLUTION_DEG
+    n_nodes = int(round(size / resolution)) + 1
+    n_times = WEATHER_GRID_HOURS + 1
+
+    begin = datetime.fromtimestamp(start, timezone.utc)
+    end = begin + timedelta(hours=WEATHER_GRID_HOURS)
+    time_range = f"{_format_time(begin)}--{_format_time(end)}:PT1H"
+    # Area syntax: north-west corner _ south-east corner : lat,lon resolution
+    area = f"{round(lat0 + size, 6)},{lon0}_{lat0},{round(lon0 + size, 6)}:{resolution},{resolution}"
+    url = f"{METEOMATICS_BASE_URL}/{time_range}/{','.join(PARAMS)}/{area}/json"
+
+    # Parameters missing from the response keep their safe defaults
+    defaults = default_weather()
+    values = np.empty((len(WEATHER_KEYS), n_times, n_nodes, n_nodes), dtype=np.float32)
+    for k, key in enumerate(WEATHER_KEYS):
+        values[k] = defaults[key]
+
+    with timed("weather_grid_fetch"):
+        client = get_client("meteomatics")
+        response = await client.get(
+            url,
+            auth=(METEOMATICS_USER, METEOMATICS_PASSWORD),
+            extensions={"endpoint": "area"}
+        )
+        response.raise_for_status()
+        data = response.json()
 
         for param_data in data.get("data", []):
-            param = param_data.get("parameter", "")
-            values = param_data.get("coordinates", [{}])[0].get("dates", [{}])
-            if not values:
+            conversion = _conversion(param_data.get("parameter", ""))
+            if conversion is None:
                 continue
-            value = values[0].get("value", 0)
-
-            if "wind_speed" in param:
-                # Convert m/s to knots
-                result["wind_speed_kn"] = value * 1.94384
-            elif "precip" in param:
-                result["precipitation_mm"] = value
-            elif "cloud_base" in param:
-                # Convert meters to feet
-                result["cloud_ceiling_ft"] = value * 3.28084
-            elif "t_2m" in param:
-                result["temperature_c"] = value
-
-        # Cache result
-        _cache[cache_key] = (now, result)
-        return result
+            k, factor = WEATHER_KEYS.index(conversion[0]), conversion[1]
+            for coord_data in param_data.get("coordinates", []):
+                y = int(round((coord_data.get("lat", lat0) - lat0) / resolution))
+                x = int(round(((coord_data.get("lon", lon0) - lon0) % 360.0) / resolution))
+                series = [entry.get("value", 0) for entry in coord_data.get("dates", [])[:n_times]]
+                if 0 <= y < n_nodes and 0 <= x < n_nodes and series:
+                    values[k, :len(series), y, x] = np.asarray(series, dtype=np.float32) * factor
 
-    except Exception as e:
-        # Return safe defaults on error
-        return {
-            "wind_speed_kn": 0.0,
-            "precipitation_mm": 0.0,
-            "cloud_ceiling_ft": 10000.0,
-            "temperature_c": 20.0,
-            "error": str(e)
-        }
+    return WeatherTile(lat0, lon0, resolution, float(start), float(TIME_STEP_S), values)
+
+
+async def get_weather_grid(requests: List[Tuple[float, float, datetime]]) -> List[Dict[str, Any]]:
+    """
+    Weather for many (lat, lon, time) requests from regional grid tiles.
+
+    Requests are grouped by tile; each tile costs one area query (shared by
+    concurrent callers through the tile cache) and all requests in it are
+    interpolated in one vectorized pass.
+
+    Returns a list of weather dicts (same keys as get_weather) in request
+    order.
+    """
+    groups: Dict[Tuple[float, float, int], List[int]] = {}
+    for i, (lat, lon, dt) in enumerate(requests):
+        groups.setdefault(_tile_origin(lat, lon, dt), []).append(i)
+
+    # Fresh tiles are used directly; only missing or stale ones go through the fetch path
+    tiles: List[Any] = [_grid_cache.get(_tile_key(*origin)) for origin in groups]
+    missing = [j for j, tile in enumerate(tiles) if tile is None]
+    if missing:
+        origins = list(groups)
+        fetched = await asyncio.gather(
+            *(_grid_cache.get_or_fetch(_tile_key(*origins[j]), lambda origin=origins[j]: _fetch_tile(*origin))
+              for j in missing),
+            return_exceptions=True
+        )
+        for j, tile in zip(missing, fetched):
+            tiles[j] = tile
+
+    results: List[Any] = [None] * len(requests)
+    for indices, tile in zip(groups.values(), tiles):
+        if isinstance(tile, BaseException):
+            for i in indices:
+                results[i] = {**default_weather(), "error": str(tile)}
+            continue
+        if len(indices) == 1:
+            lat, lon, dt = requests[indices[0]]
+            lon = (lon - tile.lon0) % 360.0 + tile.lon0
+            t = (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+            results[indices[0]] = dict(zip(WEATHER_KEYS, tile.sample_point(lat, lon, t)))
+            continue
+        lats = np.array([requests[i][0] for i in indices], dtype=float)
+        lons = np.array([requests[i][1] for i in indices], dtype=float)
+        lons = (lons - tile.lon0) % 360.0 + tile.lon0
+        times = np.array([
+            (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+            for dt in (requests[i][2] for i in indices)
+        ])
+        for i, row in zip(indices, tile.sample(lats, lons, times).tolist()):
+            results[i] = dict(zip(WEATHER_KEYS, row))
+    return results
@@ -0,0 +1,266 @@
+"""Prometheus-format metrics for decisions, upstream calls and caches.
+
+Stage timings and upstream responses are recorded into in-process
+histograms and counters (one dict update and a bisect per observation);
+cache counters are read from TTLCache.stats when /metrics is scraped, so
+they cost nothing on the request path. METRICS_ENABLED=0 turns every
+observation into a no-op.
+
+With SERVER_TIMING_ENABLED=1, the stage timings of each request are also
+collected per request (see start_request_timing) and returned in a
+Server-Timing response header.
+"""
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+from integrations.cache import CACHES
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "0") == "1"
+
+# Seconds; covers sub-millisecond scoring up to upstream timeouts
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Every metric registers itself here, in exposition order
+METRICS: List["_Metric"] = []
+
+# Stage name -> seconds for the request being handled, when it is timed
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        METRICS.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter with labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if METRICS_ENABLED:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, with labels."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        if METRICS_ENABLED:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Histogram with fixed buckets; bucket counts are made cumulative when rendered."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "launchadvisor_stage_seconds",
+    "Time spent in each stage of making a decision (including cache hits).",
+    ("stage",)
+)
+SOURCE_OUTCOMES = Counter(
+    "launchadvisor_source_outcomes_total",
+    "Decision inputs by source and outcome (ok, error, timeout, deadline).",
+    ("source", "outcome")
+)
+UPSTREAM_SECONDS = Histogram(
+    "launchadvisor_upstream_request_seconds",
+    "Upstream HTTP request latency until response headers.",
+    ("upstream", "endpoint")
+)
+UPSTREAM_RESPONSES = Counter(
+    "launchadvisor_upstream_responses_total",
+    "Upstream HTTP responses by status code, or the exception name when no response arrived.",
+    ("upstream", "endpoint", "status")
+)
+UPSTREAM_REJECTIONS = Counter(
+    "launchadvisor_upstream_rejections_total",
+    "Upstream requests refused by the scheduler without being sent, by reason.",
+    ("upstream", "reason")
+)
+UPSTREAM_QUEUED = Gauge(
+    "launchadvisor_upstream_queued_requests",
+    "Upstream requests waiting for a rate-limit token.",
+    ("upstream",)
+)
+UPSTREAM_CIRCUIT = Gauge(
+    "launchadvisor_upstream_circuit_state",
+    "Upstream circuit breaker state (0 closed, 1 half-open, 2 open).",
+    ("upstream",)
+)
+HTTP_SECONDS = Histogram(
+    "launchadvisor_http_request_seconds",
+    "API request latency until the response starts.",
+    ("method", "route", "status")
+)
+
+
+class StageTimer:
+    """Context manager that records one stage's duration."""
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        observe_stage(self.stage, time.perf_counter() - self.start)
+
+
+def timed(stage: str) -> StageTimer:
+    """Time a block: `with timed("scoring"): ...`"""
+    return StageTimer(stage)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration in the histogram and the current request's breakdown."""
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def start_request_timing() -> Dict[str, float]:
+    """
+    Collect stage timings for the current request (and tasks it starts)
+    into the returned dict.
+    """
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    """Server-Timing header value; durations in milliseconds."""
+    entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
+
+
+def _cache_metrics() -> List[str]:
+    """Cache counters and sizes, read from each TTLCache at scrape time."""
+    lines = [
+        "# HELP launchadvisor_cache_events_total Cache lookups and maintenance events by cache.",
+        "# TYPE launchadvisor_cache_events_total counter",
+    ]
+    for name, cache in sorted(CACHES.items()):
+        for event, value in sorted(cache.stats.items()):
+            lines.append(f'launchadvisor_cache_events_total{{cache="{name}",event="{event}"}} {value}')
+    lines += [
+        "# HELP launchadvisor_cache_entries Entries currently held by each cache.",
+        "# TYPE launchadvisor_cache_entries gauge",
+    ]
+    lines += [
+        f'launchadvisor_cache_entries{{cache="{name}"}} {len(cache)}' for name, cache in sorted(CACHES.items())
+    ]
+    return lines
+
+
+def render_metrics(extra: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+
+    extra maps gauge names to (help text, value) for values owned by the
+    caller (e.g. active subscriptions).
+    """
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _cache_metrics()
+    for name, (documentation, value) in (extra or {}).items():
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,428 @@
+"""Vectorized SGP4 orbit propagation over a whole TLE catalog.
+
+This is the near-Earth SGP4 model (Vallado et al., "Revisiting Spacetrack
+Report #3", WGS-72 constants) written with NumPy so that every object in the
+catalog is propagated in one pass instead of a Python loop per satellite.
+
+Deep-space objects (period >= 225 min) are propagated with the same model
+without the lunar/solar (SDP4) terms. That is less accurate far from epoch,
+but launch screening only cares about objects inside the low-altitude ascent
+corridor, where the near-Earth model dominates.
+"""
+import math
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# WGS-72 constants used by SGP4
+MU = 398600.8  # km^3/s^2
+RADIUS_EARTH_KM = 6378.135
+XKE = 60.0 / math.sqrt(RADIUS_EARTH_KM ** 3 / MU)
+J2 = 0.001082616
+J3 = -0.00000253881
+J4 = -0.00000165597
+J3OJ2 = J3 / J2
+X2O3 = 2.0 / 3.0
+TWO_PI = 2.0 * math.pi
+DEG2RAD = math.pi / 180.0
+MINUTES_PER_DAY = 1440.0
+
+# Columns of a parsed catalog, all 1-D arrays of equal length
+ELEMENT_FIELDS = ("norad_id", "epoch", "bstar", "inclo", "nodeo", "ecco", "argpo", "mo", "no_kozai")
+
+
+# ---------------------------------------------------------------------------
+# TLE parsing
+# ---------------------------------------------------------------------------
+
+def _alpha5_to_int(text: str) -> int:
+    """Decode a NORAD catalog number, including the Alpha-5 form (e.g. "A0001")."""
+    text = text.strip()
+    if text and text[0].isalpha():
+        letters = "ABCDEFGHJKLMNPQRSTUVWXYZ"  # I and O are skipped
+        return (letters.index(text[0].upper()) + 10) * 10000 + int(text[1:])
+    return int(text)
+
+
+def _implied_decimal(text: str) -> float:
+    """Decode TLE fields like " 12345-4" (= 0.12345e-4)."""
+    text = text.strip()
+    if not text:
+        return 0.0
+    sign = -1.0 if text[0] == "-" else 1.0
+    text = text.lstrip("+-")
+    mantissa, exponent = text[:-2], text[-2:]
+    return sign * float(f"0.{mantissa}e{exponent}")
+
+
+def _tle_epoch(field: str) -> float:
+    """TLE epoch (YYDDD.DDDDDDDD) as Unix seconds."""
+    year = int(field[:2])
+    year += 1900 if year >= 57 else 2000
+    day_of_year = float(field[2:])
+    start = datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()
+    return start + (day_of_year - 1.0) * 86400.0
+
+
+def parse_tle_lines(lines: Iterable[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """
+    Parse two-line or three-line (Space-Track "3le") element sets.
+
+    Returns (elements, names): a dict of arrays keyed by ELEMENT_FIELDS
+    (angles in radians, mean motion in rad/min, epoch in Unix seconds) and
+    the object names ("" when the file has no name lines).
+    """
+    rows = {field: [] for field in ELEMENT_FIELDS}
+    names: List[str] = []
+    name = ""
+    line1: Optional[str] = None
+
+    for raw in lines:
+        line = raw.rstrip()
+        if not line:
+            continue
+        if line.startswith("1 ") and len(line) >= 64:
+            line1 = line
+            continue
+        if line.startswith("2 ") and line1 is not None and len(line) >= 63:
+            rows["norad_id"].append(_alpha5_to_int(line1[2:7]))
+            rows["epoch"].append(_tle_epoch(line1[18:32]))
+            rows["bstar"].append(_implied_decimal(line1[53:61]))
+            rows["inclo"].append(float(line[8:16]) * DEG2RAD)
+            rows["nodeo"].append(float(line[17:25]) * DEG2RAD)
+            rows["ecco"].append(float("0." + line[26:33].strip()))
+            rows["argpo"].append(float(line[34:42]) * DEG2RAD)
+            rows["mo"].append(float(line[43:51]) * DEG2RAD)
+            rows["no_kozai"].append(float(line[52:63]) * TWO_PI / MINUTES_PER_DAY)
+            names.append(name)
+            name, line1 = "", None
+            continue
+        # Anything else is a name line ("0 NAME" in Space-Track 3le files)
+        name = line[2:].strip() if line.startswith("0 ") else line.strip()
+        line1 = None
+
+    elements = {
+        field: np.asarray(values, dtype=np.int64 if field == "norad_id" else np.float64)
+        for field, values in rows.items()
+    }
+    return elements, names
+
+
+# ---------------------------------------------------------------------------
+# SGP4
+# ---------------------------------------------------------------------------
+
+class SGP4Batch:
+    """
+    SGP4 initialised once for a set of element arrays.
+
+    propagate(tsince) accepts minutes since each object's epoch as an array
+    broadcastable against the catalog (shape (N,) or (T, N)) and returns
+    TEME positions in km with shape tsince.shape + (3,). Objects that have
+    decayed or whose elements become invalid come back as NaN.
+    """
+
+    def __init__(self, elements: Dict[str, np.ndarray]):
+        ecco = np.asarray(elements["ecco"], dtype=np.float64)
+        inclo = np.asarray(elements["inclo"], dtype=np.float64)
+        no_kozai = np.asarray(elements["no_kozai"], dtype=np.float64)
+        bstar = np.asarray(elements["bstar"], dtype=np.float64)
+        argpo = np.asarray(elements["argpo"], dtype=np.float64)
+        mo = np.asarray(elements["mo"], dtype=np.float64)
+
+        self.ecco, self.inclo, self.nodeo = ecco, inclo, np.asarray(elements["nodeo"], dtype=np.float64)
+        self.argpo, self.mo, self.bstar = argpo, mo, bstar
+
+        # initl: recover the original mean motion and semi-major axis
+        eccsq = ecco * ecco
+        omeosq = 1.0 - eccsq
+        rteosq = np.sqrt(omeosq)
+        cosio = np.cos(inclo)
+        cosio2 = cosio * cosio
+        ak = (XKE / no_kozai) ** X2O3
+        d1 = 0.75 * J2 * (3.0 * cosio2 - 1.0) / (rteosq * omeosq)
+        del_ = d1 / (ak * ak)
+        adel = ak * (1.0 - del_ * del_ - del_ * (1.0 / 3.0 + 134.0 * del_ * del_ / 81.0))
+        del_ = d1 / (adel * adel)
+        no_unkozai = no_kozai / (1.0 + del_)
+        ao = (XKE / no_unkozai) ** X2O3
+        sinio = np.sin(inclo)
+        po = ao * omeosq
+        con42 = 1.0 - 5.0 * cosio2
+        con41 = -con42 - cosio2 - cosio2
+        posq = po * po
+        rp = ao * (1.0 - ecco)
+
+        # sgp4init: drag and secular-rate coefficients
+        ss = 78.0 / RADIUS_EARTH_KM + 1.0
+        qzms2t = ((120.0 - 78.0) / RADIUS_EARTH_KM) ** 4
+        self.isimp = rp < (220.0 / RADIUS_EARTH_KM + 1.0)
+
+        perige = (rp - 1.0) * RADIUS_EARTH_KM
+        sfour_km = np.where(perige < 98.0, 20.0, perige - 78.0)
+        low = perige < 156.0
+        qzms24 = np.where(low, ((120.0 - sfour_km) / RADIUS_EARTH_KM) ** 4, qzms2t)
+        sfour = np.where(low, sfour_km / RADIUS_EARTH_KM + 1.0, ss)
+
+        pinvsq = 1.0 / posq
+        tsi = 1.0 / (ao - sfour)
+        eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = np.abs(1.0 - etasq)
+        coef = qzms24 * tsi ** 4
+        coef1 = coef / psisq ** 3.5
+        cc2 = coef1 * no_unkozai * (
+            ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq))
+            + 0.375 * J2 * tsi / psisq * con41 * (8.0 + 3.0 * etasq * (8.0 + etasq))
+        )
+        cc1 = bstar * cc2
+        big_e = ecco > 1.0e-4
+        safe_ecco = np.where(big_e, ecco, 1.0)
+        cc3 = np.where(big_e, -2.0 * coef * tsi * J3OJ2 * no_unkozai * sinio / safe_ecco, 0.0)
+        x1mth2 = 1.0 - cosio2
+        cc4 = 2.0 * no_unkozai * coef1 * ao * omeosq * (
+            eta * (2.0 + 0.5 * etasq) + ecco * (0.5 + 2.0 * etasq)
+            - J2 * tsi / (ao * psisq) * (
+                -3.0 * con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta))
+                + 0.75 * x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) * np.cos(2.0 * argpo)
+            )
+        )
+        cc5 = 2.0 * coef1 * ao * omeosq * (1.0 + 2.75 * (etasq + eeta) + eeta * etasq)
+        cosio4 = cosio2 * cosio2
+        temp1 = 1.5 * J2 * pinvsq * no_unkozai
+        temp2 = 0.5 * temp1 * J2 * pinvsq
+        temp3 = -0.46875 * J4 * pinvsq * pinvsq * no_unkozai
+        self.mdot = (
+            no_unkozai + 0.5 * temp1 * rteosq * con41
+            + 0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4)
+        )
+        self.argpdot = (
+            -0.5 * temp1 * con42 + 0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4)
+            + temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4)
+        )
+        xhdot1 = -temp1 * cosio
+        self.nodedot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * cosio2) + 2.0 * temp3 * (3.0 - 7.0 * cosio2)) * cosio
+        self.omgcof = bstar * cc3 * np.cos(argpo)
+        safe_eeta = np.where(big_e, eeta, 1.0)
+        self.xmcof = np.where(big_e, -X2O3 * coef * bstar / safe_eeta, 0.0)
+        self.nodecf = 3.5 * omeosq * xhdot1 * cc1
+        self.t2cof = 1.5 * cc1
+        denom = np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+        self.xlcof = -0.25 * J3OJ2 * sinio * (3.0 + 5.0 * cosio) / denom
+        self.aycof = -0.5 * J3OJ2 * sinio
+        self.delmo = (1.0 + eta * np.cos(mo)) ** 3
+        self.sinmao = np.sin(mo)
+        self.x7thm1 = 7.0 * cosio2 - 1.0
+
+        cc1sq = cc1 * cc1
+        d2 = 4.0 * ao * tsi * cc1sq
+        temp = d2 * tsi * cc1 / 3.0
+        d3 = (17.0 * ao + sfour) * temp
+        d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+        # Higher-order drag terms are dropped for very low perigees (isimp)
+        keep = ~self.isimp
+        self.d2 = np.where(keep, d2, 0.0)
+        self.d3 = np.where(keep, d3, 0.0)
+        self.d4 = np.where(keep, d4, 0.0)
+        self.t3cof = np.where(keep, d2 + 2.0 * cc1sq, 0.0)
+        self.t4cof = np.where(keep, 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq)), 0.0)
+        self.t5cof = np.where(
+            keep, 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 + 15.0 * cc1sq * (2.0 * d2 + cc1sq)), 0.0
+        )
+        self.omgcof = np.where(keep, self.omgcof, 0.0)
+        self.xmcof = np.where(keep, self.xmcof, 0.0)
+        self.cc5 = np.where(keep, cc5, 0.0)
+
+        self.cc1, self.cc4, self.eta = cc1, cc4, eta
+        self.no_unkozai = no_unkozai
+        self.con41, self.x1mth2 = con41, x1mth2
+
+    def subset(self, index: np.ndarray) -> "SGP4Batch":
+        """SGP4 state for some of the objects, without re-initialising."""
+        subset = SGP4Batch.__new__(SGP4Batch)
+        for name, value in vars(self).items():
+            subset.__dict__[name] = value[index]
+        return subset
+
+    def propagate(self, tsince: np.ndarray) -> np.ndarray:
+        """TEME positions (km) at tsince minutes from epoch; NaN where invalid."""
+        # Invalid elements produce NaNs on purpose; don't warn about them
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._propagate(np.asarray(tsince, dtype=np.float64))
+
+    def _propagate(self, t: np.ndarray) -> np.ndarray:
+        t2 = t * t
+
+        xmdf = self.mo + self.mdot * t
+        argpdf = self.argpo + self.argpdot * t
+        nodedf = self.nodeo + self.nodedot * t
+        nodem = nodedf + self.nodecf * t2
+        tempa = 1.0 - self.cc1 * t
+        tempe = self.bstar * self.cc4 * t
+        templ = self.t2cof * t2
+
+        # Higher-order drag (coefficients are zero for isimp objects)
+        delomg = self.omgcof * t
+        delm = self.xmcof * ((1.0 + self.eta * np.cos(xmdf)) ** 3 - self.delmo)
+        temp = delomg + delm
+        mm = xmdf + temp
+        argpm = argpdf - temp
+        t3 = t2 * t
+        t4 = t3 * t
+        tempa = tempa - self.d2 * t2 - self.d3 * t3 - self.d4 * t4
+        tempe = tempe + self.bstar * self.cc5 * (np.sin(mm) - self.sinmao)
+        templ = templ + self.t3cof * t3 + t4 * (self.t4cof + t * self.t5cof)
+
+        am = (XKE / self.no_unkozai) ** X2O3 * tempa * tempa
+        em = self.ecco - tempe
+        invalid = (em >= 1.0) | (em < -0.001)
+        em = np.where(em < 1.0e-6, 1.0e-6, em)
+        mm = mm + self.no_unkozai * templ
+        xlm = mm + argpm + nodem
+
+        nodem = np.fmod(nodem, TWO_PI)
+        argpm = np.fmod(argpm, TWO_PI)
+        xlm = np.fmod(xlm, TWO_PI)
+        mm = np.fmod(xlm - argpm - nodem, TWO_PI)
+
+        sinip = np.sin(self.inclo)
+        cosip = np.cos(self.inclo)
+
+        # Long-period periodics
+        axnl = em * np.cos(argpm)
+        temp = 1.0 / (am * (1.0 - em * em))
+        aynl = em * np.sin(argpm) + temp * self.aycof
+        xl = mm + argpm + nodem + temp * self.xlcof * axnl
+
+        # Solve Kepler's equation (fixed iteration count, vectorized)
+        u = np.fmod(xl - nodem, TWO_PI)
+        eo1 = u.copy()
+        for _ in range(10):
+            sineo1 = np.sin(eo1)
+            coseo1 = np.cos(eo1)
+            tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1.0 - coseo1 * axnl - sineo1 * aynl)
+            tem5 = np.clip(tem5, -0.95, 0.95)
+            eo1 = eo1 + tem5
+            if np.all(np.abs(tem5) < 1.0e-12):
+                break
+        sineo1 = np.sin(eo1)
+        coseo1 = np.cos(eo1)
+
+        # Short-period preliminary quantities
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1.0 - el2)
+        invalid |= pl < 0.0
+        pl = np.where(pl < 0.0, np.nan, pl)
+        rl = am * (1.0 - ecose)
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * J2 * temp
+        temp2 = temp1 * temp
+
+        # Short-period periodics
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * self.con41) + 0.5 * temp1 * self.x1mth2 * cos2u
+        su = su - 0.25 * temp2 * self.x7thm1 * sin2u
+        xnode = nodem + 1.5 * temp2 * cosip * sin2u
+        xinc = self.inclo + 1.5 * temp2 * cosip * sinip * cos2u
+
+        sinsu, cossu = np.sin(su), np.cos(su)
+        snod, cnod = np.sin(xnode), np.cos(xnode)
+        sini, cosi = np.sin(xinc), np.cos(xinc)
+        xmx = -snod * cosi
+        xmy = cnod * cosi
+        ux = xmx * sinsu + cnod * cossu
+        uy = xmy * sinsu + snod * cossu
+        uz = sini * sinsu
+
+        # Decayed objects (radius below the Earth's surface) are invalid too
+        invalid |= mrt < 1.0
+        r = mrt * RADIUS_EARTH_KM
+        position = np.stack((r * ux, r * uy, r * uz), axis=-1)
+        position[invalid] = np.nan
+        return position
+
+
+# ---------------------------------------------------------------------------
+# Frames
+# ---------------------------------------------------------------------------
+
+def gmst(unix_seconds: np.ndarray) -> np.ndarray:
+    """Greenwich mean sidereal time (radians) for UT1 ~ UTC Unix seconds."""
+    jdut1 = np.asarray(unix_seconds, dtype=np.float64) / 86400.0 + 2440587.5
+    tut1 = (jdut1 - 2451545.0) / 36525.0
+    seconds = (
+        -6.2e-6 * tut1 ** 3 + 0.093104 * tut1 ** 2
+        + (876600.0 * 3600.0 + 8640184.812866) * tut1 + 67310.54841
+    )
+    return np.mod(seconds * DEG2RAD / 240.0, TWO_PI)
+
+
+def teme_to_ecef(position: np.ndarray, unix_seconds: np.ndarray) -> np.ndarray:
+    """Rotate TEME positions into the Earth-fixed frame (polar motion ignored)."""
+    theta = gmst(unix_seconds)
+    c, s = np.cos(theta), np.sin(theta)
+    x, y, z = position[..., 0], position[..., 1], position[..., 2]
+    return np.stack((c * x + s * y, -s * x + c * y, z), axis=-1)
+
+
+def geodetic_to_ecef(lat_deg: float, lon_deg: float, alt_km: float = 0.0) -> np.ndarray:
+    """WGS-84 geodetic coordinates to an Earth-fixed position in km."""
+    a = 6378.137
+    f = 1.0 / 298.257223563
+    e2 = f * (2.0 - f)
+    lat = lat_deg * DEG2RAD
+    lon = lon_deg * DEG2RAD
+    n = a / math.sqrt(1.0 - e2 * math.sin(lat) ** 2)
+    return np.array([
+        (n + alt_km) * math.cos(lat) * math.cos(lon),
+        (n + alt_km) * math.cos(lat) * math.sin(lon),
+        (n * (1.0 - e2) + alt_km) * math.sin(lat),
+    ])
+
+
+def segment_distances(
+    p0: np.ndarray,
+    p1: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Closest distance between moving segments p0->p1 (arrays of shape (..., 3))
+    and one fixed segment a->b.
+
+    Returns (distance, s) where s in [0, 1] is the fraction along p0->p1 at
+    the closest point.
+    """
+    d1 = p1 - p0
+    d2 = b - a
+    r = p0 - a
+    aa = np.einsum("...i,...i->...", d1, d1)
+    ee = float(np.dot(d2, d2))
+    ff = np.einsum("...i,i->...", r, d2)
+    cc = np.einsum("...i,...i->...", d1, r)
+    bb = np.einsum("...i,i->...", d1, d2)
+    denom = aa * ee - bb * bb
+
+    safe_denom = np.where(denom > 1e-12, denom, 1.0)
+    s = np.where(denom > 1e-12, np.clip((bb * ff - cc * ee) / safe_denom, 0.0, 1.0), 0.0)
+    t = (bb * s + ff) / ee
+    # Re-clamp t and recompute s where t falls off the fixed segment
+    safe_aa = np.where(aa > 1e-12, aa, 1.0)
+    s = np.where(t < 0.0, np.clip(-cc / safe_aa, 0.0, 1.0), s)
+    s = np.where(t > 1.0, np.clip((bb - cc) / safe_aa, 0.0, 1.0), s)
+    t = np.clip(t, 0.0, 1.0)
+
+    closest_moving = p0 + d1 * s[..., None]
+    closest_fixed = a + d2 * t[..., None]
+    distance = np.linalg.norm(closest_moving - closest_fixed, axis=-1)
+    return distance, s
@@ -0,0 +1,329 @@
+"""Per-upstream request scheduling: rate limits, priorities, backoff and circuit breaking.
+
+Every request to an upstream passes through its UpstreamScheduler before
+it is sent (integrations.clients installs a ScheduledTransport on each
+upstream client):
+
+- A token bucket caps the request rate (rate_per_s, with bursts up to
+  burst), so a traffic spike never spends more quota than configured.
+- Requests that find the bucket empty wait in a priority queue: live
+  decisions (INTERACTIVE) go ahead of sweeps and batches (BULK), which go
+  ahead of prefetch (BACKGROUND). A request that could not get a token
+  within max_wait_s is rejected up front. The queue holds at most
+  max_queue requests; when full, a new request displaces the
+  lowest-priority waiter or is rejected.
+- A 429 or 5xx response pauses sending with exponential backoff (or for
+  Retry-After seconds).
+- failure_threshold consecutive failures open the circuit: requests fail
+  immediately with UpstreamUnavailable for open_s seconds, then a single
+  probe request decides whether to close it again.
+
+UpstreamUnavailable is an httpx.TransportError, so the integrations treat
+it like any other network failure and fall back to their safe defaults,
+which decisions report as degraded.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import httpx
+
+from integrations.metrics import UPSTREAM_CIRCUIT, UPSTREAM_QUEUED, UPSTREAM_REJECTIONS
+
+# Request priorities; lower is served first
+INTERACTIVE = 0
+BULK = 1
+BACKGROUND = 2
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+_priority: ContextVar[int] = ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """Raised instead of sending a request the scheduler will not let through."""
+
+
+@contextmanager
+def upstream_priority(priority: int) -> Iterator[None]:
+    """Send upstream requests made in this block (and tasks it starts) at priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_upstream_priority(priority: int) -> None:
+    """Priority for the rest of the current task (e.g. a background loop)."""
+    _priority.set(priority)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header given in seconds (HTTP dates are ignored)."""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+
+class UpstreamScheduler:
+    """Token bucket, priority queue, backoff and circuit breaker for one upstream."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_s: float,
+        burst: float,
+        max_queue: int = 100,
+        max_wait_s: float = 5.0,
+        failure_threshold: int = 5,
+        open_s: float = 30.0,
+        max_backoff_s: float = 60.0
+    ):
+        self.name = name
+        self.rate_per_s = rate_per_s
+        self.burst = max(burst, 1.0)
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.failure_threshold = failure_threshold
+        self.open_s = open_s
+        self.max_backoff_s = max_backoff_s
+
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        # (priority, arrival order, future) of requests waiting for a token
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self._paused_until = 0.0
+        self._backoff_s = 0.0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._failures = 0
+        self._probe_in_flight = False
+
+        self.stats = {
+            "sent": 0,
+            "queued": 0,
+            "rejected": 0,
+            "shed": 0,
+            "backoffs": 0,
+            "failures": 0,
+            "circuit_opened": 0,
+        }
+        UPSTREAM_CIRCUIT.set(0, name)
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        """Wait until a request may be sent; raises UpstreamUnavailable to fail fast."""
+        probe = self._check_circuit(time.monotonic())
+        try:
+            await self._wait_for_token(priority)
+        except BaseException:
+            # A probe that never got sent must not block the next one
+            if probe:
+                self._probe_in_flight = False
+            raise
+        self.stats["sent"] += 1
+
+    async def _wait_for_token(self, priority: int) -> None:
+        now = time.monotonic()
+        if self._paused_until - now > self.max_wait_s:
+            self._reject("backing_off")
+
+        if not self._queue and self._take_token(now):
+            return
+
+        # Fail now rather than queue a request that cannot get a token in time
+        if self.rate_per_s > 0:
+            ahead = sum(1 for waiting, _, _ in self._queue if waiting <= priority)
+            if (ahead + 1 - self._tokens) / self.rate_per_s > self.max_wait_s:
+                self._reject("over_rate")
+
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst[0] <= priority:
+                self._reject("queue_full")
+            # The newcomer outranks the lowest-priority waiter, which gives way
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            self.stats["shed"] += 1
+            UPSTREAM_REJECTIONS.inc(self.name, "shed")
+            if not worst[2].done():
+                worst[2].set_exception(UpstreamUnavailable(f"{self.name}: request shed for higher-priority work"))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._arrivals), future))
+        self.stats["queued"] += 1
+        UPSTREAM_QUEUED.set(len(self._queue), self.name)
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Give up our place; a token already granted to us is simply spent
+            entries = [entry for entry in self._queue if entry[2] is not future]
+            if len(entries) != len(self._queue):
+                self._queue = entries
+                heapq.heapify(self._queue)
+                UPSTREAM_QUEUED.set(len(self._queue), self.name)
+            raise
+
+    def record_response(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Update backoff and the circuit from an upstream response."""
+        if status_code == 429 or status_code >= 500:
+            self.stats["backoffs"] += 1
+            self._failure(_retry_after(retry_after))
+        else:
+            self._success()
+
+    def record_error(self) -> None:
+        """A request failed without a response (timeout, connection error)."""
+        self._failure(None)
+
+    def record_cancelled(self) -> None:
+        """A request was abandoned by its caller before an outcome was known."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current state, for reporting."""
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "state": self.state,
+            "queue": len(self._queue),
+            "tokens": round(min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_s), 2)
+            if self.rate_per_s > 0 else None,
+            "paused_for_s": round(max(self._paused_until - now, 0.0), 2),
+        }
+
+    def _reject(self, reason: str) -> None:
+        self.stats["rejected"] += 1
+        UPSTREAM_REJECTIONS.inc(self.name, reason)
+        raise UpstreamUnavailable(f"{self.name} unavailable ({reason.replace('_', ' ')})")
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        UPSTREAM_CIRCUIT.set(CIRCUIT_STATES[state], self.name)
+
+    def _check_circuit(self, now: float) -> bool:
+        """
+        Fail fast while open; after open_s, let exactly one probe through.
+        Returns True if the caller is that probe.
+        """
+        if self.state == "closed":
+            return False
+        if self.state == "open":
+            if now - self._opened_at < self.open_s:
+                self._reject("circuit_open")
+            self._set_state("half_open")
+        if self._probe_in_flight:
+            self._reject("circuit_open")
+        self._probe_in_flight = True
+        return True
+
+    def _success(self) -> None:
+        self._failures = 0
+        self._backoff_s = 0.0
+        self._probe_in_flight = False
+        if self.state != "closed":
+            self._set_state("closed")
+
+    def _failure(self, retry_after: Optional[float]) -> None:
+        now = time.monotonic()
+        self.stats["failures"] += 1
+        self._failures += 1
+        self._probe_in_flight = False
+
+        self._backoff_s = min(self.max_backoff_s, max(1.0, self._backoff_s * 2))
+        delay = retry_after if retry_after is not None else self._backoff_s * random.uniform(0.5, 1.0)
+        self._paused_until = max(self._paused_until, now + min(delay, self.max_backoff_s))
+
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.stats["circuit_opened"] += 1
+            self._set_state("open")
+            self._opened_at = now
+            # Everyone still queued would only wait for a doomed request
+            self._fail_queue("circuit_open")
+
+    def _fail_queue(self, reason: str) -> None:
+        queue, self._queue = self._queue, []
+        for _, _, future in queue:
+            if not future.done():
+                UPSTREAM_REJECTIONS.inc(self.name, reason)
+                self.stats["rejected"] += 1
+                future.set_exception(UpstreamUnavailable(f"{self.name} unavailable ({reason.replace('_', ' ')})"))
+        UPSTREAM_QUEUED.set(0, self.name)
+
+    def _take_token(self, now: float) -> bool:
+        if now < self._paused_until:
+            return False
+        if self.rate_per_s <= 0:
+            return True
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_s)
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def _schedule(self) -> None:
+        """Arrange for _dispatch to run when the next token (or the end of a pause) is due."""
+        if self._wakeup is not None or not self._queue:
+            return
+        now = time.monotonic()
+        delay = max(self._paused_until - now, 0.0)
+        if self.rate_per_s > 0:
+            refilled = self._tokens + (now - self._refilled_at) * self.rate_per_s
+            delay = max(delay, (1.0 - refilled) / self.rate_per_s)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        """Hand available tokens to waiting requests in priority order."""
+        self._wakeup = None
+        now = time.monotonic()
+        while self._queue:
+            future = self._queue[0][2]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            if not self._take_token(now):
+                break
+            heapq.heappop(self._queue)
+            future.set_result(None)
+        UPSTREAM_QUEUED.set(len(self._queue), self.name)
+        self._schedule()
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """Sends each request only when the upstream's scheduler admits it, and reports the outcome back."""
+
+    def __init__(self, scheduler: UpstreamScheduler, transport: httpx.AsyncBaseTransport):
+        self.scheduler = scheduler
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.scheduler.acquire(current_priority())
+        try:
+            response = await self.transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            self.scheduler.record_cancelled()
+            raise
+        except Exception:
+            self.scheduler.record_error()
+            raise
+        self.scheduler.record_response(response.status_code, response.headers.get("retry-after"))
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
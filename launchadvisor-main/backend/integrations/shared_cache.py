@@ -0,0 +1,151 @@
+"""Optional cross-process cache store backed by a local SQLite file.
+
+Set SHARED_CACHE_PATH to enable it. Every uvicorn worker on the host then
+reads and writes the same file, so an entry fetched by one worker is reused
+by the others and survives restarts. The database runs in WAL mode, so
+readers never block each other or the writer.
+
+Lookups run on the caller's thread (the event loop) and wait at most
+SHARED_CACHE_BUSY_TIMEOUT_S for a lock; a busy store reads as a miss, so
+callers fall back to their in-memory cache. Writes are queued to one
+background thread per process and never block the caller.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Tuple
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+
+# Longest a lookup or lease claim waits on a locked database (seconds)
+SHARED_CACHE_BUSY_TIMEOUT_S = float(os.getenv("SHARED_CACHE_BUSY_TIMEOUT_S", "0.05"))
+
+# Longest the background writer waits on a locked database (seconds)
+WRITE_TIMEOUT_S = 5.0
+
+# Delete expired rows after this many writes
+PRUNE_EVERY_WRITES = 500
+
+
+class SQLiteStore:
+    """Key/value store with per-entry timestamps shared by all processes on a host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = None
+        self._local = threading.local()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writes = 0
+        self.busy = 0
+        self.write_errors = 0
+
+    def _check_fork(self) -> None:
+        # Connections and threads must not cross a fork, so start over in a child
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._writer = None
+            self._pid = os.getpid()
+
+    def _connect(self, timeout: float = SHARED_CACHE_BUSY_TIMEOUT_S) -> sqlite3.Connection:
+        # One connection per thread: the caller's for reads, the writer's for writes
+        self._check_fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " cache TEXT NOT NULL, key TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, expires_at REAL NOT NULL, value TEXT NOT NULL,"
+                " PRIMARY KEY (cache, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY, owner INTEGER NOT NULL, until REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, cache: str, key: str) -> Optional[Tuple[float, Any]]:
+        """Return (stored_at, value) or None if absent, past its retention or locked."""
+        try:
+            row = self._connect().execute(
+                "SELECT stored_at, value FROM entries"
+                " WHERE cache = ? AND key = ? AND expires_at > ?",
+                (cache, key, time.time())
+            ).fetchone()
+        except sqlite3.OperationalError:
+            self.busy += 1
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, cache: str, key: str, stored_at: float, value: Any, retain: float) -> None:
+        """Queue value to be stored, keeping it for retain seconds after stored_at."""
+        encoded = json.dumps(value, default=str)
+        self._check_fork()
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-cache")
+        self._writer.submit(self._write, cache, key, stored_at, stored_at + retain, encoded)
+
+    def _write(self, cache: str, key: str, stored_at: float, expires_at: float, encoded: str) -> None:
+        try:
+            conn = self._connect(WRITE_TIMEOUT_S)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (cache, key, stored_at, expires_at, value)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (cache, key, stored_at, expires_at, encoded)
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY_WRITES == 0:
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error:
+            # The store is a best-effort second tier; the local cache has the value
+            self.write_errors += 1
+
+    def claim(self, name: str, seconds: float) -> bool:
+        """
+        Try to take a named lease for seconds.
+
+        Returns True for exactly one process per lease period, so periodic
+        work (like prefetch) runs once per host instead of once per worker.
+        A busy store counts as not claimed; the caller retries next period.
+        """
+        now = time.time()
+        try:
+            cursor = self._connect().execute(
+                "INSERT INTO leases (name, owner, until) VALUES (?, ?, ?)"
+                " ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, until = excluded.until"
+                " WHERE leases.until <= ? OR leases.owner = excluded.owner",
+                (name, os.getpid(), now + seconds, now)
+            )
+        except sqlite3.OperationalError:
+            self.busy += 1
+            return False
+        return cursor.rowcount > 0
+
+    def snapshot(self) -> dict:
+        """Counters for reporting: lookups that found the store busy and failed writes."""
+        return {"path": self.path, "busy": self.busy, "write_errors": self.write_errors}
+
+
+_store: Optional[SQLiteStore] = None
+
+
+def get_store() -> Optional[SQLiteStore]:
+    """Return the shared store if SHARED_CACHE_PATH is set, else None."""
+    global _store
+    if _store is None and SHARED_CACHE_PATH:
+        _store = SQLiteStore(SHARED_CACHE_PATH)
+    return _store
+
+
+def claim(name: str, seconds: float) -> bool:
+    """Take a host-wide lease; always succeeds when no shared store is configured."""
+    store = get_store()
+    return store.claim(name, seconds) if store is not None else True
@@ -1,62 +1,427 @@
 """Space-Track.org API integration for orbital debris/conjunction assessment."""
+import asyncio
 import os
-import httpx
-from typing import Dict, Any, List
-from datetime import datetime
+from concurrent.futures import Executor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+from integrations.cache import TTLCache
+from integrations.catalog_store import CatalogStore
+from integrations.metrics import timed
+from integrations.propagation import (
+    J2, RADIUS_EARTH_KM, XKE, X2O3, SGP4Batch, geodetic_to_ecef, gmst, parse_tle_lines,
+    segment_distances, teme_to_ecef
+)
 
 SPACETRACK_USER = os.getenv("SPACETRACK_USER", "")
 SPACETRACK_PASSWORD = os.getenv("SPACETRACK_PASSWORD", "")
 
+# Local TLE catalog in Space-Track 2le/3le format (e.g. a saved
+# gp?format=3le download). Screening is fully offline.
+TLE_CATALOG_PATH = os.getenv("TLE_CATALOG_PATH", "")
+
+# Memory-mapped columnar catalog built with integrations.catalog_store;
+# takes precedence over TLE_CATALOG_PATH when set
+TLE_STORE_PATH = os.getenv("TLE_STORE_PATH", "")
+
+# Objects whose closest approach to the ascent corridor is within
+# CONJUNCTION_MISS_KM are reported; within CONJUNCTION_HIGH_RISK_KM they
+# make the launch high risk
+CONJUNCTION_MISS_KM = float(os.getenv("CONJUNCTION_MISS_KM", "25"))
+CONJUNCTION_HIGH_RISK_KM = float(os.getenv("CONJUNCTION_HIGH_RISK_KM", "5"))
+
+# Ascent corridor: a vertical column above the pad from the ground up to
+# CORRIDOR_MAX_ALT_KM, occupied for ASCENT_WINDOW_S after liftoff
+CORRIDOR_MAX_ALT_KM = float(os.getenv("CORRIDOR_MAX_ALT_KM", "1000"))
+ASCENT_WINDOW_S = float(os.getenv("ASCENT_WINDOW_S", "600"))
+ASCENT_STEP_S = 10.0
+
+# Upper bound on Earth-fixed speed of anything that can reach the corridor,
+# used to discard objects that are too far away to arrive within the window
+MAX_OBJECT_SPEED_KM_S = 11.0
+
+# How fast the corridor turns with the Earth
+EARTH_ROTATION_RAD_S = 7.292115e-5
+
+# How many of the closest objects to list in the result
+MAX_REPORTED_OBJECTS = 10
+
+# Fine-pass steps per part of the ascent window checked before the fine pass
+SUBWINDOW_STEPS = 12
+
+# Positions propagated per vectorized SGP4 call when screening many launch
+# times at once; larger chunks only add memory traffic
+SCREEN_CHUNK_ELEMENTS = 50_000
+
 # Cache for space track data
-_cache: Dict[str, tuple[float, Any]] = {}
 CACHE_TTL = 300  # 5 minutes
+_cache = TTLCache("spacetrack", ttl=CACHE_TTL, max_entries=2000)
 
 
-async def get_conjunction_risk(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
+class Catalog:
+    """TLE catalog with SGP4 initialised for every object."""
+
+    def __init__(
+        self,
+        elements: Dict[str, np.ndarray],
+        names: Sequence[Any],
+        source: str,
+        mtime: float,
+        store: Optional[CatalogStore] = None
+    ):
+        self.norad_ids = elements["norad_id"]
+        self.names = names
+        self.epochs = elements["epoch"]
+        self.source = source
+        self.mtime = mtime
+        self.store = store
+        self.sgp4 = SGP4Batch(elements)
+
+        if store is None:
+            # Perigee altitude from mean elements, for the corridor prefilter
+            semi_major_km = (XKE / elements["no_kozai"]) ** X2O3 * RADIUS_EARTH_KM
+            self.perigee_km = semi_major_km * (1.0 - elements["ecco"]) - RADIUS_EARTH_KM
+
+    @classmethod
+    def from_tle(cls, path: str) -> "Catalog":
+        """Parse a Space-Track 2le/3le text file."""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            elements, names = parse_tle_lines(f)
+        return cls(elements, names, path, os.path.getmtime(path))
+
+    @classmethod
+    def from_store(cls, path: str) -> "Catalog":
+        """Memory-map a columnar catalog store (see integrations.catalog_store)."""
+        store = CatalogStore(path)
+        return cls(store.elements(), store.names(), path, store.mtime, store)
+
+    def __len__(self) -> int:
+        return len(self.norad_ids)
+
+    def changed(self) -> bool:
+        """True if the backing file has been replaced since loading."""
+        if self.store is not None:
+            return self.store.changed()
+        return os.path.getmtime(self.source) != self.mtime
+
+    def name(self, index: int) -> str:
+        name = self.names[index]
+        return name.decode("utf-8", errors="replace") if isinstance(name, bytes) else name
+
+    def corridor_candidates(self, max_alt_km: float) -> np.ndarray:
+        """Indices of objects whose perigee is at or below max_alt_km."""
+        if self.store is not None:
+            return self.store.band(0.0, max_alt_km)
+        return np.nonzero(self.perigee_km <= max_alt_km)[0]
+
+
+_catalog: Optional[Catalog] = None
+
+
+def load_catalog() -> Optional[Catalog]:
     """
-    Check for debris/conjunction risks near launch site and time.
+    Load the conjunction catalog.
 
-    NOTE: This is a simplified implementation. A real system would need
-    to check TLEs, compute trajectories, and assess close approach distances.
+    TLE_STORE_PATH (a memory-mapped columnar store) is preferred over
+    TLE_CATALOG_PATH (plain TLE text, parsed in full). The catalog is kept in
+    memory and reloaded when the file is replaced. Returns None when neither
+    is configured.
+    """
+    global _catalog
+    if TLE_STORE_PATH:
+        if _catalog is None or _catalog.source != TLE_STORE_PATH or _catalog.changed():
+            _catalog = Catalog.from_store(TLE_STORE_PATH)
+    elif TLE_CATALOG_PATH:
+        if _catalog is None or _catalog.source != TLE_CATALOG_PATH or _catalog.changed():
+            _catalog = Catalog.from_tle(TLE_CATALOG_PATH)
+    else:
+        return None
+    return _catalog
 
-    Returns dict with:
-    - has_high_risk: boolean
-    - close_approaches: count of tracked objects within risk zone
+
+def screen_corridor(catalog: Catalog, lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
+    """Find catalog objects passing near the ascent corridor above (lat, lon) at one launch time."""
+    return screen_corridor_times(catalog, lat, lon, [dt])[0]
+
+
+def screen_corridor_times(
+    catalog: Catalog,
+    lat: float,
+    lon: float,
+    times: Sequence[datetime]
+) -> List[Dict[str, Any]]:
+    """
+    Screen the ascent corridor above (lat, lon) for several launch times.
+
+    The catalog is narrowed in stages, propagating with vectorized SGP4:
+    1. objects whose perigee is above the corridor are skipped (once for
+       all launch times);
+    2. (launch time, object) pairs whose orbital plane stays too far from
+       the corridor during the ascent window are dropped (see
+       _plane_margins; no propagation needed);
+    3. the rest are propagated to the middle of each ascent window and
+       anything farther than it could travel in half a window is dropped;
+    4. the remaining pairs are propagated to the middle of each
+       SUBWINDOW_STEPS-step part of the window, and parts the object
+       cannot reach the corridor in are dropped;
+    5. the remaining parts are propagated at ASCENT_STEP_S steps and the
+       closest approach of each step's path segment to the corridor is
+       found.
+
+    Each pass propagates every launch time at once, in chunks of about
+    SCREEN_CHUNK_ELEMENTS positions. Returns one result per launch time.
+    """
+    launches = np.array([
+        (dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)).timestamp() for dt in times
+    ])
+    bottom = geodetic_to_ecef(lat, lon, 0.0)
+    top = geodetic_to_ecef(lat, lon, CORRIDOR_MAX_ALT_KM)
+
+    # 1. Altitude prefilter
+    candidates = catalog.corridor_candidates(CORRIDOR_MAX_ALT_KM + CONJUNCTION_MISS_KM)
+    elements = catalog.sgp4.subset(candidates)
+    epochs = catalog.epochs[candidates]
+    margins = _plane_margins(elements, np.linalg.norm(top))
+
+    # 2. Orbital plane pass at mid-window: (launch, object) pairs that may come close
+    pair_slots, pair_candidates = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    rows = max(1, SCREEN_CHUNK_ELEMENTS // max(len(candidates), 1))
+    for first in range(0, len(launches) if len(candidates) else 0, rows):
+        mid = launches[first:first + rows, None] + ASCENT_WINDOW_S / 2.0
+        distance = _plane_distances(elements, (mid - epochs[None, :]) / 60.0, mid, bottom, top)
+        slots, near = np.nonzero(distance <= margins)
+        pair_slots.append(slots + first)
+        pair_candidates.append(near)
+    pair_slot = np.concatenate(pair_slots)
+    pair_index = candidates[np.concatenate(pair_candidates)]
+
+    # 3. Coarse pass at mid-window: pairs within reach
+    reach = CONJUNCTION_MISS_KM + MAX_OBJECT_SPEED_KM_S * ASCENT_WINDOW_S / 2.0
+    near = np.empty(len(pair_slot), dtype=bool)
+    for first in range(0, len(pair_slot), SCREEN_CHUNK_ELEMENTS):
+        chunk = slice(first, first + SCREEN_CHUNK_ELEMENTS)
+        position = _positions(catalog, pair_index[chunk], launches[pair_slot[chunk]] + ASCENT_WINDOW_S / 2.0)
+        distance, _ = segment_distances(position, position, bottom, top)
+        near[chunk] = distance <= reach
+    pair_slot, pair_index = pair_slot[near], pair_index[near]
+
+    # 4. Sub-window pass: (pair, part of the window) items within reach
+    offsets = np.arange(0.0, ASCENT_WINDOW_S + ASCENT_STEP_S, ASCENT_STEP_S)
+    segments = len(offsets) - 1
+    part_starts = np.arange(0, segments, SUBWINDOW_STEPS)
+    # Step indices of each part (the last part repeats its final step if short)
+    part_steps = np.minimum(part_starts[:, None] + np.arange(SUBWINDOW_STEPS + 1), segments)
+    part_middles = (offsets[part_steps[:, 0]] + offsets[part_steps[:, -1]]) / 2.0
+    part_reach = CONJUNCTION_MISS_KM + MAX_OBJECT_SPEED_KM_S * SUBWINDOW_STEPS * ASCENT_STEP_S / 2.0
+
+    item_pair = np.repeat(np.arange(len(pair_slot)), len(part_starts))
+    item_part = np.tile(np.arange(len(part_starts)), len(pair_slot))
+    near = np.empty(len(item_pair), dtype=bool)
+    for first in range(0, len(item_pair), SCREEN_CHUNK_ELEMENTS):
+        chunk = slice(first, first + SCREEN_CHUNK_ELEMENTS)
+        pairs = item_pair[chunk]
+        when = launches[pair_slot[pairs]] + part_middles[item_part[chunk]]
+        position = _positions(catalog, pair_index[pairs], when)
+        distance, _ = segment_distances(position, position, bottom, top)
+        # Keep parts whose middle is invalid; the fine pass decides
+        near[chunk] = ~(distance > part_reach)
+    item_pair, item_part = item_pair[near], item_part[near]
+
+    # 5. Fine pass over each remaining part's steps
+    miss = np.empty(len(item_pair))
+    when = np.empty(len(item_pair))
+    columns = max(1, SCREEN_CHUNK_ELEMENTS // (SUBWINDOW_STEPS + 1))
+    for first in range(0, len(item_pair), columns):
+        chunk = slice(first, first + columns)
+        pairs = item_pair[chunk]
+        step_times = launches[pair_slot[pairs]][None, :] + offsets[part_steps[item_part[chunk]]].T
+        position = _positions(catalog, pair_index[pairs], step_times)
+        step_distance, fraction = segment_distances(position[:-1], position[1:], bottom, top)
+        step_distance = np.where(np.isnan(step_distance), np.inf, step_distance)
+
+        best_step = np.argmin(step_distance, axis=0)
+        items = np.arange(len(pairs))
+        miss[chunk] = step_distance[best_step, items]
+        when[chunk] = step_times[best_step, items] + fraction[best_step, items] * ASCENT_STEP_S
+
+    # Closest part of each pair within the miss distance (earliest on ties)
+    hits = np.nonzero(miss <= CONJUNCTION_MISS_KM)[0]
+    hits = hits[np.lexsort((item_part[hits], miss[hits], item_pair[hits]))]
+    hits = hits[np.concatenate([[True], item_pair[hits][1:] != item_pair[hits][:-1]])] if len(hits) else hits
+
+    objects: List[List[Dict[str, Any]]] = [[] for _ in launches]
+    for j in hits[np.argsort(miss[hits], kind="stable")]:
+        pair = item_pair[j]
+        index = pair_index[pair]
+        objects[pair_slot[pair]].append({
+            "norad_id": int(catalog.norad_ids[index]),
+            "name": catalog.name(index),
+            "miss_km": round(float(miss[j]), 2),
+            "time": datetime.fromtimestamp(float(when[j]), timezone.utc).isoformat(),
+        })
+    screened = np.bincount(pair_slot, minlength=len(launches))
+
+    return [
+        {
+            "has_high_risk": any(o["miss_km"] <= CONJUNCTION_HIGH_RISK_KM for o in slot_objects),
+            "close_approaches": len(slot_objects),
+            "closest_km": slot_objects[0]["miss_km"] if slot_objects else None,
+            "objects": slot_objects[:MAX_REPORTED_OBJECTS],
+            "catalog_objects": len(catalog),
+            "screened_objects": int(count),
+            "miss_distance_km": CONJUNCTION_MISS_KM,
+        }
+        for slot_objects, count in zip(objects, screened)
+    ]
+
+
+def _plane_margins(elements: SGP4Batch, corridor_radius_km: float) -> np.ndarray:
+    """
+    Per object, how far (km) the corridor may be from its mean orbital plane
+    at mid-window while the object still comes within CONJUNCTION_MISS_KM
+    of it at some point in the window. Covers the corridor turning with the
+    Earth for half a window, nodal precession over half a window and SGP4's
+    short-period wobble of the plane (node and inclination terms of at most
+    1.5 * J2 / (2 p^2) radians each, doubled for safety and counted at both
+    ends).
+    """
+    semi_latus = np.maximum((XKE / elements.no_unkozai) ** X2O3 * (1.0 - elements.ecco ** 2), 0.5)
+    wobble = 2.0 * 1.5 * 0.5 * J2 / semi_latus ** 2
+    precession = 1.5 * np.abs(elements.nodedot) * ASCENT_WINDOW_S / 120.0
+    rotation = EARTH_ROTATION_RAD_S * ASCENT_WINDOW_S / 2.0
+    return CONJUNCTION_MISS_KM + corridor_radius_km * (2.0 * wobble + precession + rotation)
+
+
+def _plane_distances(
+    elements: SGP4Batch,
+    tsince: np.ndarray,
+    unix_seconds: np.ndarray,
+    bottom: np.ndarray,
+    top: np.ndarray
+) -> np.ndarray:
+    """Distance (km) from the corridor to each object's mean orbital plane at tsince."""
+    node = elements.nodeo + elements.nodedot * tsince + elements.nodecf * tsince * tsince
+    sin_i, cos_i = np.sin(elements.inclo), np.cos(elements.inclo)
+    # Corridor ends in TEME (the inverse of teme_to_ecef)
+    theta = gmst(unix_seconds)
+    c, s = np.cos(theta), np.sin(theta)
+    ends = []
+    for end in (bottom, top):
+        x, y = c * end[0] - s * end[1], s * end[0] + c * end[1]
+        ends.append(sin_i * (np.sin(node) * x - np.cos(node) * y) + cos_i * end[2])
+    low, high = ends
+    # Zero if the corridor crosses the plane, else the nearer end's distance
+    return np.where(np.sign(low) != np.sign(high), 0.0, np.minimum(np.abs(low), np.abs(high)))
+
+
+def _positions(catalog: Catalog, index: np.ndarray, unix_seconds: np.ndarray) -> np.ndarray:
+    """Earth-fixed positions of objects index at unix_seconds (broadcast against index)."""
+    tsince = (unix_seconds - catalog.epochs[index]) / 60.0
+    return teme_to_ecef(catalog.sgp4.subset(index).propagate(tsince), unix_seconds)
+
+
+def screen_times(lat: float, lon: float, times: Sequence[datetime]) -> List[Dict[str, Any]]:
     """
-    cache_key = f"conjunction_{lat},{lon},{dt.isoformat()}"
-    now = datetime.now().timestamp()
+    Load the catalog and screen (lat, lon) at each of times (CPU-bound; run
+    in a thread or a worker process). Raises on failure.
+    """
+    with timed("catalog_load"):
+        catalog = load_catalog()
+    if catalog is None:
+        result = default_conjunction()
+        result["note"] = (
+            "No TLE catalog configured (set TLE_STORE_PATH or TLE_CATALOG_PATH) - screening skipped"
+        )
+        return [dict(result) for _ in times]
+    with timed("conjunction_screen"):
+        return screen_corridor_times(catalog, lat, lon, times)
 
-    # Check cache
-    if cache_key in _cache:
-        cached_time, cached_data = _cache[cache_key]
-        if now - cached_time < CACHE_TTL:
-            return cached_data
 
-    result = {
+def default_conjunction() -> Dict[str, Any]:
+    """No-risk defaults used when conjunction screening is unavailable."""
+    return {
         "has_high_risk": False,
-        "close_approaches": 0,
-        "note": "Space-Track integration placeholder - requires full TLE analysis"
+        "close_approaches": 0
     }
 
-    # For now, return safe defaults
-    # A real implementation would:
-    # 1. Authenticate with Space-Track.org
-    # 2. Query TLEs for objects in the vicinity
-    # 3. Propagate orbits to launch time
-    # 4. Calculate miss distances
-    # 5. Flag any close approaches < 5km
 
-    try:
-        # Placeholder for actual Space-Track API calls
-        # Would require authentication and TLE queries
-        if SPACETRACK_USER and SPACETRACK_PASSWORD:
-            # Real implementation would go here
-            pass
-
-        # Cache result
-        _cache[cache_key] = (now, result)
-        return result
+def _cache_key(lat: float, lon: float, dt: datetime) -> str:
+    return f"conjunction_{lat},{lon},{dt.isoformat()}"
+
+
+def conjunction_version(lat: float, lon: float, dt: datetime) -> Optional[Tuple[float, float]]:
+    """(stored_at, seconds left fresh) of the cached screening result, or None."""
+    return _cache.version(_cache_key(lat, lon, dt))
 
+
+async def get_conjunction_risk(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
+    """
+    Check for debris/conjunction risks near launch site and time.
+
+    Screens the local TLE catalog (TLE_STORE_PATH or TLE_CATALOG_PATH) for
+    objects passing through the ascent corridor above the site during the
+    ascent window.
+
+    Returns dict with:
+    - has_high_risk: boolean (an object within CONJUNCTION_HIGH_RISK_KM)
+    - close_approaches: count of tracked objects within CONJUNCTION_MISS_KM
+    - closest_km, objects: the closest approaches, nearest first
+    """
+    try:
+        return await _cache.get_or_fetch(_cache_key(lat, lon, dt), lambda: _screen(lat, lon, dt))
     except Exception as e:
+        result = default_conjunction()
         result["error"] = str(e)
         return result
+
+
+async def get_conjunction_risks(
+    lat: float,
+    lon: float,
+    times: Sequence[datetime],
+    executor: Optional[Executor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Conjunction risk at (lat, lon) for each of times, as get_conjunction_risk.
+
+    Cached launch times are answered from the cache; the rest are screened
+    together in one screen_times call on executor (the default thread pool
+    when None). The screen is shielded: a caller that gives up (e.g. a
+    source budget) still leaves its results in the cache.
+
+    Returns one dict per launch time; on failure every one carries error.
+    """
+    results: List[Optional[Dict[str, Any]]] = [_cache.get(_cache_key(lat, lon, dt)) for dt in times]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        missing_times = [times[i] for i in missing]
+        if executor is None:
+            screen = asyncio.ensure_future(asyncio.to_thread(screen_times, lat, lon, missing_times))
+        else:
+            screen = asyncio.get_running_loop().run_in_executor(executor, screen_times, lat, lon, missing_times)
+        screen.add_done_callback(lambda done: _store_screen(lat, lon, missing_times, done))
+        try:
+            screened = await asyncio.shield(screen)
+        except Exception as e:
+            result = default_conjunction()
+            result["error"] = str(e)
+            return [dict(result) for _ in times]
+        for i, result in zip(missing, screened):
+            results[i] = result
+    return results
+
+
+def _store_screen(lat: float, lon: float, times: Sequence[datetime], screen: asyncio.Future) -> None:
+    """Cache the results of a finished multi-time screen."""
+    if screen.cancelled() or screen.exception() is not None:
+        return
+    for dt, result in zip(times, screen.result()):
+        _cache.set(_cache_key(lat, lon, dt), result)
+
+
+async def _screen(lat: float, lon: float, dt: datetime) -> Dict[str, Any]:
+    """Run conjunction screening for one site and time (raises on failure)."""
+    # Loading and propagation are CPU-bound; keep them off the event loop
+    return (await asyncio.to_thread(screen_times, lat, lon, [dt]))[0]
@@ -1,66 +1,354 @@
-"""NOAA SWPC (Space Weather Prediction Center) API integration."""
-import httpx
-from typing import Dict, Any
-from datetime import datetime
+"""NOAA SWPC (Space Weather Prediction Center) API integration.
+
+Each refresh downloads the 1-minute observed Kp feed and the 3-hourly Kp
+product (about a week of observed and estimated values plus the 3-day
+forecast) and caches them together with the solar wind speed. Kp for a
+given launch time is then looked up in a sorted time index built from
+that snapshot, so any number of launch times cost one download:
+
+- observed: the latest 1-minute value at or before the time, while the
+  time is no more than KP_OBSERVED_GRACE_S past the newest observation
+- forecast: the 3-hour interval of the product containing the time
+  (observed, estimated or predicted)
+- persistence: the newest value, for times outside both series
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from integrations.cache import TTLCache
+from integrations.clients import get_client
+from integrations.metrics import timed
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SWPC_BASE_URL = os.getenv("SWPC_BASE_URL", "https://services.swpc.noaa.gov").rstrip("/")
+KP_URL = f"{SWPC_BASE_URL}/json/planetary_k_index_1m.json"
+SOLAR_WIND_URL = f"{SWPC_BASE_URL}/products/summary/solar-wind-speed.json"
+KP_FORECAST_URL = f"{SWPC_BASE_URL}/products/noaa-planetary-k-index-forecast.json"
 
 # Cache for space weather data
-_cache: Dict[str, tuple[float, Any]] = {}
 CACHE_TTL = 300  # 5 minutes
+CACHE_STALE_TTL = 600  # global and slow-moving, so serve stale while refreshing
+_cache = TTLCache("swpc", ttl=CACHE_TTL, max_entries=16, stale_ttl=CACHE_STALE_TTL)
+CACHE_KEY = "space_weather"
+
+# Validators (ETag / Last-Modified) and last parsed body per feed URL, so an
+# unchanged feed costs a 304 instead of a full download
+_validators: Dict[str, Dict[str, str]] = {}
+_last_bodies: Dict[str, Any] = {}
+
+# Rolling history of 1-minute Kp values as (time_tag, kp), oldest first
+KP_HISTORY_LEN = 360  # 6 hours
+_kp_history: deque = deque(maxlen=KP_HISTORY_LEN)
+
+# 3-hourly Kp product as (time_tag of the interval start, kp, kind), oldest
+# first; kind is observed, estimated or predicted
+_kp_intervals: List[Tuple[str, float, str]] = []
+
+KP_INTERVAL_S = 3 * 3600
+# How long after the newest 1-minute value it still stands for "now"
+KP_OBSERVED_GRACE_S = 900
+
+# Where a looked-up Kp came from (KpIndex.lookup returns indices into this)
+KP_SOURCES = ("observed", "forecast", "persistence")
+_OBSERVED, _FORECAST, _PERSISTENCE = range(len(KP_SOURCES))
+
+# Kp at or above this is a geomagnetic storm
+STORM_KP = 5
+
+
+def default_space_weather() -> Dict[str, Any]:
+    """Quiet-conditions defaults used when SWPC data is unavailable."""
+    return {
+        "kp_index": 0,
+        "solar_wind_speed": 400.0,
+        "has_solar_storm": False
+    }
+
+
+def _to_seconds(time_tags: Sequence[str]) -> np.ndarray:
+    """SWPC time tags (UTC, no offset) as epoch seconds."""
+    return np.array(time_tags, dtype="datetime64[s]").astype(np.int64)
+
+
+def _seconds(dt: datetime) -> int:
+    """Epoch seconds of a datetime; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
 
+class KpIndex:
+    """Sorted arrays of the 1-minute and 3-hourly Kp series, searched by time."""
+    __slots__ = ("minute_times", "minute_kp", "interval_starts", "interval_kp", "interval_source", "latest")
 
-async def get_space_weather() -> Dict[str, Any]:
+    def __init__(self, minutes: Sequence[Sequence[Any]], intervals: Sequence[Sequence[Any]]):
+        self.minute_times = _to_seconds([entry[0] for entry in minutes])
+        self.minute_kp = np.array([entry[1] for entry in minutes], dtype=np.float64)
+        self.interval_starts = _to_seconds([entry[0] for entry in intervals])
+        self.interval_kp = np.array([entry[1] for entry in intervals], dtype=np.float64)
+        self.interval_source = np.array(
+            [_FORECAST if entry[2] == "predicted" else _OBSERVED for entry in intervals], dtype=np.int8
+        )
+        if len(self.minute_kp):
+            self.latest = float(self.minute_kp[-1])
+        else:
+            known = self.interval_kp[self.interval_source == _OBSERVED]
+            self.latest = float(known[-1]) if len(known) else 0.0
+
+    def lookup(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Kp and source (index into KP_SOURCES) for each epoch second in times."""
+        times = np.asarray(times, dtype=np.int64)
+        kp = np.full(len(times), self.latest)
+        source = np.full(len(times), _PERSISTENCE, dtype=np.int8)
+
+        if len(self.interval_starts):
+            index = np.searchsorted(self.interval_starts, times, side="right") - 1
+            covered = (index >= 0) & (times < self.interval_starts[-1] + KP_INTERVAL_S)
+            kp[covered] = self.interval_kp[index[covered]]
+            source[covered] = self.interval_source[index[covered]]
+
+        # 1-minute observations take precedence where they reach
+        if len(self.minute_times):
+            index = np.searchsorted(self.minute_times, times, side="right") - 1
+            covered = (index >= 0) & (times <= self.minute_times[-1] + KP_OBSERVED_GRACE_S)
+            kp[covered] = self.minute_kp[index[covered]]
+            source[covered] = _OBSERVED
+        return kp, source
+
+
+# Index built from the cached snapshot it was built from; rebuilt when the
+# cache holds a new snapshot
+_index: Tuple[Optional[Dict[str, Any]], Optional[KpIndex]] = (None, None)
+
+
+def _kp_index(snapshot: Dict[str, Any]) -> KpIndex:
+    global _index
+    if _index[0] is not snapshot:
+        _index = (snapshot, KpIndex(snapshot["kp_minutes"], snapshot["kp_intervals"]))
+    return _index[1]
+
+
+def _conditions(kp: float, source: int, solar_wind_speed: float) -> Dict[str, Any]:
+    return {
+        "kp_index": kp,
+        "solar_wind_speed": solar_wind_speed,
+        "has_solar_storm": kp >= STORM_KP,
+        "kp_source": KP_SOURCES[source],
+    }
+
+
+async def get_space_weather(launch_time: Optional[datetime] = None) -> Dict[str, Any]:
     """
-    Fetch current space weather conditions from NOAA SWPC.
+    Space weather conditions expected at launch_time (default: now).
 
     Returns dict with:
     - kp_index: Kp index (0-9 scale)
-    - solar_wind_speed: km/s
+    - solar_wind_speed: km/s (latest observation)
     - has_solar_storm: boolean
+    - kp_source: observed, forecast or persistence
     """
-    cache_key = "space_weather"
-    now = datetime.now().timestamp()
+    results = await get_space_weather_series([launch_time or datetime.now(timezone.utc)])
+    return results[0]
 
-    # Check cache
-    if cache_key in _cache:
-        cached_time, cached_data = _cache[cache_key]
-        if now - cached_time < CACHE_TTL:
-            return cached_data
 
-    result = {
-        "kp_index": 0,
-        "solar_wind_speed": 400.0,
-        "has_solar_storm": False
-    }
+async def get_space_weather_series(launch_times: Sequence[datetime]) -> List[Dict[str, Any]]:
+    """
+    get_space_weather for many launch times from one cached snapshot, with
+    a single vectorized index lookup.
 
+    Returns one dict per launch time, in order.
+    """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Get Kp index from 3-day forecast
-            kp_response = await client.get(
-                "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json"
-            )
-            if kp_response.status_code == 200:
-                kp_data = kp_response.json()
-                if kp_data:
-                    # Get the most recent Kp value
-                    latest = kp_data[-1]
-                    result["kp_index"] = float(latest.get("kp_index", 0))
-
-            # Get solar wind data
-            wind_response = await client.get(
-                "https://services.swpc.noaa.gov/products/summary/solar-wind-speed.json"
-            )
-            if wind_response.status_code == 200:
-                wind_data = wind_response.json()
-                if wind_data:
-                    result["solar_wind_speed"] = float(wind_data.get("WindSpeed", 400))
-
-            # Check for solar storms (Kp >= 5 indicates geomagnetic storm)
-            result["has_solar_storm"] = result["kp_index"] >= 5
-
-        # Cache result
-        _cache[cache_key] = (now, result)
-        return result
-
+        snapshot = await _cache.get_or_fetch(CACHE_KEY, _fetch_space_weather)
     except Exception as e:
+        result = default_space_weather()
         result["error"] = str(e)
-        return result
+        return [dict(result) for _ in launch_times]
+
+    kp, source = _kp_index(snapshot).lookup(np.array([_seconds(t) for t in launch_times], dtype=np.int64))
+    solar_wind_speed = snapshot["solar_wind_speed"]
+    return [
+        _conditions(value, code, solar_wind_speed)
+        for value, code in zip(kp.tolist(), source.tolist())
+    ]
+
+
+async def refresh_space_weather() -> Dict[str, Any]:
+    """Re-fetch space weather into the cache now (used by the prefetch scheduler)."""
+    return await _cache.refresh(CACHE_KEY, _fetch_space_weather)
+
+
+def space_weather_version() -> Optional[Tuple[float, float]]:
+    """
+    (changed_at, seconds left fresh) of the cached space weather, or None.
+
+    A refresh that only got 304s renews freshness but keeps changed_at, so
+    decision ETags stay valid while the feeds are unchanged.
+    """
+    version = _cache.version(CACHE_KEY)
+    cached = _cache.peek(CACHE_KEY)
+    if version is None or cached is None:
+        return version
+    return cached[1].get("changed_at", cached[0]), version[1]
+
+
+def get_kp_history(minutes: int = 180) -> List[Dict[str, Any]]:
+    """
+    Recent 1-minute Kp values kept from previous fetches (no network call).
+
+    Returns a list of {"time_tag", "kp_index"} dicts, oldest first, covering
+    at most the last `minutes` entries.
+    """
+    entries = list(_kp_history)[-minutes:] if minutes > 0 else []
+    return [{"time_tag": time_tag, "kp_index": kp} for time_tag, kp in entries]
+
+
+async def _conditional_get(url: str, endpoint: str) -> Tuple[bool, Optional[bytes]]:
+    """
+    GET url with If-None-Match / If-Modified-Since from the previous response.
+
+    Returns (changed, body). changed is False only on 304, in which case
+    body is None and callers keep their previous value. Any other error
+    status raises, so the fetch fails and the source is reported degraded.
+    """
+    headers = {}
+    validators = _validators.get(url, {})
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last_modified" in validators:
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = await get_client("swpc").get(url, headers=headers, extensions={"endpoint": endpoint})
+    if response.status_code == 304:
+        return False, None
+    response.raise_for_status()
+
+    validators = {}
+    if response.headers.get("etag"):
+        validators["etag"] = response.headers["etag"]
+    if response.headers.get("last-modified"):
+        validators["last_modified"] = response.headers["last-modified"]
+    _validators[url] = validators
+    return True, response.content
+
+
+def _parse_kp_tail(body: bytes, since: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    Parse only the newest entries of planetary_k_index_1m.json.
+
+    The feed is a flat JSON array of flat objects in time order, so we walk
+    objects backwards from the end of the body and stop at the first one we
+    already have (time_tag <= since) or once the history is full, instead of
+    decoding the whole array.
+
+    Returns (time_tag, kp) pairs oldest first.
+    """
+    entries = []
+    end = len(body)
+    while len(entries) < KP_HISTORY_LEN:
+        start = body.rfind(b"{", 0, end)
+        if start < 0:
+            break
+        close = body.find(b"}", start)
+        item = json.loads(body[start:close + 1])
+        time_tag = item.get("time_tag", "")
+        if since is not None and time_tag <= since:
+            break
+        entries.append((time_tag, float(item.get("kp_index", 0))))
+        end = start
+    entries.reverse()
+    return entries
+
+
+async def _fetch_kp() -> bool:
+    """Bring the rolling Kp history up to date; False when the feed is unchanged."""
+    with timed("kp_fetch"):
+        changed, body = await _conditional_get(KP_URL, "kp_1m")
+        if not changed or not body:
+            return changed
+        since = _kp_history[-1][0] if _kp_history else None
+        try:
+            new_entries = _parse_kp_tail(body, since)
+        except ValueError:
+            # Unexpected layout: fall back to decoding the whole document
+            new_entries = [
+                (item.get("time_tag", ""), float(item.get("kp_index", 0)))
+                for item in json.loads(body)[-KP_HISTORY_LEN:]
+                if since is None or item.get("time_tag", "") > since
+            ]
+        _kp_history.extend(new_entries)
+        return True
+
+
+def _parse_kp_intervals(document: Any) -> List[Tuple[str, float, str]]:
+    """
+    (time_tag, kp, kind) rows of noaa-planetary-k-index-forecast.json,
+    oldest first. The product is a table whose first row names the
+    columns; rows given as objects are accepted too.
+    """
+    rows = document
+    if rows and isinstance(rows[0], list):
+        header = rows[0]
+        rows = [dict(zip(header, row)) for row in rows[1:]]
+    intervals = []
+    for row in rows:
+        try:
+            kp = float(row["kp"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        intervals.append((row["time_tag"].replace(" ", "T"), kp, row.get("observed") or "predicted"))
+    intervals.sort()
+    return intervals
+
+
+async def _fetch_kp_forecast() -> bool:
+    """Refresh the 3-hourly observed / estimated / predicted Kp; False when unchanged."""
+    global _kp_intervals
+    with timed("kp_forecast_fetch"):
+        changed, body = await _conditional_get(KP_FORECAST_URL, "kp_forecast")
+        if changed and body:
+            _kp_intervals = _parse_kp_intervals(json.loads(body))
+        return changed
+
+
+async def _fetch_solar_wind() -> bool:
+    """Refresh the solar wind summary; False when the feed is unchanged."""
+    with timed("solar_wind_fetch"):
+        changed, body = await _conditional_get(SOLAR_WIND_URL, "solar_wind")
+        if changed and body:
+            _last_bodies[SOLAR_WIND_URL] = json.loads(body)
+        return changed
+
+
+async def _fetch_space_weather() -> Dict[str, Any]:
+    """
+    Fetch both Kp series and solar wind from SWPC concurrently (raises on
+    failure).
+
+    Returns the snapshot the time index is built from: kp_minutes
+    ([time_tag, kp] pairs), kp_intervals ([time_tag, kp, kind] rows),
+    solar_wind_speed and changed_at (when the data last changed). When
+    every feed answers 304 the cached snapshot is returned as is, so
+    storing it again only renews its freshness.
+    """
+    changed = await asyncio.gather(_fetch_kp(), _fetch_kp_forecast(), _fetch_solar_wind())
+    cached = _cache.peek(CACHE_KEY)
+    if cached is not None and not any(changed):
+        return cached[1]
+
+    solar_wind_speed = default_space_weather()["solar_wind_speed"]
+    wind_data = _last_bodies.get(SOLAR_WIND_URL)
+    if wind_data:
+        solar_wind_speed = float(wind_data.get("WindSpeed", 400))
+
+    return {
+        "kp_minutes": list(_kp_history),
+        "kp_intervals": list(_kp_intervals),
+        "solar_wind_speed": solar_wind_speed,
+        "changed_at": time.time(),
+    }
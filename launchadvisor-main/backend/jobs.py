@@ -0,0 +1,334 @@
+"""Asynchronous studies: multi-site, multi-profile sweeps run as background jobs.
+
+A study scores every slot of a window for several sites under one or more
+limit profiles (overrides of each site's limits, e.g. {"max_wind_kn": 20}).
+That is far too much work for one request, so it is submitted as a job:
+clients get a job ID back, poll its progress and read results per site and
+profile as they are produced.
+
+- Upstream inputs are gathered on the event loop at BULK upstream
+  priority (behind live decisions), one site at a time per job. Gathered
+  windows are kept in a single-flight cache, so concurrent or
+  back-to-back jobs over the same site and window share one set of
+  upstream calls.
+- Conjunction screening runs in a process pool of JOB_WORKERS processes,
+  in blocks of STUDY_SCREEN_SLOTS slots spread over the workers, as do
+  scoring, explanation and ranking (decide.rank_window, one task per site
+  and profile). None of it blocks the event loop; the remaining cores
+  stay with the API.
+- At most JOB_MAX_RUNNING jobs run at once and JOB_MAX_QUEUED wait; a
+  study identical to one already queued or running joins that job.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from batch_scoring import VERDICTS
+from decide import rank_window, score_window, window_inputs
+from rules import site_limits
+from sites import LAUNCH_SITES
+from integrations.cache import TTLCache
+from integrations.meteomatics import series_times
+from integrations.spacetrack import get_conjunction_risks
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "20"))
+
+# Upper bound on slots x sites x profiles per study
+JOB_MAX_EVALUATIONS = int(os.getenv("JOB_MAX_EVALUATIONS", "100000"))
+JOB_MAX_PROFILES = 10
+
+# Finished jobs (and their results) are kept this long, and at most
+# JOB_MAX_RETAINED of them
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", "3600"))
+JOB_MAX_RETAINED = 100
+
+# Slots per conjunction screening task (bounds a worker's memory use)
+STUDY_SCREEN_SLOTS = 168
+
+# Gathered window inputs shared between jobs (no longer than the weather cache)
+WINDOW_CACHE_TTL = 180
+_windows = TTLCache("study_windows", ttl=WINDOW_CACHE_TTL, max_entries=64, shared=False)
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """Raised when JOB_MAX_QUEUED jobs are already waiting."""
+
+
+def study_key(study: Dict[str, Any]) -> str:
+    """Identity of a study, so identical submissions share one job."""
+    return hashlib.sha1(json.dumps(study, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def score_study_unit(
+    window: Dict[str, Any],
+    limits: Dict[str, Any],
+    fields: Optional[Tuple[str, ...]]
+) -> Dict[str, Any]:
+    """
+    Score, explain and rank one site's window under one limit profile
+    (runs in a worker process).
+
+    Returns dict with: verdicts (slot count per verdict), best and slots
+    (as in sweep_decisions).
+    """
+    scored = score_window(window, limits)
+    ranked = rank_window(scored, fields)
+    counts = np.bincount(scored["scored"]["verdict"], minlength=len(VERDICTS)).tolist()
+    return {
+        "verdicts": dict(zip(VERDICTS, counts)),
+        "best": ranked["best"],
+        "slots": ranked["slots"],
+    }
+
+
+class Job:
+    """One submitted study, its progress and the results produced so far."""
+
+    def __init__(self, study: Dict[str, Any], key: str):
+        self.id = uuid.uuid4().hex
+        self.study = study
+        self.key = key
+        self.state = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.total = len(study["sites"]) * len(study["profiles"])
+        # One entry per (site, profile), in completion order
+        self.results: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        self.results.append(result)
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting on the current event and start a new one
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def wait_for_update(self, known: int, timeout: float) -> None:
+        """Wait until there are more than `known` results or the job has finished (or timeout)."""
+        updated = self._updated
+        if len(self.results) > known or self.finished:
+            return
+        try:
+            await asyncio.wait_for(updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State and progress, without the results."""
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "error": self.error,
+            "progress": {
+                "completed": len(self.results),
+                "total": self.total,
+                "fraction": round(len(self.results) / self.total, 4) if self.total else 1.0,
+            },
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "study": {
+                **self.study,
+                "start_time": self.study["start_time"].isoformat(),
+                "end_time": self.study["end_time"].isoformat(),
+            },
+        }
+
+
+class StudyRunner:
+    """Queues studies, runs at most max_running of them and scores them in a process pool."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_running: int = JOB_MAX_RUNNING,
+        max_queued: int = JOB_MAX_QUEUED
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        # Study key -> the queued or running job for it
+        self._active: Dict[str, Job] = {}
+        self._running = asyncio.Semaphore(max_running)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"submitted": 0, "joined": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def start(self) -> None:
+        """Create the worker pool (processes start on first use)."""
+        # spawn, not fork: the API process has an event loop and threads
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def stop(self) -> None:
+        """Cancel every unfinished job and shut the pool down."""
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, study: Dict[str, Any]) -> Tuple[Job, bool]:
+        """
+        Queue a study. Returns (job, joined): joined is True when an
+        identical study was already queued or running and its job is
+        returned instead. Raises JobQueueFull when too many jobs wait.
+        """
+        self._prune()
+        key = study_key(study)
+        existing = self._active.get(key)
+        if existing is not None:
+            self.stats["joined"] += 1
+            return existing, True
+
+        if sum(1 for job in self._active.values() if job.state == "queued") >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise JobQueueFull(f"{self.max_queued} jobs are already queued")
+
+        job = Job(study, key)
+        self.jobs[job.id] = job
+        self._active[key] = job
+        self.stats["submitted"] += 1
+        job.task = asyncio.create_task(self._run(job))
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job and wait for it to stop; finished jobs are left as they are."""
+        job = self.jobs.get(job_id)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus jobs per state, for reporting."""
+        states = {state: 0 for state in JOB_STATES}
+        for job in self.jobs.values():
+            states[job.state] += 1
+        return {**self.stats, "jobs": states, "workers": self.workers}
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._running:
+                job.state = "running"
+                job.started_at = time.time()
+                job._notify()
+                await self._execute(job)
+            job.state = "done"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self.stats[job.state] += 1
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            job._notify()
+
+    async def _execute(self, job: Job) -> None:
+        """Gather each site's window and hand one scoring task per profile to the pool."""
+        study = job.study
+        scoring: List[asyncio.Task] = []
+        try:
+            for site_code in study["sites"]:
+                # The next site's inputs are gathered while this one is scored
+                window = await self._window(site_code, study)
+                for profile, overrides in study["profiles"].items():
+                    limits = {**site_limits(site_code), **overrides}
+                    scoring.append(asyncio.create_task(self._score(job, site_code, profile, window, limits)))
+            await asyncio.gather(*scoring)
+        finally:
+            for task in scoring:
+                task.cancel()
+
+    async def _window(self, site_code: str, study: Dict[str, Any]) -> Dict[str, Any]:
+        start, end, step_hours = study["start_time"], study["end_time"], study["step_hours"]
+        key = f"{site_code}|{start.isoformat()}|{end.isoformat()}|{step_hours}"
+        return await _windows.get_or_fetch(key, lambda: self._gather_window(site_code, start, end, step_hours))
+
+    async def _gather_window(
+        self,
+        site_code: str,
+        start: datetime,
+        end: datetime,
+        step_hours: int
+    ) -> Dict[str, Any]:
+        """
+        Gather a window's upstream inputs while its conjunctions are screened
+        in the pool. Nobody is waiting on a study, so screening is not held
+        to the interactive conjunction budget.
+        """
+        site = LAUNCH_SITES[site_code]
+        times = series_times(start, end, step_hours)
+        window, blocks = await asyncio.gather(
+            window_inputs(site_code, start, end, step_hours, conjunctions=False),
+            asyncio.gather(*(
+                get_conjunction_risks(site["lat"], site["lon"], times[i:i + STUDY_SCREEN_SLOTS], self._pool)
+                for i in range(0, len(times), STUDY_SCREEN_SLOTS)
+            ))
+        )
+        degraded = dict(window["degraded"])
+        errors = [block[0]["error"] for block in blocks if block and block[0].get("error")]
+        if errors:
+            degraded["conjunction"] = f"error: {errors[0]}"
+        return {
+            **window,
+            "conjunctions": [conjunction for block in blocks for conjunction in block],
+            "degraded": degraded,
+        }
+
+    async def _score(
+        self,
+        job: Job,
+        site_code: str,
+        profile: str,
+        window: Dict[str, Any],
+        limits: Dict[str, Any]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._pool, score_study_unit, window, limits, job.study["fields"])
+        job.add_result({
+            "site_code": site_code,
+            "profile": profile,
+            "limits": limits,
+            **result,
+            "degraded": window["degraded"],
+        })
+
+    def _prune(self) -> None:
+        """Forget finished jobs past JOB_RETENTION_S, and the oldest beyond JOB_MAX_RETAINED."""
+        now = time.time()
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - JOB_MAX_RETAINED
+        for job in finished:
+            if excess > 0 or now - job.finished_at > JOB_RETENTION_S:
+                del self.jobs[job.id]
+                excess -= 1
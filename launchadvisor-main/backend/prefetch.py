@@ -0,0 +1,113 @@
+"""Background prefetch that keeps upstream data warm for every launch site."""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from sites import LAUNCH_SITES
+from decide import active_decisions
+from integrations.meteomatics import get_weather_series
+from integrations.swpc import refresh_space_weather
+from integrations.shared_cache import claim
+from integrations.scheduler import BACKGROUND, set_upstream_priority
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+
+# Refresh intervals per source (seconds). Keep them below the cache TTLs
+# (180 s weather, 300 s SWPC) so entries are replaced before they expire
+PREFETCH_INTERVALS_S = {
+    "space_weather": float(os.getenv("PREFETCH_SPACE_WEATHER_INTERVAL_S", "240")),
+    "weather": float(os.getenv("PREFETCH_WEATHER_INTERVAL_S", "150")),
+}
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.1"))  # +/- fraction of interval
+
+# How far ahead the near-term forecast is kept warm
+PREFETCH_HORIZON_HOURS = int(os.getenv("PREFETCH_HORIZON_HOURS", "48"))
+
+# Prefetch yields to live decisions, but never waits longer than this per step
+PREFETCH_MAX_YIELD_S = 2.0
+
+
+class PrefetchScheduler:
+    """
+    Periodically refreshes space weather and each site's near-term forecast.
+
+    Each source runs on its own loop with a jittered interval. Work is done
+    one site at a time and pauses while interactive decisions are gathering
+    inputs, so prefetch never competes with live requests for upstream
+    connections.
+    """
+
+    def __init__(
+        self,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: float = PREFETCH_JITTER
+    ):
+        self.intervals = dict(intervals or PREFETCH_INTERVALS_S)
+        self.jitter = jitter
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {
+            name: {"runs": 0, "errors": 0, "last_run": None, "last_error": None}
+            for name in self.intervals
+        }
+
+    def start(self) -> None:
+        """Start one background loop per source."""
+        jobs: Dict[str, Callable[[], Awaitable[None]]] = {
+            "space_weather": self.refresh_space_weather,
+            "weather": self.refresh_weather,
+        }
+        for name, interval in self.intervals.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._run(name, interval, jobs[name]))
+
+    async def stop(self) -> None:
+        """Cancel all loops and wait for them to finish."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, name: str, interval: float, job: Callable[[], Awaitable[None]]) -> None:
+        # Prefetch requests wait behind live decisions for upstream quota
+        set_upstream_priority(BACKGROUND)
+        while True:
+            # With a shared cache only one worker per host runs each cycle;
+            # the others pick the refreshed entries up from the shared store
+            if claim(f"prefetch:{name}", interval * (1 - self.jitter)):
+                try:
+                    await job()
+                    self.stats[name]["last_error"] = None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats[name]["errors"] += 1
+                    self.stats[name]["last_error"] = str(e)
+                self.stats[name]["runs"] += 1
+                self.stats[name]["last_run"] = datetime.now(timezone.utc).isoformat()
+            await asyncio.sleep(interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def _yield_to_live_requests(self) -> None:
+        """Wait (briefly) while interactive decisions are in flight."""
+        waited = 0.0
+        while active_decisions() and waited < PREFETCH_MAX_YIELD_S:
+            await asyncio.sleep(0.05)
+            waited += 0.05
+
+    async def refresh_space_weather(self) -> None:
+        await self._yield_to_live_requests()
+        await refresh_space_weather()
+
+    async def refresh_weather(self) -> None:
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=PREFETCH_HORIZON_HOURS)
+        errors = []
+        for site in LAUNCH_SITES.values():
+            await self._yield_to_live_requests()
+            series = await get_weather_series(site["lat"], site["lon"], start, end)
+            if series and series[0].get("error"):
+                errors.append(f"{site['name']}: {series[0]['error']}")
+        if errors:
+            raise RuntimeError("; ".join(errors))
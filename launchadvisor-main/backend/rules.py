@@ -0,0 +1,512 @@
+"""Declarative launch rules: scoring bands, explanation lines and citations.
+
+Each rule is defined once as data and compiled into a single-pass evaluator
+that produces the risk score, the explanation and the rule citations
+together.
+
+A rule has ordered bands; the first band whose condition matches adds its
+points and its explanation line, otherwise the rule's "else" line is used.
+Conditions are [field, op, operand] triples (a list of triples means "any
+of"), or [field] for a boolean field. Operands are numbers, limit names
+("max_wind_kn") or simple expressions on a limit (["max_wind_kn", "*", 0.8],
+["max_cloud_ceiling_ft", "min", 3000]).
+A rule with "ratio": [field, limit] exposes field / limit as "ratio".
+Explanation and citation texts are str.format templates over the inputs,
+the limits, "ratio" and "risk_score".
+
+Set RULES_PATH to a JSON file to override any top-level key of
+DEFAULT_RULES, for example per-site limits:
+
+    {"sites": {"VAFB": {"max_wind_kn": 25}}}
+
+The file is re-read whenever it changes, so rule and limit changes take
+effect without a restart.
+"""
+import hashlib
+import json
+import operator
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+import numpy as np
+
+from sites import LAUNCH_SITES
+
+RULES_PATH = os.getenv("RULES_PATH", "")
+
+# How often get_rules() looks at RULES_PATH for changes (seconds)
+RULES_CHECK_INTERVAL_S = float(os.getenv("RULES_CHECK_INTERVAL_S", "5"))
+
+# Compiled evaluators kept per rule set, least recently used evicted first.
+# Study profiles add ad-hoc limit sets, so this must stay bounded.
+COMPILED_RULES_MAX = 64
+
+# Verdict names, best first
+VERDICTS = ("GO", "MARGINAL", "NO-GO")
+
+DEFAULT_RULES: Dict[str, Any] = {
+    # Overrides on top of each site's limits in sites.py, for every site
+    "limits": {},
+    # Per-site overrides, e.g. {"VAFB": {"max_wind_kn": 25}}
+    "sites": {},
+    "max_score": 100,
+    "rules": [
+        {
+            "name": "wind",
+            "section": "WEATHER CONDITIONS",
+            "ratio": ["wind_speed_kn", "max_wind_kn"],
+            "bands": [
+                {"when": ["ratio", ">=", 1], "points": 40,
+                 "text": "🌪️ Wind: {wind_speed_kn:.1f} kn (EXCEEDS limit of {max_wind_kn} kn)"},
+                {"when": ["ratio", ">=", 0.8], "points": 20,
+                 "text": "💨 Wind: {wind_speed_kn:.1f} kn (approaching limit of {max_wind_kn} kn)"},
+                {"when": ["ratio", ">=", 0.6], "points": 10,
+                 "text": "✅ Wind: {wind_speed_kn:.1f} kn (nominal, limit {max_wind_kn} kn)"},
+            ],
+            "else": "✅ Wind: {wind_speed_kn:.1f} kn (nominal, limit {max_wind_kn} kn)",
+        },
+        {
+            "name": "precipitation",
+            "section": "WEATHER CONDITIONS",
+            "ratio": ["precipitation_mm", "max_precipitation_mm"],
+            "bands": [
+                {"when": ["ratio", ">=", 5], "points": 50,
+                 "text": "⛈️ Precipitation: {precipitation_mm:.1f} mm (CRITICAL - {ratio:.1f}x over {max_precipitation_mm} mm limit)"},
+                {"when": ["ratio", ">=", 2], "points": 35,
+                 "text": "🌧️ Precipitation: {precipitation_mm:.1f} mm (HIGH RISK - {ratio:.1f}x over {max_precipitation_mm} mm limit)"},
+                {"when": ["ratio", ">=", 1], "points": 25,
+                 "text": "🌦️ Precipitation: {precipitation_mm:.1f} mm (exceeds {max_precipitation_mm} mm limit)"},
+                {"when": ["ratio", ">=", 0.7], "points": 15,
+                 "text": "🌂 Precipitation: {precipitation_mm:.1f} mm (approaching {max_precipitation_mm} mm limit)"},
+            ],
+            "else": "✅ Precipitation: {precipitation_mm:.1f} mm (nominal, limit {max_precipitation_mm} mm)",
+        },
+        {
+            "name": "cloud_ceiling",
+            "section": "WEATHER CONDITIONS",
+            "bands": [
+                {"when": ["cloud_ceiling_ft", "<", 1000], "points": 40,
+                 "text": "☁️ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (VERY LOW - limit {max_cloud_ceiling_ft} ft)"},
+                {"when": ["cloud_ceiling_ft", "<", 2000], "points": 30,
+                 "text": "🌥️ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (LOW - limit {max_cloud_ceiling_ft} ft)"},
+                {"when": ["cloud_ceiling_ft", "<", ["max_cloud_ceiling_ft", "min", 3000]], "points": 20,
+                 "text": "⛅ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (below {max_cloud_ceiling_ft} ft limit)"},
+                # Under 3000 ft but at or above a lower limit: scored, yet within the limit
+                {"when": ["cloud_ceiling_ft", "<", 3000], "points": 20,
+                 "text": "✅ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (nominal, limit {max_cloud_ceiling_ft} ft)"},
+                {"when": ["cloud_ceiling_ft", "<", "max_cloud_ceiling_ft"], "points": 10,
+                 "text": "⛅ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (below {max_cloud_ceiling_ft} ft limit)"},
+            ],
+            "else": "✅ Cloud Ceiling: {cloud_ceiling_ft:.0f} ft (nominal, limit {max_cloud_ceiling_ft} ft)",
+        },
+        {
+            "name": "temperature",
+            "section": "WEATHER CONDITIONS",
+            "bands": [
+                {"when": ["temperature_c", ">", "max_temp_c"], "points": 25,
+                 "text": "🌡️ Temperature: {temperature_c:.1f}°C (EXCEEDS upper limit {max_temp_c}°C)"},
+                {"when": ["temperature_c", "<", "min_temp_c"], "points": 25,
+                 "text": "🥶 Temperature: {temperature_c:.1f}°C (BELOW lower limit {min_temp_c}°C)"},
+                {"when": ["temperature_c", ">", ["max_temp_c", "-", 5]], "points": 10,
+                 "text": "🔥 Temperature: {temperature_c:.1f}°C (approaching upper limit {max_temp_c}°C)"},
+                {"when": ["temperature_c", "<", ["min_temp_c", "+", 5]], "points": 10,
+                 "text": "❄️ Temperature: {temperature_c:.1f}°C (approaching lower limit {min_temp_c}°C)"},
+            ],
+            "else": "✅ Temperature: {temperature_c:.1f}°C (nominal, range {min_temp_c}-{max_temp_c}°C)",
+        },
+        {
+            "name": "kp_index",
+            "section": "SPACE WEATHER",
+            "bands": [
+                {"when": ["kp_index", ">=", 7], "points": 30,
+                 "text": "⚠️ Kp Index: {kp_index:.0f} (SEVERE geomagnetic storm)"},
+                {"when": ["kp_index", ">=", 5], "points": 15,
+                 "text": "🌩️ Kp Index: {kp_index:.0f} (Geomagnetic storm active)"},
+                {"when": ["kp_index", ">=", 3], "points": 5,
+                 "text": "⚡ Kp Index: {kp_index:.0f} (Unsettled conditions)"},
+            ],
+            "else": "✅ Kp Index: {kp_index:.0f} (Quiet)",
+        },
+        {
+            "name": "solar_storm",
+            "section": "SPACE WEATHER",
+            "bands": [
+                {"when": ["has_solar_storm"], "points": 20,
+                 "text": "☀️ Solar Activity: ACTIVE STORM DETECTED"},
+            ],
+            "else": "✅ Solar Activity: Normal",
+        },
+        {
+            "name": "conjunction",
+            "section": None,
+            "bands": [
+                {"when": ["has_high_risk"], "points": 40,
+                 "text": "🛰️ DEBRIS RISK: HIGH - Close approach detected"},
+                {"when": ["close_approaches", ">", 0], "points": 10,
+                 "text": "🛰️ DEBRIS RISK: {close_approaches} tracked object(s) nearby"},
+            ],
+            "else": "✅ DEBRIS RISK: Clear",
+        },
+    ],
+    # Highest min_score first; the lowest must start at 0
+    "verdicts": [
+        {"verdict": "NO-GO", "min_score": 70,
+         "text": "❌ RECOMMENDATION: NO-GO (Risk Score: {risk_score}/100)\nConditions are unsafe for launch. Multiple critical parameters exceeded."},
+        {"verdict": "MARGINAL", "min_score": 40,
+         "text": "⚠️ RECOMMENDATION: MARGINAL (Risk Score: {risk_score}/100)\nSome parameters of concern. Monitor closely and proceed with caution."},
+        {"verdict": "GO", "min_score": 0,
+         "text": "✅ RECOMMENDATION: GO (Risk Score: {risk_score}/100)\nAll parameters within acceptable limits for launch."},
+    ],
+    "citations": [
+        {"when": ["cloud_ceiling_ft", "<", "max_cloud_ceiling_ft"],
+         "text": "NASA-STD-4010A §4.1.8 (Thick Cloud Layers)"},
+        {"when": ["wind_speed_kn", ">", ["max_wind_kn", "*", 0.8]],
+         "text": "Vehicle SOP: Pad Wind Limit {max_wind_kn} kn"},
+        {"when": ["precipitation_mm", ">", ["max_precipitation_mm", "*", 0.5]],
+         "text": "NASA-STD-4010A §4.1.10 (Precipitation)"},
+        {"when": ["kp_index", ">=", 5],
+         "text": "SWPC Kp advisory - Geomagnetic Storm Watch"},
+        {"when": ["has_high_risk"],
+         "text": "COLA (Collision Avoidance) Analysis - High Risk"},
+    ],
+    "nominal_citation": "All parameters nominal",
+}
+
+COMPARISONS = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+}
+ARITHMETIC = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv,
+    # Element-wise, so batch_scoring can resolve operands on limit arrays
+    "min": np.minimum, "max": np.maximum,
+}
+
+Condition = Callable[[Dict[str, Any]], bool]
+
+
+def condition_terms(spec: List[Any]) -> List[List[Any]]:
+    """Normalise a condition to a list of [field] / [field, op, operand] terms."""
+    if not isinstance(spec, list) or not spec:
+        raise ValueError(f"Invalid condition: {spec!r}")
+    terms = [spec] if isinstance(spec[0], str) else spec
+    for term in terms:
+        if not isinstance(term, list) or len(term) not in (1, 3) or not isinstance(term[0], str):
+            raise ValueError(f"Invalid condition term: {term!r}")
+        if len(term) == 3 and term[1] not in COMPARISONS:
+            raise ValueError(f"Unknown comparison {term[1]!r} in {term!r}")
+    return terms
+
+
+def resolve_operand(operand: Any, limits: Dict[str, Any]) -> Any:
+    """Turn a number, limit name or [limit, op, number] into a value."""
+    if isinstance(operand, str):
+        return limits[operand]
+    if isinstance(operand, list):
+        name, op, value = operand
+        return ARITHMETIC[op](limits[name], value)
+    return operand
+
+
+def _compile_condition(spec: List[Any], limits: Dict[str, Any]) -> Condition:
+    tests = []
+    for term in condition_terms(spec):
+        if len(term) == 1:
+            tests.append(lambda ctx, field=term[0]: bool(ctx[field]))
+        else:
+            field, op, operand = term
+            tests.append(
+                lambda ctx, field=field, compare=COMPARISONS[op],
+                threshold=resolve_operand(operand, limits): compare(ctx[field], threshold)
+            )
+    if len(tests) == 1:
+        return tests[0]
+    return lambda ctx: any(test(ctx) for test in tests)
+
+
+def render_explanation(sections: Dict[Optional[str], List[str]], verdict_text: str) -> str:
+    """Join explanation lines into titled sections followed by the recommendation."""
+    blocks = [
+        f"{title}:\n" + "\n".join(lines) if title else "\n".join(lines)
+        for title, lines in sections.items()
+    ]
+    return "\n\n".join(blocks) + "\n\n\n" + verdict_text
+
+
+class CompiledRules:
+    """A rule set with every threshold resolved for one set of limits."""
+
+    def __init__(self, rules: "RuleSet", limits: Dict[str, Any]):
+        self.limits = limits
+        self.max_score = rules.max_score
+        self.rules = []
+        for rule in rules.rules:
+            ratio = None
+            if rule.get("ratio"):
+                field, limit = rule["ratio"]
+                ratio = (field, limits[limit])
+            bands = [
+                (_compile_condition(band["when"], limits), band.get("points", 0), band.get("text"))
+                for band in rule["bands"]
+            ]
+            self.rules.append((rule.get("section"), ratio, bands, rule.get("else")))
+        self.verdicts = [(v["min_score"], v["verdict"], v["text"]) for v in rules.verdicts]
+        self.citations = [
+            (_compile_condition(c["when"], limits), c["text"]) for c in rules.citations
+        ]
+        self.nominal_citation = rules.nominal_citation
+
+    def evaluate(
+        self,
+        weather: Dict[str, Any],
+        space_weather: Dict[str, Any],
+        conjunction: Dict[str, Any],
+        explain: bool = True,
+        cite: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Evaluate every rule once.
+
+        Returns dict with:
+        - risk_score: 0-100
+        - verdict: GO/MARGINAL/NO-GO
+        - why: explanation text (only if explain)
+        - rule_citations: applicable citations (only if cite)
+        """
+        return self.describe(self.score(weather, space_weather, conjunction), explain, cite)
+
+    def explain(
+        self,
+        weather: Dict[str, Any],
+        space_weather: Dict[str, Any],
+        conjunction: Dict[str, Any],
+        risk_score: int
+    ) -> str:
+        """Explanation text with the recommendation for the given risk score."""
+        ctx, _, matched = self.score(weather, space_weather, conjunction)
+        ctx["risk_score"] = risk_score
+        return self.describe((ctx, risk_score, matched), cite=False)["why"]
+
+    def verdict(self, risk_score: int) -> Tuple[str, str]:
+        """(verdict, recommendation template) for a risk score."""
+        for min_score, verdict, text in self.verdicts:
+            if risk_score >= min_score:
+                return verdict, text
+        return self.verdicts[-1][1], self.verdicts[-1][2]
+
+    def score(
+        self,
+        weather: Dict[str, Any],
+        space_weather: Dict[str, Any],
+        conjunction: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], int, List[Tuple[Optional[str], str, Optional[float]]]]:
+        """
+        One pass over the rules: (context, risk score, matched explanation
+        templates as (section, template, ratio)). Nothing is formatted here;
+        see describe().
+        """
+        ctx = {**self.limits, **weather, **space_weather, **conjunction}
+        score = 0
+        matched: List[Tuple[Optional[str], str, Optional[float]]] = []
+
+        for section, ratio, bands, fallback in self.rules:
+            if ratio is not None:
+                ctx["ratio"] = ctx[ratio[0]] / ratio[1]
+            text = fallback
+            for matches, points, band_text in bands:
+                if matches(ctx):
+                    score += points
+                    text = band_text
+                    break
+            if text is not None:
+                matched.append((section, text, ctx["ratio"] if ratio is not None else None))
+
+        risk_score = min(score, self.max_score)
+        ctx["risk_score"] = risk_score
+        return ctx, risk_score, matched
+
+    def describe(
+        self,
+        scored: Tuple[Dict[str, Any], int, List[Tuple[Optional[str], str, Optional[float]]]],
+        explain: bool = True,
+        cite: bool = True
+    ) -> Dict[str, Any]:
+        """Turn the output of score() into the evaluate() result."""
+        ctx, risk_score, matched = scored
+        verdict, verdict_text = self.verdict(risk_score)
+        result = {"risk_score": risk_score, "verdict": verdict}
+
+        citations = None
+        if cite:
+            citations = [text.format_map(ctx) for matches, text in self.citations if matches(ctx)]
+        if explain:
+            sections: Dict[Optional[str], List[str]] = {}
+            for section, text, ratio in matched:
+                if ratio is not None:
+                    ctx["ratio"] = ratio
+                sections.setdefault(section, []).append(text.format_map(ctx))
+            result["why"] = render_explanation(sections, verdict_text.format_map(ctx))
+        if cite:
+            result["rule_citations"] = citations or [self.nominal_citation]
+        return result
+
+
+class RuleSet:
+    """Validated rule definitions plus a cache of per-limits compilations."""
+
+    def __init__(self, spec: Dict[str, Any], source: str = "builtin"):
+        unknown = set(spec) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"Unknown rule set keys: {sorted(unknown)}")
+        spec = {**DEFAULT_RULES, **spec}
+
+        self.source = source
+        self.version = hashlib.sha1(
+            json.dumps(spec, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()[:12]
+        self.loaded_at = time.time()
+        self.limit_overrides: Dict[str, Any] = spec["limits"]
+        self.site_overrides: Dict[str, Dict[str, Any]] = spec["sites"]
+        self.max_score = spec["max_score"]
+        self.rules: List[Dict[str, Any]] = spec["rules"]
+        self.verdicts: List[Dict[str, Any]] = sorted(
+            spec["verdicts"], key=lambda v: v["min_score"], reverse=True
+        )
+        self.citations: List[Dict[str, Any]] = spec["citations"]
+        self.nominal_citation: str = spec["nominal_citation"]
+        self._compiled: "OrderedDict[Tuple, CompiledRules]" = OrderedDict()
+        self._validate()
+
+    def _validate(self) -> None:
+        unknown_sites = set(self.site_overrides) - set(LAUNCH_SITES)
+        if unknown_sites:
+            raise ValueError(f"Overrides for unknown sites: {sorted(unknown_sites)}")
+        names = {v["verdict"] for v in self.verdicts}
+        if names - set(VERDICTS) or not self.verdicts or self.verdicts[-1]["min_score"] > 0:
+            raise ValueError(f"Verdicts must be among {VERDICTS} with the lowest starting at 0")
+        for rule in self.rules:
+            if not rule.get("bands"):
+                raise ValueError(f"Rule {rule.get('name')!r} has no bands")
+        # Compiling against every site's limits checks every condition and
+        # catches unknown limit names up front
+        for site_code in LAUNCH_SITES:
+            self.compiled(self.site_limits(site_code))
+
+    @property
+    def fields(self) -> List[str]:
+        """Input fields the rules read, in first-use order."""
+        fields: Dict[str, None] = {}
+        for rule in self.rules:
+            if rule.get("ratio"):
+                fields[rule["ratio"][0]] = None
+            for band in rule["bands"]:
+                for term in condition_terms(band["when"]):
+                    fields[term[0]] = None
+        for citation in self.citations:
+            for term in condition_terms(citation["when"]):
+                fields[term[0]] = None
+        fields.pop("ratio", None)
+        return list(fields)
+
+    def site_limits(self, site_code: str) -> Dict[str, Any]:
+        """Effective limits for a site: sites.py, then global, then per-site overrides."""
+        return {
+            **LAUNCH_SITES[site_code]["limits"],
+            **self.limit_overrides,
+            **self.site_overrides.get(site_code, {}),
+        }
+
+    def compiled(self, limits: Dict[str, Any]) -> CompiledRules:
+        """The evaluator for a set of limits, compiled on first use."""
+        key = tuple(sorted(limits.items()))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = CompiledRules(self, dict(limits))
+            if len(self._compiled) > COMPILED_RULES_MAX:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(key)
+        return compiled
+
+    def verdict(self, risk_score: int) -> str:
+        """GO/MARGINAL/NO-GO for a risk score."""
+        for verdict in self.verdicts:
+            if risk_score >= verdict["min_score"]:
+                return verdict["verdict"]
+        return self.verdicts[-1]["verdict"]
+
+    def evaluate(
+        self,
+        weather: Dict[str, Any],
+        space_weather: Dict[str, Any],
+        conjunction: Dict[str, Any],
+        limits: Dict[str, Any],
+        explain: bool = True,
+        cite: bool = True
+    ) -> Dict[str, Any]:
+        """Score, explain and cite in one pass (see CompiledRules.evaluate)."""
+        return self.compiled(limits).evaluate(weather, space_weather, conjunction, explain, cite)
+
+
+_rules = RuleSet(DEFAULT_RULES)
+_rules_mtime: Optional[float] = None
+_last_check = float("-inf")
+_last_error: Optional[str] = None
+
+
+def load_rules(path: str) -> RuleSet:
+    """Read and validate a rule set file (raises on invalid rules)."""
+    with open(path, encoding="utf-8") as f:
+        return RuleSet(json.load(f), source=path)
+
+
+def reload_rules() -> Dict[str, Any]:
+    """
+    Re-read RULES_PATH now.
+
+    An invalid file leaves the current rules in place; the error is reported
+    in the returned status.
+    """
+    global _rules, _rules_mtime, _last_check, _last_error
+    _last_check = time.monotonic()
+    if not RULES_PATH:
+        return rules_status()
+    try:
+        mtime = os.path.getmtime(RULES_PATH)
+        _rules = load_rules(RULES_PATH)
+        _rules_mtime = mtime
+        _last_error = None
+    except Exception as e:
+        _last_error = f"{type(e).__name__}: {e}"
+    return rules_status()
+
+
+def get_rules() -> RuleSet:
+    """Current rule set, reloading RULES_PATH if the file has changed."""
+    global _last_check
+    if RULES_PATH and time.monotonic() - _last_check >= RULES_CHECK_INTERVAL_S:
+        _last_check = time.monotonic()
+        try:
+            changed = os.path.getmtime(RULES_PATH) != _rules_mtime
+        except OSError:
+            changed = False
+        if changed:
+            reload_rules()
+    return _rules
+
+
+def site_limits(site_code: str) -> Dict[str, Any]:
+    """Effective limits for a site under the current rule set."""
+    return get_rules().site_limits(site_code)
+
+
+def rules_status() -> Dict[str, Any]:
+    """Version, source and last reload error of the active rule set."""
+    return {
+        "version": _rules.version,
+        "source": _rules.source,
+        "loaded_at": _rules.loaded_at,
+        "error": _last_error,
+    }
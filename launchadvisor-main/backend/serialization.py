@@ -0,0 +1,193 @@
+"""Response encodings picked by content negotiation.
+
+- application/json: orjson when installed, stdlib json otherwise
+- application/msgpack: MessagePack (needs msgpack)
+- application/vnd.apache.arrow.stream: an Arrow IPC stream with one row
+  per result, for bulk endpoints (needs pyarrow)
+
+Clients choose with the Accept header; without one, or with */*, they get
+JSON. The three packages are in requirements.txt. The imports stay
+optional, so an install without them still serves JSON and answers 406
+to clients that accept only the missing encodings.
+"""
+import json
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Other names clients use for the same encodings
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+# ETag suffix per non-JSON representation, so caches never mix them up
+_ETAG_SUFFIXES = {MSGPACK: "msgpack", ARROW: "arrow"}
+
+
+def offered_media_types(columnar: bool = False) -> List[str]:
+    """Encodings this process can produce (Arrow only for columnar results)."""
+    offered = [JSON]
+    if MSGPACK_AVAILABLE:
+        offered.append(MSGPACK)
+    if columnar and ARROW_AVAILABLE:
+        offered.append(ARROW)
+    return offered
+
+
+def negotiate(accept: Optional[str], columnar: bool = False) -> str:
+    """Best offered media type for an Accept header, raising a 406 if none is acceptable."""
+    offered = offered_media_types(columnar)
+    if not accept:
+        return JSON
+
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        media, _, params = part.partition(";")
+        media = media.strip().lower()
+        media = _ALIASES.get(media, media)
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in ("*/*", "application/*"):
+            media = JSON
+        if media in offered and q > best_q:
+            best, best_q = media, q
+
+    if best is None:
+        raise HTTPException(status_code=406, detail=f"Not acceptable. Available: {', '.join(offered)}")
+    return best
+
+
+def representation_etag(etag: str, media_type: str) -> str:
+    """The ETag of one encoding of a resource (JSON keeps the plain ETag)."""
+    suffix = _ETAG_SUFFIXES.get(media_type)
+    return f'{etag[:-1]}-{suffix}"' if suffix else etag
+
+
+def _default(value: Any) -> Any:
+    """Encode NumPy values the encoders do not handle natively."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode(content: Any, media_type: str = JSON) -> bytes:
+    """Encode a result as JSON or MessagePack."""
+    if media_type == MSGPACK:
+        return msgpack.packb(content, use_bin_type=True, default=_default)
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    # Same output as FastAPI's JSONResponse
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def columns_from_rows(rows: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    One list per key of a list of result dicts; nested dicts are flattened
+    into dotted names (data.weather.wind_speed_kn) and missing keys are None.
+    """
+    flat_rows = [_flatten(row) for row in rows]
+    names: Dict[str, None] = {}
+    for row in flat_rows:
+        names.update(dict.fromkeys(row))
+    return {name: [row.get(name) for row in flat_rows] for name in names}
+
+
+def _flatten(row: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat: Dict[str, Any] = {}
+    for key, value in row.items():
+        if isinstance(value, dict) and value:
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif not isinstance(value, dict):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def encode_arrow(
+    columns: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None,
+    dictionaries: Optional[Dict[str, Sequence[str]]] = None
+) -> bytes:
+    """
+    Arrow IPC stream holding one record batch.
+
+    columns maps names to NumPy arrays (used without copying where Arrow
+    allows) or lists. dictionaries maps a column of integer codes to its
+    labels, which makes it a dictionary-encoded string column (e.g. verdict
+    indices into VERDICTS). metadata values are stored as JSON in the
+    schema metadata.
+    """
+    arrays, names = [], []
+    for name, values in columns.items():
+        if dictionaries and name in dictionaries:
+            array = pa.DictionaryArray.from_arrays(
+                pa.array(np.asarray(values, dtype=np.int8)), pa.array(list(dictionaries[name]))
+            )
+        elif isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+            array = pa.array(values.astype("datetime64[s]"), type=pa.timestamp("s", tz="UTC"))
+        else:
+            array = pa.array(values)
+        arrays.append(array)
+        names.append(name)
+
+    schema_metadata = {key: json.dumps(value, default=_default) for key, value in (metadata or {}).items()}
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    batch = batch.replace_schema_metadata(schema_metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encoded_response(
+    content: Any,
+    media_type: str = JSON,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """A JSON or MessagePack response; results are built by our own code, so no model validation."""
+    return Response(encode(content, media_type), media_type=media_type, headers={**(headers or {}), "Vary": "Accept"})
+
+
+def arrow_response(
+    columns: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None,
+    dictionaries: Optional[Dict[str, Sequence[str]]] = None
+) -> Response:
+    """An Arrow IPC stream response (see encode_arrow)."""
+    return Response(
+        encode_arrow(columns, metadata, dictionaries), media_type=ARROW, headers={"Vary": "Accept"}
+    )
@@ -1,4 +1,10 @@
 """Launch site definitions with coordinates and limits."""
+import math
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
 
 # Default launch limits for Big Refueler rocket
 DEFAULT_LIMITS = {
@@ -71,3 +77,39 @@ LAUNCH_SITES = {
         "limits": DEFAULT_LIMITS.copy()
     }
 }
+
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+class SiteIndex:
+    """
+    Nearest-site lookup for arbitrary coordinates.
+
+    Sites are held as unit vectors on the sphere; the nearest one is found
+    with a single vectorized distance pass, which for a few dozen sites is
+    faster than walking a tree.
+    """
+
+    def __init__(self, sites: Dict[str, Dict[str, Any]]):
+        self.codes = list(sites)
+        self._vectors = _unit_vectors(
+            np.array([site["lat"] for site in sites.values()], dtype=float),
+            np.array([site["lon"] for site in sites.values()], dtype=float)
+        )
+
+    def nearest_index(self, lat: float, lon: float) -> Tuple[int, float]:
+        """(position in codes, great-circle distance in km) of the site closest to (lat, lon)."""
+        chords = np.linalg.norm(self._vectors - _unit_vectors(np.float64(lat), np.float64(lon)), axis=1)
+        i = int(np.argmin(chords))
+        return i, 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, chords[i] / 2.0))
+
+    def nearest(self, lat: float, lon: float) -> Tuple[str, float]:
+        """(site code, great-circle distance in km) of the site closest to (lat, lon)."""
+        i, distance_km = self.nearest_index(lat, lon)
+        return self.codes[i], distance_km
+
+
+SITE_INDEX = SiteIndex(LAUNCH_SITES)
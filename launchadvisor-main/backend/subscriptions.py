@@ -0,0 +1,163 @@
+"""Push decision updates to subscribers instead of having them poll."""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from decide import decision_fingerprint, make_cacheable_decision
+
+# How often every subscribed (site, time) is checked for new input data
+SUBSCRIPTION_POLL_S = float(os.getenv("SUBSCRIPTION_POLL_S", "5"))
+
+# Comment frame sent on idle streams so proxies don't close them (seconds)
+SUBSCRIPTION_HEARTBEAT_S = float(os.getenv("SUBSCRIPTION_HEARTBEAT_S", "15"))
+
+# (site_code, launch_time, fields)
+SubscriptionKey = Tuple[str, datetime, Optional[Tuple[str, ...]]]
+
+
+class Listener:
+    """
+    One connected client. Keeps only the latest message per subscription,
+    so a slow reader skips intermediate updates instead of queueing them.
+    """
+
+    def __init__(self, keys: List[SubscriptionKey]):
+        self.keys = keys
+        self._pending: Dict[SubscriptionKey, str] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, key: SubscriptionKey, message: str) -> None:
+        self._pending[key] = message
+        self._ready.set()
+
+    async def next(self, timeout: float) -> List[str]:
+        """Messages waiting for this client; empty if none arrived within timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        messages = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        return messages
+
+
+class Subscription:
+    """Last decision sent for one (site, time, fields) and who is listening."""
+
+    def __init__(self):
+        self.listeners: set = set()
+        self.fingerprint: Optional[str] = None  # ETag of the inputs last evaluated
+        self.token: Optional[str] = None  # hash of the last message body
+        self.message: Optional[str] = None
+
+
+class DecisionHub:
+    """
+    Recomputes each distinct subscribed decision once per input change and
+    fans the result out to every listener.
+
+    Each poll checks the decision fingerprint (cache versions of its inputs
+    plus the rules version) first. A decision is only re-made when an input
+    changed, went stale or was never cached, and only pushed when the
+    result differs from what listeners last received. Every listener shares
+    the same pre-serialized message.
+    """
+
+    def __init__(self, interval: float = SUBSCRIPTION_POLL_S):
+        self.interval = interval
+        self._subscriptions: Dict[SubscriptionKey, Subscription] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "polls": 0, "evaluations": 0, "pushes": 0, "errors": 0,
+            "last_push": None, "last_error": None
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def subscribe(self, keys: List[SubscriptionKey]) -> Listener:
+        """Register a client; it gets the current decision for each key right away."""
+        listener = Listener(keys)
+        for key in keys:
+            subscription = self._subscriptions.setdefault(key, Subscription())
+            subscription.listeners.add(listener)
+            if subscription.message is not None:
+                listener.offer(key, subscription.message)
+            else:
+                self._wake.set()
+        return listener
+
+    def unsubscribe(self, listener: Listener) -> None:
+        for key in listener.keys:
+            subscription = self._subscriptions.get(key)
+            if subscription is None:
+                continue
+            subscription.listeners.discard(listener)
+            if not subscription.listeners:
+                del self._subscriptions[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "subscriptions": len(self._subscriptions),
+            "listeners": sum(len(s.listeners) for s in self._subscriptions.values()),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            self.stats["polls"] += 1
+            self._wake.clear()
+            await asyncio.gather(*(
+                self._update(key, subscription)
+                for key, subscription in list(self._subscriptions.items())
+            ))
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _update(self, key: SubscriptionKey, subscription: Subscription) -> None:
+        site_code, launch_time, fields = key
+        fingerprint = decision_fingerprint(site_code, launch_time, fields)
+        if fingerprint is not None and fingerprint[0] == subscription.fingerprint and fingerprint[1] > 0:
+            return
+
+        # Changed, stale or missing inputs: making the decision fetches or
+        # refreshes them
+        try:
+            decision, fingerprint = await make_cacheable_decision(site_code, launch_time, fields)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["last_error"] = f"{site_code}@{launch_time.isoformat()}: {e}"
+            return
+        self.stats["evaluations"] += 1
+        subscription.fingerprint = fingerprint[0] if fingerprint else None
+
+        body = json.dumps({
+            "site_code": site_code,
+            "launch_time": launch_time.isoformat(),
+            "decision": decision,
+        })
+        token = hashlib.sha1(body.encode()).hexdigest()[:32]
+        if token == subscription.token:
+            return
+
+        subscription.token = token
+        subscription.message = f"event: decision\nid: {token}\ndata: {body}\n\n"
+        self.stats["pushes"] += 1
+        self.stats["last_push"] = time.time()
+        for listener in list(subscription.listeners):
+            listener.offer(key, subscription.message)
@@ -21,6 +21,7 @@ export interface LaunchResponse {
   risk_score: number;
   why: string;
   rule_citations: string[];
+  degraded?: Record<string, string>;
   data?: {
     weather?: any;
     space_weather?: any;
@@ -53,3 +54,28 @@ export async function decideLaunch(request: LaunchRequest): Promise<LaunchRespon
 
   return response.json();
 }
+
+export interface DecisionEvent {
+  site_code: string;
+  launch_time: string;
+  decision: LaunchResponse;
+}
+
+/**
+ * Subscribe to live decisions for a site and launch time. The callback gets
+ * the current decision right away and again whenever it changes.
+ * Returns a function that closes the stream.
+ */
+export function subscribeDecision(
+  request: LaunchRequest,
+  onDecision: (event: DecisionEvent) => void
+): () => void {
+  const params = new URLSearchParams({
+    subscribe: `${request.site_code}@${request.launch_time}`,
+  });
+  const source = new EventSource(`${API_BASE_URL}/api/decide/stream?${params}`);
+  source.addEventListener('decision', (event) => {
+    onDecision(JSON.parse((event as MessageEvent).data));
+  });
+  return () => source.close();
+}